@@ -0,0 +1,1735 @@
+// Variables globales
+let map;
+let markers = {};
+let routePolylines = [];
+let deliveries = [];
+let depot = { lat: 48.8566, lon: 2.3522, name: 'Main Depot' };
+let selectionMode = 'none'; // 'none', 'depot', 'delivery'
+let currentMarker = null;
+let searchMarker = null;
+
+// Au-delà de ce nombre de points, les arrêts sont dessinés sur canvas et regroupés
+const CANVAS_MARKER_THRESHOLD = 500;
+let stopLayer = null;
+
+// Synchronisation avec Streamlit : seuls les deltas traversent la frontière Python / JS.
+// Les éditions locales partent en opérations numérotées (regroupées pendant SYNC_DELAY ms) ;
+// Python renvoie le numéro de la dernière appliquée, et n'envoie les livraisons ou le plan
+// optimisé que lorsque leur révision diffère de celle que la carte a confirmée.
+const SYNC_DELAY = 300;
+const sync = {
+    revision: null,
+    planRevision: null,
+    seq: 0,
+    outbox: [],
+    params: null,
+    timer: null,
+    poll: 0
+};
+
+// Durées des phases de la dernière optimisation (ms), consultables via window.vrpTimings
+const PHASE_LABELS = {
+    matrix: 'Matrix build',
+    construction: 'Construction',
+    local_search: 'Local search',
+    assignment: 'Depot assignment',
+    depot_solves: 'Depot solves',
+    merge: 'Plan merge',
+    clustering: 'Clustering',
+    cluster_solves: 'Cluster solves',
+    boundary_repair: 'Boundary repair',
+    serialization: 'Result serialization',
+    rendering: 'Map rendering'
+};
+let phaseTimings = {};
+
+// Dernier résultat affiché (routes d'objets livraison), source des exports
+let currentResult = null;
+
+// Flotte multi-dépôts (plan serveur) : chaque route part de son dépôt ; marqueurs des autres dépôts
+let fleetDepotMarkers = [];
+
+function routeDepot(index) {
+    return currentResult && currentResult.fleet ? currentResult.fleet[index].depot : depot;
+}
+
+// Fenêtres horaires (minutes depuis minuit) : vitesse moyenne qui convertit les distances en temps
+const AVERAGE_SPEED_KMH = 40;
+
+function parseClock(value) {
+    const match = /^(\d{1,2}):(\d{2})/.exec(value || '');
+    return match ? parseInt(match[1]) * 60 + parseInt(match[2]) : null;
+}
+
+function formatClock(minutes) {
+    if (minutes == null || !isFinite(minutes)) return '';
+    const total = Math.round(minutes);
+    const days = Math.floor(total / 1440);
+    const rest = total - days * 1440;
+    const clock = `${String(Math.floor(rest / 60)).padStart(2, '0')}:${String(rest % 60).padStart(2, '0')}`;
+    return days ? `+${days} ${clock}` : clock;
+}
+
+function hasTimeWindows() {
+    return depot.open != null || depot.close != null ||
+        deliveries.some(d => d.ready != null || d.due != null || d.service > 0);
+}
+
+function travelMinutes(a, b) {
+    return calculateDistance(a.lat, a.lon, b.lat, b.lon) * 60 / AVERAGE_SPEED_KMH;
+}
+
+// Heures de départ du dépôt, de début de service à chaque arrêt et de retour
+function routeSchedule(route) {
+    const times = [depot.open ?? 0];
+    let prev = depot;
+    for (const point of [...route, depot]) {
+        const arrival = times[times.length - 1] + (prev.service || 0) + travelMinutes(prev, point);
+        times.push(point === depot ? arrival : Math.max(point.ready ?? 0, arrival));
+        prev = point;
+    }
+    return times;
+}
+
+function windowLabel(point) {
+    if (point.ready == null && point.due == null) return '';
+    return `Window: ${formatClock(point.ready ?? 0)}–${point.due == null ? '' : formatClock(point.due)}<br>`;
+}
+
+// Couleurs pour les routes
+const routeColors = [
+    '#3B82F6', '#10B981', '#F59E0B', '#EF4444', 
+    '#8B5CF6', '#EC4899', '#14B8A6', '#F97316'
+];
+
+// Couche canvas des arrêts : un seul dessin pour tous les points, regroupés par zoom
+const StopCanvasLayer = L.Layer.extend({
+    options: {
+        clusterRadius: 40,
+        disableClusteringAtZoom: 17,
+        pointRadius: 6
+    },
+    
+    initialize: function(options) {
+        L.setOptions(this, options);
+        this._points = [];
+        this._drawn = [];
+    },
+    
+    onAdd: function(map) {
+        this._canvas = L.DomUtil.create('canvas', 'stop-canvas-layer leaflet-zoom-hide');
+        map.getPanes().overlayPane.appendChild(this._canvas);
+        map.on('moveend resize', this._redraw, this);
+        this._redraw();
+    },
+    
+    onRemove: function(map) {
+        L.DomUtil.remove(this._canvas);
+        map.off('moveend resize', this._redraw, this);
+    },
+    
+    // points : [{ lat, lon, color, popup: () => html }]
+    setPoints: function(points) {
+        this._points = points;
+        // Projection à zoom 0 calculée une fois ; à zoom z il suffit de multiplier par 2^z
+        this._x = new Float64Array(points.length);
+        this._y = new Float64Array(points.length);
+        points.forEach((p, i) => {
+            const q = L.CRS.EPSG3857.latLngToPoint(L.latLng(p.lat, p.lon), 0);
+            this._x[i] = q.x;
+            this._y[i] = q.y;
+        });
+        if (this._map) this._redraw();
+    },
+    
+    _redraw: function() {
+        const map = this._map;
+        const size = map.getSize();
+        const topLeft = map.containerPointToLayerPoint([0, 0]);
+        const ratio = window.devicePixelRatio || 1;
+        L.DomUtil.setPosition(this._canvas, topLeft);
+        this._canvas.width = size.x * ratio;
+        this._canvas.height = size.y * ratio;
+        this._canvas.style.width = size.x + 'px';
+        this._canvas.style.height = size.y + 'px';
+        
+        const ctx = this._canvas.getContext('2d');
+        ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+        
+        const zoom = map.getZoom();
+        const scale = Math.pow(2, zoom);
+        const origin = map.getPixelOrigin();
+        const ox = origin.x + topLeft.x;
+        const oy = origin.y + topLeft.y;
+        const cell = this.options.clusterRadius;
+        const clustering = zoom < this.options.disableClusteringAtZoom;
+        const buckets = new Map();
+        
+        for (let i = 0; i < this._points.length; i++) {
+            const x = this._x[i] * scale - ox;
+            const y = this._y[i] * scale - oy;
+            if (x < -cell || y < -cell || x > size.x + cell || y > size.y + cell) continue;
+            const key = clustering ? Math.floor(x / cell) * 65536 + Math.floor(y / cell) : i;
+            const bucket = buckets.get(key);
+            if (bucket) {
+                bucket.count++;
+                bucket.x += x;
+                bucket.y += y;
+            } else {
+                buckets.set(key, { count: 1, x, y, index: i });
+            }
+        }
+        
+        this._drawn = [];
+        buckets.forEach(bucket => {
+            const x = bucket.x / bucket.count;
+            const y = bucket.y / bucket.count;
+            if (bucket.count === 1) {
+                ctx.beginPath();
+                ctx.arc(x, y, this.options.pointRadius, 0, 2 * Math.PI);
+                ctx.fillStyle = this._points[bucket.index].color;
+                ctx.fill();
+                ctx.lineWidth = 2;
+                ctx.strokeStyle = '#ffffff';
+                ctx.stroke();
+                this._drawn.push({ x, y, r: this.options.pointRadius + 2, index: bucket.index, count: 1 });
+            } else {
+                const r = 12 + Math.min(16, 3 * Math.log2(bucket.count));
+                ctx.beginPath();
+                ctx.arc(x, y, r, 0, 2 * Math.PI);
+                ctx.fillStyle = 'rgba(102, 126, 234, 0.85)';
+                ctx.fill();
+                ctx.lineWidth = 3;
+                ctx.strokeStyle = 'rgba(255, 255, 255, 0.9)';
+                ctx.stroke();
+                ctx.fillStyle = '#ffffff';
+                ctx.font = '600 12px Inter, sans-serif';
+                ctx.textAlign = 'center';
+                ctx.textBaseline = 'middle';
+                ctx.fillText(bucket.count, x, y);
+                this._drawn.push({ x, y, r, index: bucket.index, count: bucket.count });
+            }
+        });
+    },
+    
+    // Retourne true si le clic a touché un point ou un groupe
+    handleClick: function(e) {
+        const p = e.containerPoint;
+        const hit = this._drawn.find(d => (d.x - p.x) ** 2 + (d.y - p.y) ** 2 <= d.r * d.r);
+        if (!hit) return false;
+        if (hit.count > 1) {
+            this._map.setView(this._map.containerPointToLatLng([hit.x, hit.y]), this._map.getZoom() + 2);
+        } else {
+            // Popup construite à la demande, jamais liée d'avance
+            const point = this._points[hit.index];
+            L.popup().setLatLng([point.lat, point.lon]).setContent(point.popup()).openOn(this._map);
+        }
+        return true;
+    }
+});
+
+// Initialisation de la carte
+function initMap() {
+    // Créer la carte
+    map = L.map('map', { preferCanvas: true }).setView([depot.lat, depot.lon], 13);
+    
+    // Couches de base
+    const osmLayer = L.tileLayer('https://{s}.tile.openstreetmap.org/{z}/{x}/{y}.png', {
+        attribution: '© OpenStreetMap contributors',
+        maxZoom: 19
+    }).addTo(map);
+    
+    const satelliteLayer = L.tileLayer('https://server.arcgisonline.com/ArcGIS/rest/services/World_Imagery/MapServer/tile/{z}/{y}/{x}', {
+        attribution: '© Esri',
+        maxZoom: 19
+    });
+    
+    // Contrôle des couches
+    const baseLayers = {
+        "OpenStreetMap": osmLayer,
+        "Satellite": satelliteLayer
+    };
+    
+    L.control.layers(baseLayers).addTo(map);
+    
+    // Contrôle de recherche
+    initSearch();
+    
+    // Ajouter le dépôt initial
+    addDepotMarker();
+    
+    // Écouter les clics sur la carte
+    map.on('click', function(e) {
+        // Clic sur un arrêt dessiné sur canvas : popup ou zoom sur le groupe
+        if (selectionMode === 'none' && stopLayer && stopLayer.handleClick(e)) return;
+        handleMapClick(e.latlng.lat, e.latlng.lng);
+    });
+    
+    // Mettre à jour l'affichage des coordonnées au mouvement de la souris
+    map.on('mousemove', function(e) {
+        updateCoordinatesDisplay(e.latlng.lat, e.latlng.lng);
+    });
+    
+    // Afficher les coordonnées initiales
+    updateCoordinatesDisplay(depot.lat, depot.lon);
+}
+
+// Initialiser la recherche
+function initSearch() {
+    const searchInput = document.getElementById('searchInput');
+    
+    searchInput.addEventListener('keypress', function(e) {
+        if (e.key === 'Enter') {
+            searchLocation(this.value);
+        }
+    });
+}
+
+// Cache du géocodage : clé = requête normalisée, conservé dans localStorage quand il est disponible
+const GEOCODE_STORAGE_KEY = 'vrp.geocode.v2';
+const GEOCODE_CACHE_LIMIT = 500;
+// Délai (ms) au-delà duquel une recherche sans réponse de Python échoue
+const GEOCODE_TIMEOUT = 30000;
+// Intervalle (ms) des reruns demandés tant qu'une recherche attend sa réponse
+const GEOCODE_POLL = 1000;
+const geocodeCache = new Map();
+const geocodeInflight = new Map();
+const geocodeWaiting = new Map(); // clé -> { resolve, reject, timer }
+let geocodePollTimer = null;
+try {
+    for (const [key, value] of JSON.parse(localStorage.getItem(GEOCODE_STORAGE_KEY) || '[]')) {
+        geocodeCache.set(key, value);
+    }
+} catch (error) {
+    // iframe sans stockage (origine opaque) : cache en mémoire seulement
+}
+
+function normalizeQuery(query) {
+    return query.normalize('NFKC').toLowerCase().replace(/\s+/g, ' ').replace(/^[\s,.;]+|[\s,.;]+$/g, '');
+}
+
+function saveGeocodeCache() {
+    while (geocodeCache.size > GEOCODE_CACHE_LIMIT) {
+        geocodeCache.delete(geocodeCache.keys().next().value);
+    }
+    try {
+        localStorage.setItem(GEOCODE_STORAGE_KEY, JSON.stringify([...geocodeCache]));
+    } catch (error) {
+        // Stockage indisponible ou plein : le cache mémoire suffit
+    }
+}
+
+// Résultat (ou null si introuvable) ; les recherches identiques en cours partagent la même requête.
+// La requête part à Python par le canal de synchronisation : géocodeur du serveur (VRP_GEOCODER,
+// gazetteer hors ligne compris) et son cache SQLite, comme pour l'import d'adresses
+function geocode(query) {
+    const key = normalizeQuery(query);
+    if (geocodeCache.has(key)) return Promise.resolve(geocodeCache.get(key));
+    if (geocodeInflight.has(key)) return geocodeInflight.get(key);
+    const request = new Promise((resolve, reject) => {
+        const timer = setTimeout(() => {
+            geocodeWaiting.delete(key);
+            reject(new Error(`Geocoding timed out: ${key}`));
+        }, GEOCODE_TIMEOUT);
+        geocodeWaiting.set(key, { resolve, reject, timer });
+    }).finally(() => geocodeInflight.delete(key));
+    geocodeInflight.set(key, request);
+    pushOp({ op: 'geocode', query: key });
+    pollGeocodes();
+    return request;
+}
+
+// Python géocode hors du rerun et ne peut pas en déclencher un : la carte en redemande
+// (compteur poll) jusqu'à ce que toutes les recherches aient leur réponse ou expirent
+function pollGeocodes() {
+    clearTimeout(geocodePollTimer);
+    geocodePollTimer = setTimeout(() => {
+        if (!geocodeWaiting.size) return;
+        sync.poll++;
+        sendSync();
+        pollGeocodes();
+    }, GEOCODE_POLL);
+}
+
+// Réponses du géocodeur Python (clé -> résultat ou null) : résolvent les recherches en attente
+function receiveGeocodes(answers) {
+    for (const [key, result] of Object.entries(answers)) {
+        const waiting = geocodeWaiting.get(key);
+        if (!waiting) continue;
+        clearTimeout(waiting.timer);
+        geocodeWaiting.delete(key);
+        geocodeCache.set(key, result);
+        saveGeocodeCache();
+        waiting.resolve(result);
+    }
+}
+
+// Contenu de la bulle d'un résultat : le libellé du fournisseur est inséré comme texte, jamais comme HTML
+function searchPopup(label) {
+    const content = document.createElement('div');
+    content.innerHTML = '<b>Search Result:</b><br>';
+    content.append(label);
+    return content;
+}
+
+// Rechercher un lieu
+function searchLocation(query) {
+    if (!query || !normalizeQuery(query)) return;
+    
+    geocode(query)
+        .then(result => {
+            if (result) {
+                const { lat, lon } = result;
+                
+                // Centrer la carte sur le résultat
+                map.setView([lat, lon], 15);
+                
+                // Ajouter un marqueur
+                if (searchMarker) {
+                    map.removeLayer(searchMarker);
+                }
+                
+                searchMarker = L.marker([lat, lon], {
+                    icon: L.icon({
+                        iconUrl: 'data:image/svg+xml;base64,' + btoa(`
+                            <svg xmlns="http://www.w3.org/2000/svg" viewBox="0 0 24 24" fill="#EF4444" width="32" height="32">
+                                <path d="M12 2C8.13 2 5 5.13 5 9c0 5.25 7 13 7 13s7-7.75 7-13c0-3.87-3.13-7-7-7zm0 9.5c-1.38 0-2.5-1.12-2.5-2.5s1.12-2.5 2.5-2.5 2.5 1.12 2.5 2.5-1.12 2.5-2.5 2.5z"/>
+                            </svg>
+                        `),
+                        iconSize: [32, 32],
+                        iconAnchor: [16, 32]
+                    })
+                }).addTo(map)
+                .bindPopup(searchPopup(result.label))
+                .openPopup();
+                
+                showNotification(`Location found: ${result.label.split(',')[0]}`, 'success');
+                
+                // Si en mode sélection, remplir les champs
+                if (selectionMode === 'depot') {
+                    document.getElementById('depotLat').value = lat.toFixed(6);
+                    document.getElementById('depotLon').value = lon.toFixed(6);
+                    showNotification('Coordinates filled for depot', 'info');
+                } else if (selectionMode === 'delivery') {
+                    document.getElementById('deliveryLat').value = lat.toFixed(6);
+                    document.getElementById('deliveryLon').value = lon.toFixed(6);
+                    showNotification('Coordinates filled for delivery', 'info');
+                }
+            } else {
+                showNotification('Location not found', 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Search error:', error);
+            showNotification('Search failed', 'error');
+        });
+}
+
+// Gérer le clic sur la carte
+function handleMapClick(lat, lng) {
+    updateCoordinatesDisplay(lat, lng);
+    
+    // Si un marqueur temporaire existe, le supprimer
+    if (currentMarker) {
+        map.removeLayer(currentMarker);
+    }
+    
+    // Ajouter un marqueur temporaire
+    currentMarker = L.circleMarker([lat, lng], {
+        radius: 8,
+        fillColor: getColorForMode(),
+        color: '#ffffff',
+        weight: 2,
+        fillOpacity: 0.8
+    }).addTo(map);
+    
+    // Selon le mode, remplir les champs appropriés
+    if (selectionMode === 'depot') {
+        document.getElementById('depotLat').value = lat.toFixed(6);
+        document.getElementById('depotLon').value = lng.toFixed(6);
+        showNotification('Depot coordinates selected from map', 'success');
+        
+        // Désactiver le mode après sélection
+        setTimeout(() => setSelectionMode('none'), 1000);
+    } else if (selectionMode === 'delivery') {
+        document.getElementById('deliveryLat').value = lat.toFixed(6);
+        document.getElementById('deliveryLon').value = lng.toFixed(6);
+        showNotification('Delivery coordinates selected from map', 'success');
+        
+        // Demander le nom si vide
+        if (!document.getElementById('deliveryName').value.trim()) {
+            document.getElementById('deliveryName').value = `Customer ${deliveries.length + 1}`;
+        }
+        
+        // Désactiver le mode après sélection
+        setTimeout(() => setSelectionMode('none'), 1000);
+    } else {
+        showNotification(`Coordinates: ${lat.toFixed(6)}, ${lng.toFixed(6)}`, 'info');
+    }
+}
+
+// Mettre à jour l'affichage des coordonnées
+function updateCoordinatesDisplay(lat, lng) {
+    document.getElementById('currentLat').textContent = lat.toFixed(6);
+    document.getElementById('currentLng').textContent = lng.toFixed(6);
+}
+
+// Obtenir la couleur selon le mode
+function getColorForMode() {
+    switch(selectionMode) {
+        case 'depot': return '#3B82F6'; // Bleu
+        case 'delivery': return '#10B981'; // Vert
+        default: return '#6B7280'; // Gris
+    }
+}
+
+// Définir le mode de sélection
+function setSelectionMode(mode) {
+    selectionMode = mode;
+    
+    // Mettre à jour les boutons
+    document.getElementById('modeNone').classList.toggle('active', mode === 'none');
+    document.getElementById('modeDepot').classList.toggle('active', mode === 'depot');
+    document.getElementById('modeDelivery').classList.toggle('active', mode === 'delivery');
+    
+    // Mettre à jour l'indicateur
+    const modeIndicator = document.getElementById('modeIndicator');
+    const modeDisplay = document.getElementById('currentModeDisplay');
+    
+    switch(mode) {
+        case 'none':
+            modeIndicator.innerHTML = '<i class="fas fa-hand-pointer"></i> Navigation Mode';
+            modeIndicator.className = 'map-control';
+            modeDisplay.textContent = 'Navigation Mode';
+            modeDisplay.style.background = '#f0f9ff';
+            modeDisplay.style.color = '#0369a1';
+            showNotification('Navigation mode activated', 'info');
+            break;
+            
+        case 'depot':
+            modeIndicator.innerHTML = '<i class="fas fa-warehouse"></i> Selecting Depot';
+            modeIndicator.className = 'map-control selection-mode';
+            modeDisplay.textContent = 'Depot Selection Mode - Click on map to select depot location';
+            modeDisplay.style.background = '#dbeafe';
+            modeDisplay.style.color = '#1e40af';
+            showNotification('Click on map to select depot location', 'warning');
+            break;
+            
+        case 'delivery':
+            modeIndicator.innerHTML = '<i class="fas fa-map-marker-alt"></i> Selecting Delivery';
+            modeIndicator.className = 'map-control selection-mode';
+            modeDisplay.textContent = 'Delivery Selection Mode - Click on map to select delivery location';
+            modeDisplay.style.background = '#d1fae5';
+            modeDisplay.style.color = '#065f46';
+            showNotification('Click on map to select delivery location', 'warning');
+            break;
+    }
+    
+    // Changer le curseur de la carte
+    const mapContainer = document.getElementById('map');
+    if (mode === 'none') {
+        mapContainer.style.cursor = 'grab';
+    } else {
+        mapContainer.style.cursor = 'crosshair';
+        showNotification(`Click on the map to select ${mode} location`, 'info');
+    }
+}
+
+// Ajouter le marqueur du dépôt
+function depotIcon() {
+    return L.divIcon({
+        html: `
+            <div style="background: linear-gradient(135deg, #3B82F6 0%, #1D4ED8 100%); 
+                        width: 50px; height: 50px; border-radius: 50%; 
+                        display: flex; align-items: center; justify-content: center; 
+                        color: white; font-size: 20px; border: 3px solid white; 
+                        box-shadow: 0 4px 12px rgba(59, 130, 246, 0.4);">
+                <i class="fas fa-warehouse"></i>
+            </div>
+        `,
+        className: 'custom-depot-icon',
+        iconSize: [50, 50],
+        iconAnchor: [25, 50]
+    });
+}
+
+function depotMarker(point) {
+    return L.marker([point.lat, point.lon], { icon: depotIcon() })
+        .addTo(map)
+        .bindPopup(`
+            <b>${point.name}</b><br>
+            Depot Location<br>
+            Coordinates: ${point.lat.toFixed(6)}, ${point.lon.toFixed(6)}
+        `);
+}
+
+function addDepotMarker() {
+    if (markers.depot) {
+        map.removeLayer(markers.depot);
+    }
+    markers.depot = depotMarker(depot);
+}
+
+// Mettre à jour le dépôt
+function updateDepot() {
+    const name = document.getElementById('depotName').value.trim();
+    const lat = parseFloat(document.getElementById('depotLat').value);
+    const lon = parseFloat(document.getElementById('depotLon').value);
+    
+    if (!name || isNaN(lat) || isNaN(lon)) {
+        showNotification('Please enter valid depot information', 'error');
+        return;
+    }
+    
+    const open = parseClock(document.getElementById('depotOpen').value);
+    const close = parseClock(document.getElementById('depotClose').value);
+    if (open != null && close != null && open > close) {
+        showNotification('Depot opening time must be before closing time', 'error');
+        return;
+    }
+    depot = { name, lat, lon };
+    if (open != null) depot.open = open;
+    if (close != null) depot.close = close;
+    pushOp({ op: 'depot', name, lat, lon });
+    addDepotMarker();
+    map.setView([depot.lat, depot.lon], 13);
+    showNotification('Depot location updated successfully', 'success');
+}
+
+// Ajouter un point de livraison
+function addDelivery() {
+    const name = document.getElementById('deliveryName').value.trim();
+    const lat = parseFloat(document.getElementById('deliveryLat').value);
+    const lon = parseFloat(document.getElementById('deliveryLon').value);
+    const demand = parseFloat(document.getElementById('deliveryDemand').value);
+    const ready = parseClock(document.getElementById('deliveryReady').value);
+    const due = parseClock(document.getElementById('deliveryDue').value);
+    const service = parseFloat(document.getElementById('deliveryService').value) || 0;
+    
+    if (!name || isNaN(lat) || isNaN(lon) || isNaN(demand) || demand <= 0) {
+        showNotification('Please fill all fields with valid data', 'error');
+        return;
+    }
+    if (ready != null && due != null && ready > due) {
+        showNotification('Time window start must be before its end', 'error');
+        return;
+    }
+    
+    const delivery = { 
+        id: Date.now() + Math.random(), 
+        name, 
+        lat, 
+        lon, 
+        demand,
+        addedAt: new Date().toLocaleTimeString()
+    };
+    if (ready != null) delivery.ready = ready;
+    if (due != null) delivery.due = due;
+    if (service > 0) delivery.service = service;
+    
+    cancelOptimization();
+    deliveries.push(delivery);
+    pushOp({ op: 'add', ...delivery });
+    deliveryListAdded(delivery);
+    addDeliveryMarker(delivery);
+    
+    // Réinitialiser les champs (sauf la demande)
+    document.getElementById('deliveryName').value = '';
+    document.getElementById('deliveryLat').value = '';
+    document.getElementById('deliveryLon').value = '';
+    
+    showNotification(`Delivery point "${name}" added successfully`, 'success');
+}
+
+// Ajouter et continuer
+function addDeliveryAndContinue() {
+    addDelivery();
+    // Réactiver le mode de sélection
+    setTimeout(() => setSelectionMode('delivery'), 500);
+}
+
+// Contenu des popups
+function deliveryPopup(delivery) {
+    return `
+        <b>${delivery.name}</b><br>
+        Demand: ${delivery.demand} kg<br>
+        ${windowLabel(delivery)}Location: ${delivery.lat.toFixed(6)}, ${delivery.lon.toFixed(6)}<br>
+        Added: ${delivery.addedAt}
+    `;
+}
+
+function routeStopPopup(point, routeIndex, stopIndex) {
+    const schedule = currentResult && currentResult.schedules ? currentResult.schedules[routeIndex] : null;
+    const start = schedule ? schedule[stopIndex + 1] : null;
+    const late = start != null && point.due != null && start > point.due + 1e-6;
+    return `
+        <b>${point.name}</b><br>
+        Route ${routeIndex + 1}, Stop ${stopIndex + 1}<br>
+        Demand: ${point.demand} kg<br>
+        ${windowLabel(point)}${start != null ? `Service start: ${formatClock(start)}${late ? ' (late)' : ''}<br>` : ''}
+        Distance from depot: ${calculateDistance(depot.lat, depot.lon, point.lat, point.lon).toFixed(2)} km
+    `;
+}
+
+// Afficher toutes les livraisons : marqueurs DOM, ou couche canvas pour les gros volumes
+function renderDeliveryMarkers() {
+    Object.keys(markers).forEach(id => {
+        if (id !== 'depot') {
+            map.removeLayer(markers[id]);
+            delete markers[id];
+        }
+    });
+    if (deliveries.length <= CANVAS_MARKER_THRESHOLD) {
+        if (stopLayer) {
+            map.removeLayer(stopLayer);
+            stopLayer = null;
+        }
+        deliveries.forEach(addDeliveryMarker);
+        return;
+    }
+    if (!stopLayer) stopLayer = new StopCanvasLayer().addTo(map);
+    stopLayer.setPoints(deliveries.map(d => ({
+        lat: d.lat, lon: d.lon, color: '#10B981', popup: () => deliveryPopup(d)
+    })));
+}
+
+// Ajouter un marqueur de livraison
+function addDeliveryMarker(delivery) {
+    if (stopLayer) {
+        renderDeliveryMarkers();
+        return;
+    }
+    const deliveryIcon = L.divIcon({
+        html: `
+            <div style="background: linear-gradient(135deg, #10B981 0%, #059669 100%); 
+                        width: 40px; height: 40px; border-radius: 50%; 
+                        display: flex; align-items: center; justify-content: center; 
+                        color: white; font-size: 16px; border: 2px solid white; 
+                        box-shadow: 0 3px 10px rgba(16, 185, 129, 0.4);">
+                <i class="fas fa-map-marker-alt"></i>
+            </div>
+        `,
+        className: 'custom-delivery-icon',
+        iconSize: [40, 40],
+        iconAnchor: [20, 40]
+    });
+    
+    const marker = L.marker([delivery.lat, delivery.lon], { icon: deliveryIcon })
+        .addTo(map)
+        .bindPopup(() => deliveryPopup(delivery));
+    
+    markers[delivery.id] = marker;
+}
+
+// Liste des livraisons virtualisée : seules les lignes visibles existent dans le DOM
+const DELIVERY_ROW_HEIGHT = 110;
+const DELIVERY_ROW_OVERSCAN = 4;
+const deliveryView = {
+    rows: new Map(),       // position dans la vue -> élément affiché
+    searchText: new Map(), // id -> texte indexé (minuscules)
+    query: '',
+    filtered: null,        // indices dans deliveries correspondant à la recherche, null = tout
+    scheduled: false
+};
+
+function deliverySearchText(delivery) {
+    return `${delivery.name} ${delivery.id} ${delivery.lat.toFixed(4)} ${delivery.lon.toFixed(4)}`.toLowerCase();
+}
+
+function viewLength() {
+    return deliveryView.filtered ? deliveryView.filtered.length : deliveries.length;
+}
+
+function viewIndex(position) {
+    return deliveryView.filtered ? deliveryView.filtered[position] : position;
+}
+
+function deliveryRowHtml(delivery, index) {
+    return `
+        <div style="flex: 1; min-width: 0;">
+            <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 5px;">
+                <div style="background: #10B981; color: white; min-width: 24px; height: 24px; padding: 0 4px; border-radius: 12px; display: flex; align-items: center; justify-content: center; font-size: 0.8rem;">
+                    ${index + 1}
+                </div>
+                <div style="font-weight: 600; color: #333; white-space: nowrap; overflow: hidden; text-overflow: ellipsis;">${delivery.name}</div>
+            </div>
+            <div style="font-size: 0.9rem; color: #666; margin-bottom: 3px;">
+                <i class="fas fa-map-marker-alt"></i> ${delivery.lat.toFixed(4)}, ${delivery.lon.toFixed(4)}
+            </div>
+            <div style="font-size: 0.9rem; color: #10B981; font-weight: 500;">
+                <i class="fas fa-weight-hanging"></i> ${delivery.demand} kg
+            </div>
+        </div>
+        <button onclick="removeDelivery('${delivery.id}')" 
+                style="background: #EF4444; color: white; border: none; width: 36px; height: 36px; border-radius: 50%; cursor: pointer; transition: all 0.3s ease; display: flex; align-items: center; justify-content: center; flex-shrink: 0;"
+                onmouseover="this.style.transform='scale(1.1)'; this.style.background='#DC2626'" 
+                onmouseout="this.style.transform='scale(1)'; this.style.background='#EF4444'">
+            <i class="fas fa-times"></i>
+        </button>
+    `;
+}
+
+// Met à jour la fenêtre visible ; les lignes à partir de dirtyFrom sont réécrites
+function renderDeliveryWindow(dirtyFrom = Infinity) {
+    const container = document.getElementById('deliveryList');
+    const spacer = document.getElementById('deliverySpacer');
+    const total = viewLength();
+    
+    document.getElementById('deliveryCount').textContent = deliveryView.filtered
+        ? `${total} / ${deliveries.length}` : deliveries.length;
+    spacer.style.height = (total * DELIVERY_ROW_HEIGHT) + 'px';
+    
+    const empty = document.getElementById('deliveryEmpty');
+    empty.style.display = total === 0 ? 'block' : 'none';
+    if (total === 0 && deliveries.length > 0) {
+        empty.innerHTML = '<i class="fas fa-search"></i><p>No matching delivery points</p>';
+    } else if (total === 0) {
+        empty.innerHTML = `
+            <i class="fas fa-inbox"></i>
+            <p>No delivery points added yet</p>
+            <p style="font-size: 0.9rem; margin-top: 10px;">Click on map or use the form above</p>
+        `;
+    }
+    
+    const top = Math.max(0, container.scrollTop - spacer.offsetTop);
+    const first = Math.max(0, Math.floor(top / DELIVERY_ROW_HEIGHT) - DELIVERY_ROW_OVERSCAN);
+    const last = Math.min(total, Math.ceil((top + container.clientHeight) / DELIVERY_ROW_HEIGHT) + DELIVERY_ROW_OVERSCAN);
+    
+    deliveryView.rows.forEach((row, position) => {
+        if (position < first || position >= last) {
+            row.remove();
+            deliveryView.rows.delete(position);
+        }
+    });
+    
+    for (let position = first; position < last; position++) {
+        let row = deliveryView.rows.get(position);
+        if (row && position < dirtyFrom) continue;
+        if (!row) {
+            row = document.createElement('div');
+            row.className = 'delivery-item';
+            row.style.top = (position * DELIVERY_ROW_HEIGHT) + 'px';
+            spacer.appendChild(row);
+            deliveryView.rows.set(position, row);
+        }
+        const index = viewIndex(position);
+        row.innerHTML = deliveryRowHtml(deliveries[index], index);
+    }
+}
+
+function scheduleDeliveryWindow() {
+    if (deliveryView.scheduled) return;
+    deliveryView.scheduled = true;
+    requestAnimationFrame(() => {
+        deliveryView.scheduled = false;
+        renderDeliveryWindow();
+    });
+}
+
+// Reconstruction complète (chargement d'un plan, effacement)
+function renderDeliveryList() {
+    deliveryView.searchText = new Map(deliveries.map(d => [d.id, deliverySearchText(d)]));
+    deliveryView.filtered = null;
+    if (deliveryView.query) {
+        deliveryView.filtered = [];
+        deliveries.forEach((d, index) => {
+            if (deliveryView.searchText.get(d.id).includes(deliveryView.query)) deliveryView.filtered.push(index);
+        });
+    }
+    renderDeliveryWindow(0);
+}
+
+function filterDeliveries(query) {
+    deliveryView.query = query.trim().toLowerCase();
+    document.getElementById('deliveryList').scrollTop = 0;
+    renderDeliveryList();
+}
+
+// Livraison ajoutée en fin de liste : seule sa ligne est créée si elle est visible
+function deliveryListAdded(delivery) {
+    const text = deliverySearchText(delivery);
+    deliveryView.searchText.set(delivery.id, text);
+    if (deliveryView.filtered && text.includes(deliveryView.query)) {
+        deliveryView.filtered.push(deliveries.length - 1);
+    }
+    renderDeliveryWindow();
+}
+
+// Livraison retirée de deliveries[index] : les lignes suivantes de la fenêtre sont réécrites
+function deliveryListRemoved(index, id) {
+    let dirtyFrom = index;
+    if (deliveryView.filtered) {
+        const filtered = deliveryView.filtered;
+        dirtyFrom = filtered.length;
+        let write = 0;
+        for (let read = 0; read < filtered.length; read++) {
+            if (filtered[read] === index) {
+                dirtyFrom = Math.min(dirtyFrom, write);
+                continue;
+            }
+            if (filtered[read] > index) {
+                dirtyFrom = Math.min(dirtyFrom, write);
+                filtered[write++] = filtered[read] - 1;
+            } else {
+                filtered[write++] = filtered[read];
+            }
+        }
+        filtered.length = write;
+    }
+    deliveryView.searchText.delete(id);
+    renderDeliveryWindow(dirtyFrom);
+}
+
+// Supprimer une livraison
+function removeDelivery(id) {
+    const position = deliveries.findIndex(d => d.id == id);
+    if (position < 0) return;
+    cancelOptimization();
+    const [removed] = deliveries.splice(position, 1);
+    pushOp({ op: 'remove', id: removed.id });
+    
+    if (markers[id]) {
+        map.removeLayer(markers[id]);
+        delete markers[id];
+    }
+    if (stopLayer) renderDeliveryMarkers();
+    
+    deliveryListRemoved(position, removed.id);
+    showNotification('Delivery point removed', 'info');
+}
+
+// Effacer toutes les livraisons
+function clearDeliveries() {
+    if (deliveries.length === 0) return;
+    
+    if (!confirm('Are you sure you want to clear all delivery points?')) return;
+    
+    deliveries.forEach(d => {
+        if (markers[d.id]) {
+            map.removeLayer(markers[d.id]);
+            delete markers[d.id];
+        }
+    });
+    
+    deliveries = [];
+    pushOp({ op: 'clear' });
+    if (stopLayer) renderDeliveryMarkers();
+    renderDeliveryList();
+    clearRoutes();
+    showNotification('All delivery points cleared', 'info');
+}
+
+// Exporter les livraisons
+function exportDeliveries() {
+    if (deliveries.length === 0) {
+        showNotification('No delivery points to export', 'error');
+        return;
+    }
+    
+    let csvContent = "data:text/csv;charset=utf-8,Name,Latitude,Longitude,Demand(kg),ReadyTime,DueTime,ServiceTime(min),AddedAt\n";
+    
+    deliveries.forEach(delivery => {
+        csvContent += `${delivery.name},${delivery.lat},${delivery.lon},${delivery.demand},` +
+            `${formatClock(delivery.ready)},${formatClock(delivery.due)},${delivery.service || ''},${delivery.addedAt}\n`;
+    });
+    
+    const encodedUri = encodeURI(csvContent);
+    const link = document.createElement("a");
+    link.setAttribute("href", encodedUri);
+    link.setAttribute("download", "delivery_points.csv");
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    
+    showNotification('Delivery points exported to CSV', 'success');
+}
+
+// Icône de chaque type de notification (noms complets : frontend/subset_icons.py les relève dans le source)
+const NOTIFICATION_ICONS = {
+    success: 'fa-check-circle',
+    error: 'fa-exclamation-circle',
+    warning: 'fa-exclamation-triangle',
+    info: 'fa-info-circle'
+};
+
+// Afficher une notification
+function showNotification(message, type = 'info') {
+    const notification = document.createElement('div');
+    notification.className = `notification ${type}`;
+    notification.innerHTML = `
+        <div style="display: flex; align-items: center; gap: 10px;">
+            <i class="fas ${NOTIFICATION_ICONS[type] || NOTIFICATION_ICONS.info}"></i>
+            <span></span>
+        </div>
+    `;
+    // Messages en texte brut (libellés de géocodage, noms de fichiers)
+    notification.querySelector('span').textContent = message;
+    
+    document.body.appendChild(notification);
+    
+    setTimeout(() => {
+        notification.classList.add('show');
+    }, 10);
+    
+    setTimeout(() => {
+        notification.classList.remove('show');
+        setTimeout(() => {
+            document.body.removeChild(notification);
+        }, 300);
+    }, 4000);
+}
+
+// Afficher le chargement
+function showLoading() {
+    document.getElementById('loading').style.display = 'block';
+}
+
+// Cacher le chargement
+function hideLoading() {
+    document.getElementById('loading').style.display = 'none';
+}
+
+// Effacer les routes
+function removeRoutePolylines() {
+    routePolylines.forEach(p => map.removeLayer(p));
+    routePolylines = [];
+    fleetDepotMarkers.forEach(m => map.removeLayer(m));
+    fleetDepotMarkers = [];
+    currentResult = null;
+}
+
+function clearRoutes() {
+    cancelOptimization();
+    removeRoutePolylines();
+    document.getElementById('resultsPanel').style.display = 'none';
+    document.getElementById('statsBar').style.display = 'none';
+    showNotification('Routes cleared', 'info');
+}
+
+// Calculer la distance (formule de Haversine)
+function calculateDistance(lat1, lon1, lat2, lon2) {
+    const R = 6371; // Rayon de la Terre en km
+    const dLat = (lat2 - lat1) * Math.PI / 180;
+    const dLon = (lon2 - lon1) * Math.PI / 180;
+    const a = Math.sin(dLat / 2) * Math.sin(dLat / 2) +
+             Math.cos(lat1 * Math.PI / 180) * Math.cos(lat2 * Math.PI / 180) *
+             Math.sin(dLon / 2) * Math.sin(dLon / 2);
+    const c = 2 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
+    return R * c;
+}
+
+// Algorithme du plus proche voisin amélioré
+function nearestNeighborAlgorithm(capacity, maxVehicles) {
+    if (deliveries.length === 0) return [];
+    
+    const unvisited = [...deliveries];
+    const routes = [];
+    let vehicleCount = 0;
+    
+    // Fenêtres horaires : début de service chez point après prev, ou null si sa fenêtre
+    // (ou la fermeture du dépôt au retour) est manquée ; test en O(1) à chaque ajout
+    const windows = hasTimeWindows();
+    const serviceStart = (time, prev, point) => {
+        if (!windows) return 0;
+        const start = Math.max(point.ready ?? 0, time + (prev.service || 0) + travelMinutes(prev, point));
+        if (start > (point.due ?? Infinity)) return null;
+        return start + (point.service || 0) + travelMinutes(point, depot) <= (depot.close ?? Infinity) ? start : null;
+    };
+    
+    // Trier par distance au dépôt
+    unvisited.sort((a, b) => {
+        const distA = calculateDistance(depot.lat, depot.lon, a.lat, a.lon);
+        const distB = calculateDistance(depot.lat, depot.lon, b.lat, b.lon);
+        return distA - distB;
+    });
+    
+    while (unvisited.length > 0 && vehicleCount < maxVehicles) {
+        const route = [];
+        let currentLoad = 0;
+        let currentLocation = depot;
+        let currentTime = depot.open ?? 0;
+        
+        // Prendre le point le plus proche du dépôt comme premier point
+        if (unvisited.length > 0) {
+            const firstIndex = windows
+                ? unvisited.findIndex(point => point.demand <= capacity && serviceStart(currentTime, depot, point) !== null)
+                : 0;
+            const firstPoint = firstIndex < 0 ? null : unvisited[firstIndex];
+            if (firstPoint && firstPoint.demand <= capacity) {
+                unvisited.splice(firstIndex, 1);
+                currentTime = serviceStart(currentTime, depot, firstPoint);
+                route.push(firstPoint);
+                currentLoad += firstPoint.demand;
+                currentLocation = firstPoint;
+            } else {
+                // Si la demande du premier point est trop grande (ou aucune fenêtre n'est atteignable), arrêter
+                break;
+            }
+        }
+        
+        // Continuer à ajouter des points
+        while (unvisited.length > 0) {
+            // Trouver le point le plus proche non visité qui peut être ajouté
+            let closestIndex = -1;
+            let closestDistance = Infinity;
+            
+            for (let i = 0; i < unvisited.length; i++) {
+                if (currentLoad + unvisited[i].demand <= capacity &&
+                    serviceStart(currentTime, currentLocation, unvisited[i]) !== null) {
+                    const dist = calculateDistance(
+                        currentLocation.lat, currentLocation.lon,
+                        unvisited[i].lat, unvisited[i].lon
+                    );
+                    if (dist < closestDistance) {
+                        closestDistance = dist;
+                        closestIndex = i;
+                    }
+                }
+            }
+            
+            if (closestIndex === -1) break;
+            
+            // Ajouter le point le plus proche
+            const nextPoint = unvisited.splice(closestIndex, 1)[0];
+            currentTime = serviceStart(currentTime, currentLocation, nextPoint);
+            route.push(nextPoint);
+            currentLoad += nextPoint.demand;
+            currentLocation = nextPoint;
+        }
+        
+        if (route.length > 0) {
+            routes.push(route);
+            vehicleCount++;
+        } else {
+            break;
+        }
+    }
+    
+    // Si il reste des points non visités, les assigner au dernier véhicule si possible
+    // (sans fenêtres horaires : l'ajout en fin de route ignorerait les horaires)
+    if (unvisited.length > 0 && routes.length > 0 && !windows) {
+        const lastRoute = routes[routes.length - 1];
+        let lastLoad = lastRoute.reduce((sum, point) => sum + point.demand, 0);
+        
+        for (let i = 0; i < unvisited.length; i++) {
+            if (lastLoad + unvisited[i].demand <= capacity) {
+                lastRoute.push(unvisited[i]);
+                lastLoad += unvisited[i].demand;
+            }
+        }
+    }
+    
+    return routes;
+}
+
+// Optimiser les routes
+function optimizeRoutes() {
+    if (deliveries.length === 0) {
+        showNotification('Please add delivery points first', 'error');
+        return;
+    }
+    
+    cancelOptimization();
+    
+    const capacity = parseFloat(document.getElementById('vehicleCapacity').value);
+    const maxVehicles = parseInt(document.getElementById('maxVehicles').value);
+    const algorithm = document.getElementById('algorithm').value;
+    const budget = parseFloat(document.getElementById('timeBudget').value) || 0;
+    
+    let routes = [];
+    const constructionStart = performance.now();
+    
+    // Exécuter l'algorithme sélectionné
+    switch(algorithm) {
+        case 'nearest':
+            routes = nearestNeighborAlgorithm(capacity, maxVehicles);
+            break;
+        case 'savings':
+        case 'sweep':
+        case 'genetic':
+            // Les autres algorithmes tournent dans le solveur Python (barre latérale)
+            showNotification(`${algorithm} algorithm runs on the server: use "Optimize on Server" in the sidebar`, 'warning');
+            return;
+        default:
+            routes = nearestNeighborAlgorithm(capacity, maxVehicles);
+    }
+    
+    // Solution de départ affichée tout de suite, puis améliorée en arrière-plan
+    phaseTimings = { construction: performance.now() - constructionStart };
+    displayResults(routes, capacity);
+    if (budget > 0 && routes.length > 0) {
+        startAnytime(routes, capacity, maxVehicles, budget);
+    }
+}
+
+// Optimisation anytime : le worker envoie chaque meilleure solution trouvée
+const ANYTIME_RENDER_INTERVAL = 300;
+let anytime = null;
+
+function startAnytime(routes, capacity, maxVehicles, budget) {
+    let worker;
+    try {
+        worker = new Worker('worker.js');
+    } catch (error) {
+        showNotification('Background optimization is not available in this browser', 'warning');
+        return;
+    }
+    
+    const position = new Map(deliveries.map((d, index) => [d, index + 1]));
+    const nodes = [...deliveries];
+    anytime = {
+        worker,
+        nodes,
+        capacity,
+        budget,
+        improvements: 0,
+        pending: null,
+        timer: null,
+        initial: routes.reduce((sum, route) => sum + calculateRouteDistance(route), 0)
+    };
+    
+    worker.onmessage = event => {
+        const message = event.data;
+        if (message.type === 'ready') {
+            phaseTimings.matrix = message.matrix;
+            return;
+        }
+        phaseTimings.local_search = message.elapsed - (phaseTimings.matrix || 0);
+        if (message.type === 'incumbent') {
+            anytime.improvements++;
+            anytime.pending = message.routes;
+            scheduleAnytimeRender();
+        }
+        updateAnytimeStatus(message);
+        if (message.type === 'done') finishAnytime('done');
+    };
+    worker.onerror = () => finishAnytime('error');
+    
+    document.getElementById('anytimeStatus').style.display = 'flex';
+    worker.postMessage({
+        lat: [depot.lat, ...nodes.map(d => d.lat)],
+        lon: [depot.lon, ...nodes.map(d => d.lon)],
+        demand: [0, ...nodes.map(d => d.demand)],
+        capacity,
+        maxVehicles,
+        budget,
+        routes: routes.map(route => route.map(d => position.get(d))),
+        ...(hasTimeWindows() ? {
+            ready: [depot.open ?? 0, ...nodes.map(d => d.ready ?? 0)],
+            due: [depot.close ?? Infinity, ...nodes.map(d => d.due ?? Infinity)],
+            service: [0, ...nodes.map(d => d.service || 0)],
+            speed: AVERAGE_SPEED_KMH
+        } : {})
+    });
+}
+
+// Regroupe les solutions reçues : au plus un rendu de carte par intervalle
+function scheduleAnytimeRender() {
+    if (anytime.timer) return;
+    anytime.timer = setTimeout(renderAnytime, ANYTIME_RENDER_INTERVAL);
+}
+
+function renderAnytime() {
+    if (!anytime) return;
+    anytime.timer = null;
+    if (!anytime.pending) return;
+    const routes = anytime.pending.map(route => route.map(node => anytime.nodes[node - 1]));
+    anytime.pending = null;
+    displayResults(routes, anytime.capacity, null, true);
+}
+
+function updateAnytimeStatus(message) {
+    const gain = anytime.initial > 0 ? (1 - message.distance / anytime.initial) * 100 : 0;
+    document.getElementById('anytimeText').textContent =
+        `${(message.elapsed / 1000).toFixed(1)}s / ${anytime.budget}s · ${message.distance.toFixed(2)} km ` +
+        `(-${Math.max(0, gain).toFixed(1)}%) · ${anytime.improvements} improvements · ${message.iterations} iterations`;
+}
+
+// Arrêt : la meilleure solution déjà reçue reste affichée
+function finishAnytime(reason) {
+    if (!anytime) return;
+    const run = anytime;
+    run.worker.terminate();
+    clearTimeout(run.timer);
+    run.timer = null;
+    renderAnytime();
+    renderTimings();
+    anytime = null;
+    document.getElementById('anytimeStatus').style.display = 'none';
+    if (reason === 'error') {
+        showNotification('Background optimization failed; keeping the best routes found', 'error');
+    } else if (reason === 'cancel') {
+        showNotification(`Optimization stopped: kept best of ${run.improvements} improvements`, 'info');
+    } else {
+        showNotification(`Optimization finished: ${run.improvements} improvements found`, 'success');
+    }
+}
+
+function cancelOptimization() {
+    finishAnytime('cancel');
+}
+
+// Charger le plan calculé par le serveur
+function loadServerPlan(plan, timings = null) {
+    cancelOptimization();
+    depot = plan.depot;
+    document.getElementById('depotName').value = depot.name;
+    document.getElementById('depotLat').value = depot.lat;
+    document.getElementById('depotLon').value = depot.lon;
+    document.getElementById('vehicleCapacity').value = plan.capacity;
+    addDepotMarker();
+    
+    deliveries = plan.deliveries.map(d => ({ ...d, addedAt: 'server' }));
+    renderDeliveryMarkers();
+    renderDeliveryList();
+    
+    const byId = new Map(deliveries.map(d => [d.id, d]));
+    const routes = plan.routes.map(route => route.map(id => byId.get(id)));
+    phaseTimings = { ...(timings || plan.timings || {}) };
+    // Flotte multi-dépôts : dépôt, véhicule (capacité) et coût de chaque route
+    const fleet = plan.depots ? plan.routeDepots.map((index, route) => {
+        const home = plan.depots[index];
+        const vehicle = home.vehicles.find(v => v.name === plan.routeVehicles[route]);
+        return {
+            depot: home,
+            vehicle: plan.routeVehicles[route],
+            capacity: vehicle ? vehicle.capacity : plan.capacity,
+            cost: plan.routeCosts[route]
+        };
+    }) : null;
+    displayResults(routes, plan.capacity, plan.routeDistances, false,
+                   plan.schedules && plan.schedules.length ? plan.schedules : null, fleet);
+    const depots = (plan.depots || []).filter(d => d.lat !== depot.lat || d.lon !== depot.lon);
+    fleetDepotMarkers = depots.map(depotMarker);
+    map.fitBounds(L.latLngBounds(deliveries.map(d => [d.lat, d.lon])
+        .concat([[depot.lat, depot.lon]], depots.map(d => [d.lat, d.lon]))));
+    
+    if (plan.unassigned.length > 0) {
+        showNotification(`${plan.unassigned.length} delivery points could not be assigned`, 'warning');
+    }
+}
+
+// Afficher les résultats
+function displayResults(routes, capacity, routeDistances = null, quiet = false, schedules = null, fleet = null) {
+    const renderStart = performance.now();
+    removeRoutePolylines();
+    if (!schedules && !fleet && hasTimeWindows()) schedules = routes.map(routeSchedule);
+    currentResult = { routes, capacity, schedules, fleet };
+    
+    // Calculer les statistiques
+    let totalDistance = 0;
+    let totalDemand = 0;
+    
+    routes.forEach((route, index) => {
+        const color = routeColors[index % routeColors.length];
+        let routeDistance = 0;
+        let routeDemand = 0;
+        
+        // Ajouter le dépôt au début et à la fin
+        const routeWithDepot = [routeDepot(index), ...route, routeDepot(index)];
+        
+        // Tracer la route
+        const latLngs = routeWithDepot.map(point => [point.lat, point.lon]);
+        const polyline = L.polyline(latLngs, {
+            color: color,
+            weight: 4,
+            opacity: 0.8,
+            smoothFactor: 1
+        }).addTo(map);
+        
+        routePolylines.push(polyline);
+        
+        // Calculer la distance (déjà fournie par le solveur serveur)
+        routeDistance = routeDistances ? routeDistances[index] : calculateRouteDistance(route, routeDepot(index));
+        
+        // Calculer la demande
+        routeDemand = route.reduce((sum, point) => sum + point.demand, 0);
+        
+        totalDistance += routeDistance;
+        totalDemand += routeDemand;
+        
+        // Ajouter des marqueurs pour la route (la couche canvas est redessinée en une fois plus bas)
+        if (stopLayer) return;
+        route.forEach((point, pointIndex) => {
+            if (markers[point.id]) {
+                map.removeLayer(markers[point.id]);
+            }
+            
+            const routeIcon = L.divIcon({
+                html: `
+                    <div style="background: ${color}; 
+                                width: 35px; height: 35px; border-radius: 50%; 
+                                display: flex; align-items: center; justify-content: center; 
+                                color: white; font-size: 14px; border: 2px solid white; 
+                                box-shadow: 0 3px 10px rgba(0, 0, 0, 0.2);">
+                        ${pointIndex + 1}
+                    </div>
+                `,
+                className: 'custom-route-icon',
+                iconSize: [35, 35],
+                iconAnchor: [17.5, 35]
+            });
+            
+            markers[point.id] = L.marker([point.lat, point.lon], { icon: routeIcon })
+                .addTo(map)
+                .bindPopup(() => routeStopPopup(point, index, pointIndex));
+        });
+    });
+    
+    if (stopLayer) {
+        stopLayer.setPoints(routes.flatMap((route, index) => route.map((point, pointIndex) => ({
+            lat: point.lat,
+            lon: point.lon,
+            color: routeColors[index % routeColors.length],
+            popup: () => routeStopPopup(point, index, pointIndex)
+        }))));
+    }
+    
+    // Mettre à jour les statistiques
+    const totalCapacity = fleet ? fleet.reduce((sum, route) => sum + route.capacity, 0) : routes.length * capacity;
+    const efficiency = totalDistance > 0 ? Math.round((totalDemand / totalCapacity) * 100) : 0;
+    
+    document.getElementById('statRoutes').textContent = routes.length;
+    document.getElementById('statDistance').textContent = totalDistance.toFixed(2) + ' km';
+    document.getElementById('statDemand').textContent = totalDemand + ' kg';
+    document.getElementById('statEfficiency').textContent = efficiency + '%';
+    
+    // Afficher les panneaux de résultats
+    document.getElementById('statsBar').style.display = 'grid';
+    document.getElementById('resultsPanel').style.display = 'block';
+    
+    // Remplir les cartes de résultats
+    const resultCardsContainer = document.getElementById('resultCardsContainer');
+    resultCardsContainer.innerHTML = '';
+    
+    routes.forEach((route, index) => {
+        const routeDistance = routeDistances ? routeDistances[index] : calculateRouteDistance(route, routeDepot(index));
+        const routeDemand = route.reduce((sum, point) => sum + point.demand, 0);
+        const routeCapacity = fleet ? fleet[index].capacity : capacity;
+        const color = routeColors[index % routeColors.length];
+        
+        const card = document.createElement('div');
+        card.className = 'stat-card';
+        card.innerHTML = `
+            <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 10px;">
+                <div class="color-indicator" style="background: ${color};"></div>
+                <h3 style="color: #333; margin: 0;">Route ${index + 1}</h3>
+            </div>
+            <div class="stat-value">${routeDistance.toFixed(2)} km</div>
+            <div class="stat-label">Distance</div>
+            <div style="margin-top: 15px; font-size: 0.9rem; color: #666;">
+                <div style="display: flex; justify-content: space-between;">
+                    <span>Stops:</span>
+                    <span style="font-weight: 600;">${route.length}</span>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin-top: 5px;">
+                    <span>Demand:</span>
+                    <span style="font-weight: 600;">${routeDemand} / ${routeCapacity} kg</span>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin-top: 5px;">
+                    <span>Utilization:</span>
+                    <span style="font-weight: 600;">${Math.round((routeDemand / routeCapacity) * 100)}%</span>
+                </div>
+                ${fleet ? `
+                <div style="display: flex; justify-content: space-between; margin-top: 5px;">
+                    <span>Vehicle:</span>
+                    <span style="font-weight: 600;">${fleet[index].vehicle} · ${fleet[index].depot.name}</span>
+                </div>
+                <div style="display: flex; justify-content: space-between; margin-top: 5px;">
+                    <span>Cost:</span>
+                    <span style="font-weight: 600;">${fleet[index].cost.toFixed(2)}</span>
+                </div>` : ''}
+            </div>
+        `;
+        resultCardsContainer.appendChild(card);
+    });
+    
+    // Remplir les détails des routes
+    const routesContainer = document.getElementById('routesContainer');
+    routesContainer.innerHTML = '';
+    
+    routes.forEach((route, index) => {
+        const routeDiv = document.createElement('div');
+        routeDiv.className = 'route-item';
+        routeDiv.innerHTML = `
+            <div class="route-number">${index + 1}</div>
+            <div style="flex: 1;">
+                <div style="display: flex; justify-content: space-between; align-items: center; margin-bottom: 10px;">
+                    <h4 style="color: #333; margin: 0;">Route ${index + 1}</h4>
+                    <span style="background: #eef2ff; color: #667eea; padding: 5px 10px; border-radius: 20px; font-size: 0.9rem; font-weight: 600;">
+                        ${route.length} stops
+                    </span>
+                </div>
+                <div style="font-size: 0.9rem; color: #666;">
+                    <div style="display: flex; align-items: center; gap: 5px; margin-bottom: 5px;">
+                        <i class="fas fa-route" style="color: #667eea;"></i>
+                        <span>Distance: <strong>${(routeDistances ? routeDistances[index] : calculateRouteDistance(route, routeDepot(index))).toFixed(2)} km</strong></span>
+                    </div>
+                    <div style="display: flex; align-items: center; gap: 5px;">
+                        <i class="fas fa-weight-hanging" style="color: #10b981;"></i>
+                        <span>Total demand: <strong>${route.reduce((sum, point) => sum + point.demand, 0)} kg</strong></span>
+                    </div>
+                </div>
+                <div style="margin-top: 10px; font-size: 0.85rem; color: #6b7280;">
+                    <strong>Stops:</strong> ${route.map((point, i) => `${i + 1}. ${point.name}`).join(', ')}
+                </div>
+            </div>
+        `;
+        routesContainer.appendChild(routeDiv);
+    });
+    
+    // Remplir les métriques
+    const metricsContainer = document.getElementById('metricsContainer');
+    metricsContainer.innerHTML = `
+        <div style="display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 20px;">
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 12px;">
+                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">Total Distance</div>
+                <div style="font-size: 2rem; font-weight: 700; color: #667eea;">${totalDistance.toFixed(2)} km</div>
+            </div>
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 12px;">
+                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">Average Route Length</div>
+                <div style="font-size: 2rem; font-weight: 700; color: #10b981;">${(totalDistance / routes.length).toFixed(2)} km</div>
+            </div>
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 12px;">
+                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">Vehicle Utilization</div>
+                <div style="font-size: 2rem; font-weight: 700; color: #f59e0b;">${Math.round((totalDemand / (routes.length * capacity)) * 100)}%</div>
+            </div>
+            <div style="background: #f8f9fa; padding: 20px; border-radius: 12px;">
+                <div style="font-size: 0.9rem; color: #666; margin-bottom: 5px;">Stops per Route</div>
+                <div style="font-size: 2rem; font-weight: 700; color: #ef4444;">${Math.round(deliveries.length / routes.length)}</div>
+            </div>
+        </div>
+        <div id="phaseTimings" style="margin-top: 20px;"></div>
+    `;
+    
+    phaseTimings.rendering = performance.now() - renderStart;
+    renderTimings();
+    
+    if (!quiet) showNotification(`Optimization complete: ${routes.length} routes created`, 'success');
+}
+
+// Durées par phase dans l'onglet Metrics, et en données structurées pour les journaux
+function renderTimings() {
+    window.vrpTimings = { ...phaseTimings };
+    console.info('VRP phase timings (ms)', window.vrpTimings);
+    const container = document.getElementById('phaseTimings');
+    if (!container) return;
+    const phases = Object.keys(PHASE_LABELS).filter(phase => phaseTimings[phase] !== undefined);
+    const total = phases.reduce((sum, phase) => sum + phaseTimings[phase], 0);
+    container.innerHTML = `
+        <div style="font-weight: 600; color: #333; margin-bottom: 10px;">
+            <i class="fas fa-stopwatch"></i> Phase Timings (${total.toFixed(1)} ms)
+        </div>
+        ${phases.map(phase => `
+            <div style="display: flex; align-items: center; gap: 10px; margin-bottom: 6px; font-size: 0.9rem;">
+                <div style="width: 160px; color: #666;">${PHASE_LABELS[phase]}</div>
+                <div style="flex: 1; background: #f0f0f0; border-radius: 6px; height: 10px; overflow: hidden;">
+                    <div style="width: ${total > 0 ? (100 * phaseTimings[phase] / total).toFixed(1) : 0}%; background: #667eea; height: 100%;"></div>
+                </div>
+                <div style="width: 90px; text-align: right; font-weight: 600;">${phaseTimings[phase].toFixed(1)} ms</div>
+            </div>
+        `).join('')}
+    `;
+}
+
+// Calculer la distance d'une route
+function calculateRouteDistance(route, start = depot) {
+    if (route.length === 0) return 0;
+    
+    let distance = calculateDistance(start.lat, start.lon, route[0].lat, route[0].lon);
+    
+    for (let i = 0; i < route.length - 1; i++) {
+        distance += calculateDistance(route[i].lat, route[i].lon, route[i + 1].lat, route[i + 1].lon);
+    }
+    
+    distance += calculateDistance(route[route.length - 1].lat, route[route.length - 1].lon, start.lat, start.lon);
+    
+    return distance;
+}
+
+// Télécharger un contenu via un Blob (pas de data: URI)
+function downloadFile(content, filename, type) {
+    const url = URL.createObjectURL(new Blob([content], { type }));
+    const link = document.createElement('a');
+    link.href = url;
+    link.download = filename;
+    document.body.appendChild(link);
+    link.click();
+    document.body.removeChild(link);
+    setTimeout(() => URL.revokeObjectURL(url), 1000);
+}
+
+function csvField(value) {
+    const text = String(value);
+    return /[",\n]/.test(text) ? '"' + text.replace(/"/g, '""') + '"' : text;
+}
+
+// Lignes d'export : dépôt, arrêts puis retour au dépôt, avec distance et charge cumulées
+function routeRows(routes, schedules = null, fleet = null) {
+    const rows = [];
+    routes.forEach((route, routeIndex) => {
+        const path = [routeDepot(routeIndex), ...route, routeDepot(routeIndex)];
+        let distance = 0;
+        let load = 0;
+        path.forEach((point, stop) => {
+            const leg = stop === 0 ? 0 : calculateDistance(path[stop - 1].lat, path[stop - 1].lon, point.lat, point.lon);
+            const isDepot = stop === 0 || stop === path.length - 1;
+            distance += leg;
+            load += isDepot ? 0 : point.demand;
+            rows.push([
+                routeIndex + 1, stop, isDepot ? '' : point.id, point.name, isDepot ? 'depot' : 'delivery',
+                point.lat, point.lon, isDepot ? 0 : point.demand, leg.toFixed(4), distance.toFixed(4), load,
+                ...(fleet ? [fleet[routeIndex].vehicle] : []),
+                ...(schedules ? [formatClock(schedules[routeIndex][stop])] : [])
+            ]);
+        });
+    });
+    return rows;
+}
+
+// Exporter les routes (CSV par arrêt ou GeoJSON de LineStrings) ; Parquet depuis la barre latérale
+function exportRoutes(format = 'csv') {
+    if (!currentResult || currentResult.routes.length === 0) {
+        showNotification('No routes to export', 'error');
+        return;
+    }
+    const routes = currentResult.routes;
+    
+    if (format === 'geojson') {
+        const features = routes.map((route, index) => {
+            const start = routeDepot(index);
+            const path = [start, ...route, start];
+            const fleet = currentResult.fleet;
+            return {
+                type: 'Feature',
+                geometry: { type: 'LineString', coordinates: path.map(point => [point.lon, point.lat]) },
+                properties: {
+                    route: index + 1,
+                    stops: route.length,
+                    ids: route.map(point => point.id),
+                    distance_km: calculateRouteDistance(route, start),
+                    load_kg: route.reduce((sum, point) => sum + point.demand, 0),
+                    ...(fleet ? { depot: start.name, vehicle: fleet[index].vehicle, cost: fleet[index].cost } : {})
+                }
+            };
+        });
+        downloadFile(JSON.stringify({ type: 'FeatureCollection', features }), 'optimized_routes.geojson', 'application/geo+json');
+        showNotification('Routes exported to GeoJSON', 'success');
+        return;
+    }
+    
+    const header = ['Route', 'Stop', 'Id', 'Name', 'Type', 'Latitude', 'Longitude', 'Demand(kg)',
+                    'Leg(km)', 'CumulativeDistance(km)', 'CumulativeLoad(kg)'];
+    const schedules = currentResult.schedules;
+    const fleet = currentResult.fleet;
+    if (fleet) header.push('Vehicle');
+    if (schedules) header.push('Time');
+    const lines = [header, ...routeRows(routes, schedules, fleet)].map(row => row.map(csvField).join(','));
+    downloadFile(lines.join('\n') + '\n', 'optimized_routes.csv', 'text/csv;charset=utf-8');
+    showNotification('Routes exported to CSV', 'success');
+}
+
+// Opération locale à transmettre à Python
+function pushOp(op) {
+    sync.outbox.push({ ...op, seq: ++sync.seq });
+    clearTimeout(sync.timer);
+    sync.timer = setTimeout(sendSync, SYNC_DELAY);
+}
+
+function sendSync() {
+    clearTimeout(sync.timer);
+    Streamlit.setComponentValue({
+        revision: sync.revision,
+        planRevision: sync.planRevision,
+        seq: sync.seq,
+        poll: sync.poll,
+        ops: sync.outbox
+    });
+}
+
+// Rejoue localement une opération pas encore appliquée côté Python
+function replayOp(op) {
+    if (op.op === 'add' && !deliveries.some(d => d.id == op.id)) {
+        const { op: _, seq, ...delivery } = op;
+        deliveries.push(delivery);
+    } else if (op.op === 'remove') {
+        deliveries = deliveries.filter(d => d.id != op.id);
+    } else if (op.op === 'clear') {
+        deliveries = [];
+    }
+}
+
+// Livraisons du plan Python (import, barre latérale) : remplacent la liste locale
+function loadDeliveries(list) {
+    cancelOptimization();
+    removeRoutePolylines();
+    document.getElementById('resultsPanel').style.display = 'none';
+    document.getElementById('statsBar').style.display = 'none';
+    deliveries = list.map(d => ({ ...d, addedAt: 'server' }));
+    sync.outbox.forEach(replayOp);
+    renderDeliveryMarkers();
+    renderDeliveryList();
+}
+
+// Dépôt et flotte de la barre latérale, appliqués seulement quand ils changent
+function applyParams(params) {
+    const first = sync.params === null;
+    sync.params = JSON.stringify(params);
+    const { name, lat, lon } = params.depot;
+    if (name !== depot.name || lat !== depot.lat || lon !== depot.lon) {
+        depot = { ...depot, name, lat, lon };
+        document.getElementById('depotName').value = name;
+        document.getElementById('depotLat').value = lat;
+        document.getElementById('depotLon').value = lon;
+        addDepotMarker();
+        if (first) map.setView([lat, lon], 13);
+    }
+    document.getElementById('vehicleCapacity').value = params.capacity;
+    document.getElementById('maxVehicles').value = params.maxVehicles;
+}
+
+function renderArgs(args) {
+    let acknowledge = false;
+    // Une carte rechargée reprend la numérotation après la dernière opération appliquée
+    sync.seq = Math.max(sync.seq, args.seq || 0);
+    sync.outbox = sync.outbox.filter(op => op.seq > (args.seq || 0));
+    if (args.params && JSON.stringify(args.params) !== sync.params) applyParams(args.params);
+    if (args.geocoded) receiveGeocodes(args.geocoded);
+    // Révision inconnue sans contenu (carte remontée) : la confirmation à null redemande l'envoi complet
+    if (args.revision !== sync.revision) {
+        if (args.deliveries) loadDeliveries(args.deliveries);
+        sync.revision = args.deliveries ? args.revision : null;
+        acknowledge = true;
+    }
+    if (args.planRevision !== sync.planRevision) {
+        if (args.plan) loadServerPlan(JSON.parse(args.plan), args.timings);
+        sync.planRevision = args.plan ? args.planRevision : null;
+        acknowledge = true;
+    }
+    if (acknowledge) sendSync();
+}
+
+// Styles de la page Streamlit : feuille statique liée une seule fois au document parent (même origine)
+function linkPageStyles() {
+    try {
+        const page = window.parent.document;
+        if (page.getElementById('vrp-page-styles')) return;
+        const link = page.createElement('link');
+        link.id = 'vrp-page-styles';
+        link.rel = 'stylesheet';
+        link.href = new URL('page.css', window.location.href).href;
+        page.head.appendChild(link);
+    } catch (error) {
+        // Page d'une autre origine : elle garde le thème Streamlit par défaut
+    }
+}
+
+window.onload = function() {
+    document.getElementById('deliveryList').addEventListener('scroll', scheduleDeliveryWindow);
+    initMap();
+    linkPageStyles();
+    Streamlit.onRender(renderArgs);
+    Streamlit.ready();
+    new ResizeObserver(() => Streamlit.setFrameHeight()).observe(document.body);
+    showNotification('VRP Route Optimizer ready. Add delivery points and optimize routes!', 'info');
+};
@@ -0,0 +1,35 @@
+// Protocole des composants Streamlit (postMessage avec la page parente), sans dépendance npm :
+// componentReady au chargement, render à chaque exécution du script Python,
+// setComponentValue pour renvoyer une valeur (déclenche une réexécution), setFrameHeight.
+const Streamlit = (() => {
+    const API_VERSION = 1;
+    const listeners = [];
+    let lastHeight = null;
+
+    function send(type, data = {}) {
+        window.parent.postMessage({ isStreamlitMessage: true, type, ...data }, '*');
+    }
+
+    window.addEventListener('message', event => {
+        const message = event.data;
+        if (!message || message.type !== 'streamlit:render') return;
+        listeners.forEach(listener => listener(message.args || {}, message));
+    });
+
+    return {
+        onRender(listener) {
+            listeners.push(listener);
+        },
+        ready() {
+            send('streamlit:componentReady', { apiVersion: API_VERSION });
+        },
+        setComponentValue(value) {
+            send('streamlit:setComponentValue', { value, dataType: 'json' });
+        },
+        setFrameHeight(height = document.documentElement.scrollHeight) {
+            if (height === lastHeight) return;
+            lastHeight = height;
+            send('streamlit:setFrameHeight', { height });
+        }
+    };
+})();
@@ -0,0 +1,136 @@
+import argparse
+import hashlib
+import re
+import sys
+from pathlib import Path
+
+
+# Répertoire servi par le composant de carte
+FRONTEND = Path(__file__).resolve().parent
+
+# Fichiers dont les classes fa-* sont relevées (les noms d'icônes y figurent en entier)
+SOURCES = ("*.html", "*.js")
+
+# Feuille générée, chargée par index.html (petite, servie avec le reste de l'application)
+ICONS_CSS = "icons.css"
+
+# Règle d'une icône dans la feuille complète de Font Awesome : .fa-route::before { content: "\f4d7"; }
+_ICON_RULE = re.compile(r"\.fa-([a-z0-9-]+)::before\s*\{\s*content:\s*\"\\([0-9a-f]+)\"", re.IGNORECASE)
+
+_VERSION = re.compile(r"Font Awesome Free ([\d.]+)")
+
+_CSS = """/* Font Awesome Free {version} (https://fontawesome.com/license/free), sous-ensemble des icônes utilisées.
+   Généré par frontend/subset_icons.py : ne pas modifier à la main. */
+@font-face {{
+    font-family: 'Font Awesome 6 Free';
+    font-style: normal;
+    font-weight: 900;
+    font-display: block;
+    src: url('{font}') format('woff2');
+}}
+
+.fas {{
+    -moz-osx-font-smoothing: grayscale;
+    -webkit-font-smoothing: antialiased;
+    display: inline-block;
+    font-family: 'Font Awesome 6 Free';
+    font-style: normal;
+    font-variant: normal;
+    font-weight: 900;
+    line-height: 1;
+    text-rendering: auto;
+}}
+
+.fa-spin {{
+    animation: fa-spin 2s linear infinite;
+}}
+
+@keyframes fa-spin {{
+    0% {{ transform: rotate(0deg); }}
+    100% {{ transform: rotate(360deg); }}
+}}
+
+@media (prefers-reduced-motion: reduce) {{
+    .fa-spin {{ animation: none; }}
+}}
+
+{icons}
+"""
+
+
+def used_icons(root=FRONTEND):
+    """Noms des classes fa-* présentes dans les sources de l'interface (modificateurs compris)."""
+    names = set()
+    for pattern in SOURCES:
+        for path in root.glob(pattern):
+            names.update(re.findall(r"\bfa-([a-z0-9-]+)", path.read_text(encoding="utf-8")))
+    return names
+
+
+def subset_icons(fontawesome, root=FRONTEND):
+    """Écrit le sous-ensemble de fa-solid-900 limité aux icônes utilisées et sa feuille icons.css.
+
+    `fontawesome` est le répertoire de Font Awesome Free (css/all.css et
+    webfonts/fa-solid-900.ttf). La police est nommée d'après son contenu sous
+    vendor/fontawesome-<version>/ : une URL ne change jamais de contenu, ce qui
+    permet de la servir comme immuable. Retourne {icône: point de code}.
+    """
+    from fontTools import subset
+
+    fontawesome = Path(fontawesome)
+    stylesheet = (fontawesome / "css" / "all.css").read_text(encoding="utf-8")
+    version = _VERSION.search(stylesheet)
+    if version is None:
+        raise ValueError(f"Not a Font Awesome Free stylesheet: {fontawesome / 'css' / 'all.css'}")
+    codepoints = {}
+    for name, code in _ICON_RULE.findall(stylesheet):
+        codepoints.setdefault(name, int(code, 16))
+    icons = {name: codepoints[name] for name in sorted(used_icons(root)) if name in codepoints}
+    if not icons:
+        raise ValueError("No Font Awesome icons found in the frontend sources")
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = []
+    options.name_IDs = [0, 1, 2, 5, 6]
+    font = subset.load_font(str(fontawesome / "webfonts" / "fa-solid-900.ttf"), options)
+    subsetter = subset.Subsetter(options)
+    subsetter.populate(unicodes=set(icons.values()))
+    subsetter.subset(font)
+    target = root / "vendor" / f"fontawesome-{version.group(1)}"
+    target.mkdir(parents=True, exist_ok=True)
+    staging = target / "fa-solid-900.woff2"
+    subset.save_font(font, str(staging), options)
+    data = staging.read_bytes()
+    staging.unlink()
+    name = f"fa-solid-900.{hashlib.sha1(data).hexdigest()[:10]}.woff2"
+    for previous in target.glob("fa-solid-900.*.woff2"):
+        if previous.name != name:
+            previous.unlink()
+    (target / name).write_bytes(data)
+
+    rules = "\n".join(f'.fa-{icon}::before {{ content: "\\{code:x}"; }}' for icon, code in icons.items())
+    css = _CSS.format(version=version.group(1), font=(target / name).relative_to(root).as_posix(), icons=rules)
+    (root / ICONS_CSS).write_text(css, encoding="utf-8")
+    return icons
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python frontend/subset_icons.py",
+        description="Subset the Font Awesome solid font to the icons used by the map frontend "
+                    "(requires fonttools and brotli).",
+    )
+    parser.add_argument("fontawesome", help="Font Awesome Free directory (with css/all.css and webfonts/)")
+    args = parser.parse_args(argv)
+    try:
+        icons = subset_icons(args.fontawesome)
+    except (OSError, ValueError) as error:
+        print(error, file=sys.stderr)
+        return 1
+    print(f"{len(icons)} icons: {', '.join(icons)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
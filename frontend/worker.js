@@ -0,0 +1,325 @@
+// Matrice complète sous cette taille, distances calculées à la volée au-delà
+const MATRIX_NODES = 2500;
+const NEIGHBORS = 15;
+const PROGRESS_INTERVAL = 200;
+
+let lat, lon, demand, capacity, maxVehicles, size, matrix, cosLat;
+// Fenêtres horaires en minutes (ready = null sans fenêtres) et vitesse en km/h
+let ready = null, due, service, speed;
+
+function haversine(i, j) {
+    const dLat = lat[j] - lat[i];
+    const dLon = lon[j] - lon[i];
+    const a = Math.sin(dLat / 2) ** 2 + cosLat[i] * cosLat[j] * Math.sin(dLon / 2) ** 2;
+    return 12742 * Math.atan2(Math.sqrt(a), Math.sqrt(1 - a));
+}
+
+function dist(i, j) {
+    return matrix ? matrix[i * size + j] : haversine(i, j);
+}
+
+function travel(i, j) {
+    return dist(i, j) * 60 / speed;
+}
+
+// Début de service au plus tôt (passe avant) et au plus tard (passe arrière) de chaque
+// position : 0 = départ du dépôt, p + 1 = route[p], route.length + 1 = retour au dépôt
+function schedule(route) {
+    if (!ready) return null;
+    const n = route.length;
+    const node = p => (p === 0 || p === n + 1) ? 0 : route[p - 1];
+    const earliest = new Float64Array(n + 2);
+    const latest = new Float64Array(n + 2);
+    earliest[0] = ready[0];
+    for (let p = 1; p <= n + 1; p++) {
+        const prev = node(p - 1), v = node(p);
+        earliest[p] = Math.max(ready[v], earliest[p - 1] + service[prev] + travel(prev, v));
+    }
+    latest[n + 1] = due[0];
+    for (let p = n; p >= 0; p--) {
+        const v = node(p), next = node(p + 1);
+        latest[p] = Math.min(due[v], latest[p + 1] - travel(v, next) - service[v]);
+    }
+    return { earliest, latest };
+}
+
+// u inséré avant route[p] : raccord du préfixe (au plus tôt) au suffixe (au plus tard), en O(1)
+function insertionFits(route, times, p, u) {
+    if (!ready) return true;
+    const prev = p === 0 ? 0 : route[p - 1];
+    const next = p === route.length ? 0 : route[p];
+    const start = Math.max(ready[u], times.earliest[p] + service[prev] + travel(prev, u));
+    return start <= due[u] + 1e-9 && start + service[u] + travel(u, next) <= times.latest[p + 1] + 1e-9;
+}
+
+// route[p] retiré, en O(1)
+function removalFits(route, times, p) {
+    if (!ready) return true;
+    const prev = p === 0 ? 0 : route[p - 1];
+    const next = p === route.length - 1 ? 0 : route[p + 1];
+    return times.earliest[p] + service[prev] + travel(prev, next) <= times.latest[p + 2] + 1e-9;
+}
+
+// route[i..j] inversé : le segment est simulé, le suffixe vérifié en O(1)
+function reversalFits(route, times, i, j) {
+    if (!ready) return true;
+    let prev = i === 0 ? 0 : route[i - 1];
+    let time = times.earliest[i];
+    for (let k = j; k >= i; k--) {
+        const v = route[k];
+        time = Math.max(ready[v], time + service[prev] + travel(prev, v));
+        if (time > due[v] + 1e-9) return false;
+        prev = v;
+    }
+    const next = j === route.length - 1 ? 0 : route[j + 1];
+    return time + service[prev] + travel(prev, next) <= times.latest[j + 2] + 1e-9;
+}
+
+function routeLength(route) {
+    if (route.length === 0) return 0;
+    let total = dist(0, route[0]) + dist(route[route.length - 1], 0);
+    for (let i = 0; i < route.length - 1; i++) total += dist(route[i], route[i + 1]);
+    return total;
+}
+
+function totalLength(routes) {
+    return routes.reduce((sum, route) => sum + routeLength(route), 0);
+}
+
+function neighborLists() {
+    const lists = [];
+    const row = new Float64Array(size);
+    for (let i = 1; i < size; i++) {
+        for (let j = 1; j < size; j++) row[j] = j === i ? Infinity : dist(i, j);
+        const best = [];
+        for (let j = 1; j < size; j++) {
+            if (best.length < NEIGHBORS || row[j] < row[best[best.length - 1]]) {
+                let k = Math.min(best.length, NEIGHBORS - 1);
+                best[k] = j;
+                while (k > 0 && row[best[k - 1]] > row[j]) {
+                    best[k] = best[k - 1];
+                    best[k - 1] = j;
+                    k--;
+                }
+            }
+        }
+        lists[i] = best.filter(j => row[j] < Infinity);
+    }
+    return lists;
+}
+
+// 2-opt intra-route (première amélioration)
+function twoOpt(route, deadline) {
+    let times = schedule(route);
+    let improved = true;
+    while (improved && Date.now() < deadline) {
+        improved = false;
+        for (let i = 0; i < route.length - 1; i++) {
+            const a = i === 0 ? 0 : route[i - 1];
+            const b = route[i];
+            for (let j = i + 1; j < route.length; j++) {
+                const c = route[j];
+                const d = j === route.length - 1 ? 0 : route[j + 1];
+                if (dist(a, c) + dist(b, d) < dist(a, b) + dist(c, d) - 1e-9 && reversalFits(route, times, i, j)) {
+                    let lo = i, hi = j;
+                    while (lo < hi) {
+                        const tmp = route[lo];
+                        route[lo++] = route[hi];
+                        route[hi--] = tmp;
+                    }
+                    times = schedule(route);
+                    improved = true;
+                    break;
+                }
+            }
+            if (improved) break;
+        }
+    }
+}
+
+// Coût minimal d'insertion de u dans une route, autour de ses voisins
+function bestInsertion(u, routes, loads, routeOf, pos, neighbors, exclude, times) {
+    let best = null;
+    const tryAt = (r, p) => {
+        if (r === exclude || loads[r] + demand[u] > capacity) return;
+        const route = routes[r];
+        if (ready && !insertionFits(route, times[r], p, u)) return;
+        const prev = p === 0 ? 0 : route[p - 1];
+        const next = p === route.length ? 0 : route[p];
+        const delta = dist(prev, u) + dist(u, next) - dist(prev, next);
+        if (!best || delta < best.delta) best = { route: r, position: p, delta };
+    };
+    for (const v of neighbors[u]) {
+        const r = routeOf[v];
+        if (r < 0) continue;
+        tryAt(r, pos[v]);
+        tryAt(r, pos[v] + 1);
+    }
+    return best;
+}
+
+function indexRoutes(routes, routeOf, pos) {
+    routeOf.fill(-1);
+    routes.forEach((route, r) => route.forEach((u, p) => { routeOf[u] = r; pos[u] = p; }));
+}
+
+// Relocalisation inter-routes sur les listes de voisins
+function relocate(routes, loads, neighbors, deadline) {
+    const routeOf = new Int32Array(size);
+    const pos = new Int32Array(size);
+    indexRoutes(routes, routeOf, pos);
+    const times = routes.map(schedule);
+    let improved = true;
+    while (improved && Date.now() < deadline) {
+        improved = false;
+        for (let u = 1; u < size; u++) {
+            const r = routeOf[u];
+            if (r < 0) continue;
+            const route = routes[r];
+            const p = pos[u];
+            const prev = p === 0 ? 0 : route[p - 1];
+            const next = p === route.length - 1 ? 0 : route[p + 1];
+            const gain = dist(prev, u) + dist(u, next) - dist(prev, next);
+            if (ready && !removalFits(route, times[r], p)) continue;
+            const target = bestInsertion(u, routes, loads, routeOf, pos, neighbors, r, times);
+            if (!target || target.delta >= gain - 1e-9) continue;
+            route.splice(p, 1);
+            routes[target.route].splice(target.position, 0, u);
+            loads[r] -= demand[u];
+            loads[target.route] += demand[u];
+            route.forEach((v, q) => { pos[v] = q; });
+            routes[target.route].forEach((v, q) => { routeOf[v] = target.route; pos[v] = q; });
+            times[r] = schedule(route);
+            times[target.route] = schedule(routes[target.route]);
+            improved = true;
+        }
+    }
+}
+
+function localSearch(routes, loads, neighbors, deadline) {
+    routes.forEach(route => twoOpt(route, deadline));
+    relocate(routes, loads, neighbors, deadline);
+    routes.forEach(route => twoOpt(route, deadline));
+}
+
+// Ruine et reconstruction : retire des clients voisins puis les réinsère au moindre coût
+function perturb(routes, loads, neighbors) {
+    const served = [];
+    routes.forEach(route => route.forEach(u => served.push(u)));
+    if (served.length < 2) return false;
+    const isServed = new Set(served);
+    const count = Math.max(2, Math.min(30, Math.round(served.length * 0.1)));
+    const seed = served[Math.floor(Math.random() * served.length)];
+    const removed = new Set([seed]);
+    for (const v of neighbors[seed]) {
+        if (removed.size >= count) break;
+        if (isServed.has(v) && Math.random() < 0.8) removed.add(v);
+    }
+    routes.forEach((route, r) => {
+        const kept = route.filter(u => !removed.has(u));
+        route.length = 0;
+        route.push(...kept);
+        loads[r] = kept.reduce((sum, u) => sum + demand[u], 0);
+    });
+    
+    const routeOf = new Int32Array(size);
+    const pos = new Int32Array(size);
+    const times = routes.map(schedule);
+    const order = [...removed].sort(() => Math.random() - 0.5);
+    for (const u of order) {
+        indexRoutes(routes, routeOf, pos);
+        let target = bestInsertion(u, routes, loads, routeOf, pos, neighbors, -1, times);
+        if (!target) {
+            // Aucun voisin inséré : toutes les positions, puis une nouvelle route si la flotte le permet
+            routes.forEach((route, r) => {
+                if (loads[r] + demand[u] > capacity) return;
+                for (let p = 0; p <= route.length; p++) {
+                    if (ready && !insertionFits(route, times[r], p, u)) continue;
+                    const prev = p === 0 ? 0 : route[p - 1];
+                    const next = p === route.length ? 0 : route[p];
+                    const delta = dist(prev, u) + dist(u, next) - dist(prev, next);
+                    if (!target || delta < target.delta) target = { route: r, position: p, delta };
+                }
+            });
+        }
+        if (!target) {
+            if (routes.length >= maxVehicles || (ready && !insertionFits([], schedule([]), 0, u))) return false;
+            routes.push([]);
+            loads.push(0);
+            times.push(null);
+            target = { route: routes.length - 1, position: 0 };
+        }
+        routes[target.route].splice(target.position, 0, u);
+        loads[target.route] += demand[u];
+        times[target.route] = schedule(routes[target.route]);
+    }
+    return true;
+}
+
+function copyRoutes(routes) {
+    return routes.map(route => route.slice());
+}
+
+self.onmessage = function(event) {
+    const data = event.data;
+    const start = Date.now();
+    const deadline = start + data.budget * 1000;
+    lat = Float64Array.from(data.lat, v => v * Math.PI / 180);
+    lon = Float64Array.from(data.lon, v => v * Math.PI / 180);
+    cosLat = lat.map(Math.cos);
+    demand = Float64Array.from(data.demand);
+    capacity = data.capacity;
+    maxVehicles = data.maxVehicles;
+    ready = data.ready ? Float64Array.from(data.ready) : null;
+    due = data.due ? Float64Array.from(data.due) : null;
+    service = data.service ? Float64Array.from(data.service) : null;
+    speed = data.speed;
+    size = lat.length;
+    matrix = null;
+    if (size <= MATRIX_NODES) {
+        matrix = new Float64Array(size * size);
+        for (let i = 0; i < size; i++) {
+            for (let j = i + 1; j < size; j++) {
+                matrix[i * size + j] = matrix[j * size + i] = haversine(i, j);
+            }
+        }
+    }
+    const neighbors = neighborLists();
+    self.postMessage({ type: 'ready', matrix: Date.now() - start });
+    
+    let best = copyRoutes(data.routes);
+    let bestLength = totalLength(best);
+    let iterations = 0;
+    let lastProgress = 0;
+    const loadsOf = routes => routes.map(route => route.reduce((sum, u) => sum + demand[u], 0));
+    
+    const current = copyRoutes(best);
+    localSearch(current, loadsOf(current), neighbors, deadline);
+    
+    let candidate = current;
+    while (true) {
+        iterations++;
+        const candidateRoutes = candidate.filter(route => route.length > 0);
+        const length = totalLength(candidateRoutes);
+        if (length < bestLength - 1e-9) {
+            best = copyRoutes(candidateRoutes);
+            bestLength = length;
+            self.postMessage({ type: 'incumbent', routes: best, distance: bestLength, iterations, elapsed: Date.now() - start });
+        }
+        const now = Date.now();
+        if (now >= deadline) break;
+        if (now - lastProgress >= PROGRESS_INTERVAL) {
+            lastProgress = now;
+            self.postMessage({ type: 'progress', distance: bestLength, iterations, elapsed: now - start });
+        }
+        
+        candidate = copyRoutes(best);
+        const loads = loadsOf(candidate);
+        if (!perturb(candidate, loads, neighbors)) {
+            candidate = best;
+            continue;
+        }
+        localSearch(candidate, loads, neighbors, deadline);
+    }
+    self.postMessage({ type: 'done', distance: bestLength, iterations, elapsed: Date.now() - start });
+};
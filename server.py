@@ -0,0 +1,53 @@
+import runpy
+from pathlib import Path
+
+import streamlit as st
+
+
+# Script de l'application servi par ce point d'entrée
+SCRIPT = Path(__file__).resolve().with_name("vrp.py")
+
+
+# En-tête des fichiers de frontend/vendor : chaque URL porte une version (leaflet-1.9.3/)
+# ou une empreinte de contenu (fa-solid-900.<sha1>.woff2) et ne change donc jamais de contenu
+VENDOR_CACHE_CONTROL = "public, max-age=31536000, immutable"
+
+
+class VendorCacheMiddleware:
+    """Middleware ASGI : cache d'un an, sans revalidation, pour les fichiers vendor/ du composant de carte.
+
+    Streamlit sert les fichiers des composants avec « Cache-Control: public » sans
+    durée ni validateur : le navigateur retélécharge Leaflet et les polices à chaque
+    ouverture de l'application. Les autres réponses ne sont pas modifiées.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "") if scope["type"] == "http" else ""
+        if "/component/" not in path or "/vendor/" not in path:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_cached(message):
+            if message["type"] == "http.response.start" and message["status"] == 200:
+                headers = [(name, value) for name, value in message.get("headers", [])
+                           if name.lower() != b"cache-control"]
+                headers.append((b"cache-control", VENDOR_CACHE_CONTROL.encode("latin-1")))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        await self.app(scope, receive, send_cached)
+
+
+# Point d'entrée de production : `streamlit run server.py` (ou `uvicorn server:app`) sert vrp.py
+# avec les en-têtes de cache ci-dessus ; `streamlit run vrp.py` reste possible, sans eux
+if hasattr(st, "App"):
+    from starlette.middleware import Middleware
+
+    app = st.App(SCRIPT, middleware=[Middleware(VendorCacheMiddleware)])
+elif __name__ == "__main__":
+    # Streamlit < 1.57 (ni st.App ni Starlette) : `streamlit run server.py` exécute vrp.py tel quel,
+    # sans les en-têtes de cache
+    runpy.run_path(str(SCRIPT), run_name="__main__")
@@ -0,0 +1,27 @@
+from .cache import MatrixCache
+from .decompose import solve_clusters
+from .engine import ALGORITHMS, solve
+from .fleet import solve_fleet
+from .geocode import GeocodeCache, Geocoder
+from .matrix import DynamicMatrix, distance_matrix, haversine_matrix
+from .model import Depot, Instance, Solution, VehicleType, plan_payload
+from .plan import DeliveryPlan
+
+__all__ = [
+    "ALGORITHMS",
+    "DeliveryPlan",
+    "Depot",
+    "DynamicMatrix",
+    "GeocodeCache",
+    "Geocoder",
+    "Instance",
+    "MatrixCache",
+    "Solution",
+    "VehicleType",
+    "distance_matrix",
+    "haversine_matrix",
+    "plan_payload",
+    "solve",
+    "solve_clusters",
+    "solve_fleet",
+]
@@ -0,0 +1,269 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import as_completed
+from pathlib import Path
+
+import pandas as pd
+
+from .cache import MatrixCache
+from .decompose import solve_clusters
+from .engine import ALGORITHMS, MATRIX_FREE, solve
+from .fleet import solve_fleet
+from .io import FORMATS, read_deliveries
+from .model import SPEED_KMH, TIME_COLUMNS, Depot, Instance, VehicleType, plan_payload
+from .parallel import process_pool, single_process
+from .plan import MATRIX_LIMIT
+from .road import RoadNetwork, road_matrices
+from .timewindows import parse_time, parse_window
+
+
+# Valeurs par défaut identiques à la barre latérale de l'application
+DEFAULTS = {
+    "depot_name": "Main Depot",
+    "depot_lat": 48.8566,
+    "depot_lon": 2.3522,
+    "capacity": 100.0,
+    "max_vehicles": 3,
+    "depot_open": None,
+    "depot_close": None,
+    "speed": SPEED_KMH,
+}
+
+# Budget de post-optimisation par instance (secondes), comme « Post-optimization Time Limit »
+IMPROVE_TIME = 5.0
+
+# Budget de l'algorithme génétique (secondes), comme le curseur « Time Budget » de la barre latérale
+GENETIC_TIME = 10.0
+
+# Colonnes fixes du résumé ; les durées de phase (<phase>_s) s'insèrent avant "error",
+# dans l'ordre où les solutions les rapportent (matrix, clustering, depot_solves…)
+SUMMARY_COLUMNS = [
+    "instance", "status", "algorithm", "deliveries", "routes", "distance_km", "cost", "load_kg",
+    "unassigned", "seconds", "error",
+]
+
+
+def depot_from_dict(data, index=0):
+    """Depot depuis {"name", "lat", "lon", "open", "close",
+    "vehicles": [{"name", "capacity", "count", "costPerKm", "fixedCost"}]}."""
+    vehicles = [
+        VehicleType(
+            name=str(v.get("name") or f"Vehicle {k + 1}"),
+            capacity=float(v["capacity"]),
+            count=int(v.get("count", 1)),
+            cost_per_km=float(v.get("costPerKm", 1.0)),
+            fixed_cost=float(v.get("fixedCost", 0.0)),
+        )
+        for k, v in enumerate(data.get("vehicles", []))
+    ]
+    hours = {key: parse_time(data[key]) for key in ("open", "close") if data.get(key) is not None}
+    return Depot(str(data.get("name") or f"Depot {index + 1}"), float(data["lat"]), float(data["lon"]),
+                 vehicles, **hours)
+
+
+def instance_from_dict(data, **defaults):
+    """Instance depuis un dictionnaire JSON :
+    {"depot": {"name", "lat", "lon", "open", "close"}, "capacity", "maxVehicles", "speed",
+    "deliveries": [{"id", "name", "lat", "lon", "demand", "ready", "due", "service"}]}.
+
+    Les heures sont en "HH:MM" ou en minutes depuis minuit ; toutes sont optionnelles.
+    Une clé "depots" (voir depot_from_dict) remplace "depot", "capacity" et "maxVehicles"
+    par une flotte multi-dépôts à types de véhicules hétérogènes.
+    """
+    settings = {**DEFAULTS, **defaults}
+    depots = [depot_from_dict(d, index) for index, d in enumerate(data.get("depots", []))]
+    depot = data.get("depot") or ({k: data["depots"][0][k] for k in ("name", "lat", "lon")} if depots else {})
+    deliveries = data.get("deliveries", [])
+    windows = {}
+    for name in TIME_COLUMNS.values():
+        if any(name in d for d in deliveries):
+            windows[name] = [parse_time(d.get(name)) for d in deliveries]
+    for key, name in (("open", "depot_open"), ("close", "depot_close")):
+        value = depot.get(key, settings[name])
+        if value is not None:
+            windows[name] = parse_time(value)
+    windows["speed"] = float(data.get("speed", settings["speed"]))
+    return Instance(
+        depot_lat=float(depot.get("lat", settings["depot_lat"])),
+        depot_lon=float(depot.get("lon", settings["depot_lon"])),
+        lat=[d["lat"] for d in deliveries],
+        lon=[d["lon"] for d in deliveries],
+        demand=[d["demand"] for d in deliveries],
+        capacity=float(data.get("capacity", settings["capacity"])),
+        max_vehicles=int(data.get("maxVehicles", settings["max_vehicles"])),
+        names=[d.get("name") or f"Customer {i + 1}" for i, d in enumerate(deliveries)],
+        ids=[d.get("id", i + 1) for i, d in enumerate(deliveries)],
+        depot_name=depot.get("name", settings["depot_name"]),
+        depots=depots,
+        **windows,
+    )
+
+
+def load_instance(path, **defaults):
+    """Lit une instance : JSON complet (voir instance_from_dict), ou fichier de
+    livraisons (CSV, Excel, Parquet) dont le dépôt et la flotte viennent de `defaults`."""
+    path = Path(path)
+    if path.suffix.lower() == ".json":
+        return instance_from_dict(json.loads(path.read_text(encoding="utf-8")), **defaults)
+    settings = {**DEFAULTS, **defaults}
+    frame, _ = read_deliveries(path)
+    return Instance.from_frame(
+        frame, settings["depot_lat"], settings["depot_lon"], settings["capacity"],
+        settings["max_vehicles"], settings["depot_name"], depot_open=settings["depot_open"],
+        depot_close=settings["depot_close"], speed=settings["speed"],
+    )
+
+
+def solve_instance(instance, algorithm="nearest", improve_time=IMPROVE_TIME, cache=None, matrix=None, workers=1,
+                   genetic_time=GENETIC_TIME, travel=None):
+    """Résout comme l'application : `improve_time` de post-optimisation et, pour "genetic",
+    `genetic_time` de construction, avec les mêmes valeurs par défaut que la barre latérale.
+
+    Une instance multi-dépôts est résolue par solve_fleet, dépôt par dépôt dans ce processus.
+    Au-delà de MATRIX_LIMIT livraisons, l'instance est décomposée en clusters (solve_clusters)
+    résolus sur `workers` processus ; avec une matrice fournie (routière), seule la
+    construction s'applique alors.
+    `travel` donne les temps de trajet (minutes) associés à `matrix` pour les fenêtres horaires.
+    """
+    options = single_process(algorithm, {"time_limit": genetic_time} if algorithm == "genetic" else {})
+    if instance.depots:
+        return solve_fleet(instance, algorithm=algorithm, improve=instance.size <= MATRIX_LIMIT,
+                           improve_time=improve_time, processes=1, **options)
+    if matrix is None and instance.size > MATRIX_LIMIT:
+        return solve_clusters(instance, algorithm=algorithm, improve_time=improve_time, processes=workers, **options)
+    improve = instance.size <= MATRIX_LIMIT
+    if not improve and algorithm not in MATRIX_FREE:
+        raise ValueError(f"{instance.size} deliveries: only matrix-free algorithms are available")
+    if not improve and instance.has_time_windows:
+        raise ValueError(f"{instance.size} deliveries: time windows need a distance matrix (at most {MATRIX_LIMIT})")
+    return solve(instance, algorithm=algorithm, improve=improve, improve_time=improve_time, matrix=matrix,
+                 cache=cache, travel=travel, **options)
+
+
+def find_instances(directory):
+    """Fichiers d'instances reconnus d'un répertoire, triés par nom."""
+    suffixes = {".json", *FORMATS}
+    return sorted(p for p in Path(directory).iterdir() if p.is_file() and p.suffix.lower() in suffixes)
+
+
+def solve_file(path, output, algorithm="nearest", improve_time=IMPROVE_TIME, cache_dir=None, osm=None, workers=1,
+               genetic_time=GENETIC_TIME, **defaults):
+    """Résout une instance et écrit `<output>/<nom>.solution.json` (même format que le plan de la carte).
+
+    Avec `osm`, les distances sont routières (réseau prétraité repris du cache disque) ;
+    `workers` processus résolvent les clusters d'une très grande instance.
+    Retourne la ligne de résumé ; les erreurs sont rapportées, pas levées.
+    """
+    path = Path(path)
+    row = dict.fromkeys(SUMMARY_COLUMNS)
+    row.update(instance=path.name, algorithm=algorithm, status="ok")
+    start = time.perf_counter()
+    try:
+        instance = load_instance(path, **defaults)
+        row["deliveries"] = instance.size
+        cache = MatrixCache(cache_dir) if cache_dir else None
+        matrix, travel = road_matrices(instance, RoadNetwork.load(osm, cache_dir or output)) if osm else (None, None)
+        solution = solve_instance(instance, algorithm, improve_time, cache, matrix, workers, genetic_time, travel)
+
+        payload = plan_payload(instance, solution)
+        target = Path(output) / f"{path.stem}.solution.json"
+        target.write_text(json.dumps(payload, default=str), encoding="utf-8")
+        row.update(
+            routes=len(solution.routes),
+            distance_km=round(solution.distance, 3),
+            cost=round(solution.cost, 3),
+            load_kg=solution.load,
+            unassigned=len(solution.unassigned),
+            **{f"{phase}_s": round(value, 3) for phase, value in solution.timings.items()},
+        )
+    except Exception as error:  # une instance invalide ne doit pas interrompre le lot
+        row.update(status="error", error=f"{type(error).__name__}: {error}")
+    row["seconds"] = round(time.perf_counter() - start, 3)
+    return row
+
+
+def run_batch(directory, output, algorithm="nearest", improve_time=IMPROVE_TIME, processes=None,
+              cache_dir=None, osm=None, genetic_time=GENETIC_TIME, **defaults):
+    """Résout toutes les instances d'un répertoire sur un pool de processus.
+
+    Écrit une solution JSON par instance et `summary.csv` dans `output` ;
+    retourne le tableau de résumé.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}")
+    output = Path(output)
+    output.mkdir(parents=True, exist_ok=True)
+    paths = find_instances(directory)
+    if osm:
+        # Prétraitement unique avant le pool : chaque processus recharge ensuite le cache disque
+        RoadNetwork.load(osm, cache_dir or output)
+    processes = min(processes or os.cpu_count() or 1, max(len(paths), 1))
+
+    rows = []
+    if processes == 1:
+        # Une instance à la fois : les clusters des très grandes instances prennent tous les CPU
+        workers = os.cpu_count() or 1
+        rows = [solve_file(p, output, algorithm, improve_time, cache_dir, osm, workers, genetic_time, **defaults)
+                for p in paths]
+    else:
+        with process_pool(processes) as pool:
+            futures = [pool.submit(solve_file, p, output, algorithm, improve_time, cache_dir, osm,
+                                   genetic_time=genetic_time, **defaults)
+                       for p in paths]
+            rows = [future.result() for future in as_completed(futures)]
+
+    phases = list(dict.fromkeys(key for row in rows for key in row if key not in SUMMARY_COLUMNS))
+    columns = SUMMARY_COLUMNS[:-1] + phases + SUMMARY_COLUMNS[-1:]
+    summary = pd.DataFrame(rows, columns=columns).sort_values("instance", ignore_index=True)
+    summary = summary.astype({"deliveries": "Int64", "routes": "Int64", "unassigned": "Int64"})
+    summary.to_csv(output / "summary.csv", index=False)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m solver",
+        description="Solve every instance file of a directory (JSON, CSV, Excel, Parquet) without the UI.",
+    )
+    parser.add_argument("directory", help="directory containing the instance files")
+    parser.add_argument("-o", "--output", default="solutions", help="output directory (default: %(default)s)")
+    parser.add_argument("-a", "--algorithm", default="nearest", choices=sorted(ALGORITHMS))
+    parser.add_argument("-t", "--time-limit", type=float, default=IMPROVE_TIME,
+                        help="post-optimization budget per instance in seconds (default: %(default)s)")
+    parser.add_argument("--genetic-time", type=float, default=GENETIC_TIME,
+                        help="genetic algorithm budget per instance in seconds (default: %(default)s)")
+    parser.add_argument("-p", "--processes", type=int, default=None,
+                        help="parallel instances (default: CPU count)")
+    parser.add_argument("--cache-dir", default=None, help="distance matrix and road network cache directory")
+    parser.add_argument("--osm", default=None, help="local OSM extract (.osm or .pbf) for road network distances")
+    parser.add_argument("--depot-name", default=DEFAULTS["depot_name"])
+    parser.add_argument("--depot-lat", type=float, default=DEFAULTS["depot_lat"])
+    parser.add_argument("--depot-lon", type=float, default=DEFAULTS["depot_lon"])
+    parser.add_argument("--capacity", type=float, default=DEFAULTS["capacity"],
+                        help="vehicle capacity in kg for delivery files (default: %(default)s)")
+    parser.add_argument("--max-vehicles", type=int, default=DEFAULTS["max_vehicles"],
+                        help="fleet size for delivery files (default: %(default)s)")
+    parser.add_argument("--depot-hours", type=parse_window, default=(None, None), metavar="HH:MM-HH:MM",
+                        help="depot opening hours for time-window instances")
+    parser.add_argument("--speed", type=float, default=DEFAULTS["speed"],
+                        help="average speed in km/h converting distances to travel times (default: %(default)s)")
+    args = parser.parse_args(argv)
+    depot_open, depot_close = (None if pd.isna(value) else value for value in args.depot_hours)
+
+    summary = run_batch(
+        args.directory, args.output, algorithm=args.algorithm, improve_time=args.time_limit,
+        processes=args.processes, cache_dir=args.cache_dir, osm=args.osm, depot_name=args.depot_name,
+        depot_lat=args.depot_lat, depot_lon=args.depot_lon, capacity=args.capacity,
+        max_vehicles=args.max_vehicles, depot_open=depot_open, depot_close=depot_close, speed=args.speed,
+        genetic_time=args.genetic_time,
+    )
+    if summary.empty:
+        print(f"No instance files found in {args.directory}", file=sys.stderr)
+        return 1
+    print(summary.drop(columns="error").to_string(index=False))
+    for row in summary[summary["status"] == "error"].itertuples():
+        print(f"{row.instance}: {row.error}", file=sys.stderr)
+    return int((summary["status"] == "error").any())
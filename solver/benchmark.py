@@ -0,0 +1,199 @@
+import argparse
+import json
+import platform
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .engine import ALGORITHMS, solve
+from .model import Instance
+
+
+# Instances fournies avec le dépôt (Augerat et al., jeu A de CVRPLIB)
+SUITE = Path(__file__).resolve().parent.parent / "benchmarks" / "cvrplib"
+
+# Degrés par unité de coordonnée : les instances EUC_2D sont placées autour de (0, 0)
+# pour que les constructions géométriques (plus proche voisin, balayage) voient le même plan
+COORD_SCALE = 1e-3
+
+# Budget de post-optimisation par défaut (secondes), comme dans la barre latérale
+TIME_LIMIT = 5.0
+
+# Budget de l'algorithme génétique par défaut (secondes), comme le curseur « Time Budget »
+GENETIC_TIME = 10.0
+
+# Valeur optimale / meilleure connue dans le commentaire des fichiers CVRPLIB
+_BKS_PATTERN = re.compile(r"(?:Optimal|Best)\s+value:\s*([\d.]+)", re.IGNORECASE)
+
+
+def read_vrp(path):
+    """Lit un fichier CVRPLIB (.vrp, EUC_2D) ; retourne un dict (coordonnées, demandes, capacité, BKS)."""
+    header, sections, current = {}, {}, None
+    for line in Path(path).read_text().splitlines():
+        line = line.strip()
+        if not line or line == "EOF":
+            continue
+        if line.endswith("SECTION"):
+            current = sections.setdefault(line, [])
+        elif ":" in line and current is None:
+            key, value = line.split(":", 1)
+            header[key.strip()] = value.strip().strip('"')
+        elif current is not None:
+            current.append(line.split())
+
+    if header.get("EDGE_WEIGHT_TYPE") != "EUC_2D":
+        raise ValueError(f"{path}: unsupported EDGE_WEIGHT_TYPE {header.get('EDGE_WEIGHT_TYPE')!r}")
+    coords = np.array([row[1:3] for row in sections["NODE_COORD_SECTION"]], dtype=np.float64)
+    demand = np.array([row[1] for row in sections["DEMAND_SECTION"]], dtype=np.float64)
+    depots = [int(row[0]) for row in sections.get("DEPOT_SECTION", [["1"]]) if int(row[0]) > 0]
+    if depots != [1]:
+        raise ValueError(f"{path}: only single-depot instances with the depot as node 1 are supported")
+    match = _BKS_PATTERN.search(header.get("COMMENT", ""))
+    trucks = re.search(r"-k(\d+)", header.get("NAME", ""))
+    return {
+        "name": header.get("NAME", Path(path).stem),
+        "coords": coords,
+        "demand": demand,
+        "capacity": float(header["CAPACITY"]),
+        "trucks": int(trucks.group(1)) if trucks else None,
+        "bks": float(match.group(1)) if match else None,
+    }
+
+
+def euclidean_matrix(coords):
+    """Distances EUC_2D arrondies à l'entier (convention TSPLIB / CVRPLIB)."""
+    delta = coords[:, None, :] - coords[None, :, :]
+    return np.rint(np.sqrt((delta ** 2).sum(axis=-1)))
+
+
+def to_instance(problem):
+    """Instance du solveur : flotte non bornée, coordonnées planes ramenées en degrés."""
+    coords = problem["coords"] * COORD_SCALE
+    return Instance(
+        depot_lat=float(coords[0, 1]),
+        depot_lon=float(coords[0, 0]),
+        lat=coords[1:, 1],
+        lon=coords[1:, 0],
+        demand=problem["demand"][1:],
+        capacity=problem["capacity"],
+        max_vehicles=len(coords) - 1,
+    )
+
+
+def _solve(problem, instance, algorithm, improve, time_limit, genetic_time, seed):
+    options = {"time_limit": genetic_time, "workers": 1, "seed": seed} if algorithm == "genetic" else {}
+    matrix = euclidean_matrix(problem["coords"])
+    return solve(instance, algorithm=algorithm, improve=improve, improve_time=time_limit, matrix=matrix, **options)
+
+
+def run_one(problem, algorithm, improve=True, time_limit=TIME_LIMIT, seed=0, genetic_time=GENETIC_TIME, memory=True):
+    """Résout une instance et mesure durée, pic mémoire et écart à la BKS.
+
+    La durée et le résultat viennent d'une résolution sans instrumentation ; le pic
+    mémoire d'une seconde résolution sous tracemalloc (qui ralentit fortement le
+    calcul et changerait le résultat à budget fixe), omise si `memory` est faux.
+    """
+    instance = to_instance(problem)
+    start = time.perf_counter()
+    solution = _solve(problem, instance, algorithm, improve, time_limit, genetic_time, seed)
+    seconds = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        tracemalloc.start()
+        try:
+            _solve(problem, instance, algorithm, improve, time_limit, genetic_time, seed)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    bks = problem["bks"]
+    return {
+        "instance": problem["name"],
+        "algorithm": algorithm,
+        "improve": improve,
+        "customers": instance.size,
+        "cost": solution.distance,
+        "bks": bks,
+        "gap_pct": round(100 * (solution.distance - bks) / bks, 3) if bks else None,
+        "vehicles": len(solution.routes),
+        "bks_vehicles": problem["trucks"],
+        "unassigned": len(solution.unassigned),
+        "seconds": round(seconds, 4),
+        "peak_mb": round(peak / 1024 ** 2, 3) if peak is not None else None,
+        **{f"{phase}_s": round(value, 4) for phase, value in solution.timings.items()},
+    }
+
+
+def run_suite(paths, algorithms=None, improve=True, time_limit=TIME_LIMIT, seed=0, genetic_time=GENETIC_TIME,
+              memory=True):
+    """Exécute chaque algorithme sur chaque instance ; retourne un DataFrame de résultats."""
+    problems = [read_vrp(p) for p in paths]
+    rows = [run_one(problem, algorithm, improve, time_limit, seed, genetic_time, memory)
+            for problem in problems for algorithm in (algorithms or list(ALGORITHMS))]
+    return pd.DataFrame(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m solver.benchmark",
+        description="Run the solver algorithms on CVRPLIB instances and report cost, gap, runtime and peak memory.",
+    )
+    parser.add_argument("paths", nargs="*", help=f".vrp files or directories (default: {SUITE})")
+    parser.add_argument("-a", "--algorithm", action="append", choices=sorted(ALGORITHMS),
+                        help="algorithm to run (repeatable; default: all)")
+    parser.add_argument("-t", "--time-limit", type=float, default=TIME_LIMIT,
+                        help="post-optimization budget in seconds (default: %(default)s)")
+    parser.add_argument("--genetic-time", type=float, default=GENETIC_TIME,
+                        help="genetic algorithm budget in seconds (default: %(default)s)")
+    parser.add_argument("--no-improve", action="store_true", help="construction only, no local search")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="skip the second, traced run that measures peak memory")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", default=None, help="write results as JSON (or CSV with a .csv suffix)")
+    args = parser.parse_args(argv)
+
+    paths = []
+    for entry in map(Path, args.paths or [SUITE]):
+        paths.extend(sorted(entry.rglob("*.vrp")) if entry.is_dir() else [entry])
+    if not paths:
+        print("No .vrp instances found", file=sys.stderr)
+        return 1
+
+    results = run_suite(paths, args.algorithm, not args.no_improve, args.time_limit, args.seed, args.genetic_time,
+                        not args.no_memory)
+    if args.output:
+        output = Path(args.output)
+        if output.suffix.lower() == ".csv":
+            results.to_csv(output, index=False)
+        else:
+            output.write_text(json.dumps({
+                "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "python": platform.python_version(),
+                "numpy": np.__version__,
+                "time_limit": args.time_limit,
+                "genetic_time": args.genetic_time,
+                "improve": not args.no_improve,
+                "seed": args.seed,
+                "results": results.to_dict(orient="records"),
+            }, indent=2))
+
+    summary = results.groupby("algorithm").agg(
+        instances=("instance", "count"),
+        mean_gap_pct=("gap_pct", "mean"),
+        max_gap_pct=("gap_pct", "max"),
+        mean_seconds=("seconds", "mean"),
+        max_peak_mb=("peak_mb", "max"),
+    )
+    print(summary.round(3).to_string())
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+
+from .matrix import haversine_matrix
+
+
+# Budget mémoire par défaut du niveau LRU (octets)
+MEMORY_BUDGET = 512 * 1024 ** 2
+
+# Budget disque par défaut (octets) ; les fichiers les plus anciens sont supprimés au-delà
+DISK_BUDGET = 4 * 1024 ** 3
+
+# Part minimale de points déjà connus pour dériver une matrice d'une entrée existante
+REUSE_THRESHOLD = 0.5
+
+# Précision des coordonnées pour l'empreinte (~1 cm)
+DECIMALS = 7
+
+
+def fingerprint(lat, lon):
+    """Empreinte des coordonnées (ordre compris) ; le nœud 0 est le dépôt."""
+    coords = np.round(np.column_stack((lat, lon)).astype(np.float64), DECIMALS)
+    return hashlib.sha1(np.ascontiguousarray(coords).tobytes()).hexdigest()
+
+
+def _point_keys(lat, lon):
+    scaled = np.round(np.column_stack((lat, lon)) * 10 ** DECIMALS).astype(np.int64)
+    return list(map(tuple, scaled.tolist()))
+
+
+class MatrixCache:
+    """Cache de matrices de distances à deux niveaux.
+
+    Un niveau mémoire LRU borné en octets, puis un niveau disque optionnel de
+    fichiers .npy rouverts en mmap (lecture seule). Une instance proche d'une
+    entrée en mémoire (ajouts / suppressions de livraisons) réutilise le bloc
+    commun et ne calcule que les lignes des nouveaux points.
+    """
+
+    def __init__(self, directory=None, max_bytes=MEMORY_BUDGET, disk_max_bytes=DISK_BUDGET):
+        self.directory = Path(directory) if directory else None
+        if self.directory:
+            self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory": 0, "disk": 0, "partial": 0, "miss": 0}
+
+    def matrix(self, instance):
+        return self.get(instance.node_lat(), instance.node_lon())
+
+    def get(self, lat, lon):
+        """Matrice des distances pour ces points, depuis le cache si possible."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        key = fingerprint(lat, lon)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.stats["memory"] += 1
+                return self._entries[key][1]
+
+        matrix = self._load(key)
+        if matrix is not None:
+            self.stats["disk"] += 1
+            self._remember(key, lat, lon, matrix)
+            return matrix
+
+        matrix = self._derive(lat, lon)
+        if matrix is None:
+            self.stats["miss"] += 1
+            matrix = haversine_matrix(lat, lon)
+        else:
+            self.stats["partial"] += 1
+        matrix.setflags(write=False)
+        self._remember(key, lat, lon, matrix)
+        self._store(key, matrix)
+        return matrix
+
+    def _remember(self, key, lat, lon, matrix):
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = ((lat, lon), matrix)
+            self._bytes += matrix.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted.nbytes
+
+    def _derive(self, lat, lon):
+        """Construit la matrice à partir de l'entrée en mémoire partageant le plus de points."""
+        with self._lock:
+            entries = list(self._entries.values())
+        if not entries:
+            return None
+        keys = _point_keys(lat, lon)
+        best, best_index, best_hits = None, None, 0
+        for (old_lat, old_lon), old_matrix in entries:
+            position = {k: i for i, k in enumerate(_point_keys(old_lat, old_lon))}
+            index = np.array([position.get(k, -1) for k in keys])
+            hits = int((index >= 0).sum())
+            if hits > best_hits:
+                best, best_index, best_hits = old_matrix, index, hits
+        if best_hits < REUSE_THRESHOLD * len(keys):
+            return None
+
+        # Réindexation du bloc connu (les nouveaux points pointent provisoirement sur 0)
+        fresh = np.flatnonzero(best_index < 0)
+        source = np.where(best_index >= 0, best_index, 0)
+        matrix = np.asarray(best).take(source, axis=0).take(source, axis=1)
+        if len(fresh):
+            rows = haversine_matrix(lat[fresh], lon[fresh], lat, lon, dtype=best.dtype)
+            matrix[fresh, :] = rows
+            matrix[:, fresh] = rows.T
+        return matrix
+
+    def _path(self, key):
+        return self.directory / f"{key}.npy"
+
+    def _load(self, key):
+        if not self.directory:
+            return None
+        path = self._path(key)
+        try:
+            matrix = np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError, OSError):
+            return None
+        os.utime(path)
+        return matrix
+
+    def _store(self, key, matrix):
+        if not self.directory:
+            return
+        # Écriture atomique : fichier temporaire puis renommage
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            np.save(handle, matrix)
+        os.replace(tmp, self._path(key))
+        self._trim_disk()
+
+    def _trim_disk(self):
+        files = sorted(self.directory.glob("*.npy"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.disk_max_bytes:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
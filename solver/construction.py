@@ -0,0 +1,171 @@
+import numpy as np
+
+from .matrix import nearest_neighbors
+from .model import DEPOT
+from .spatial import GridIndex, project
+
+
+# Au-delà de ce nombre de clients, les économies ne sont calculées que vers les k plus proches voisins
+SAVINGS_NEIGHBORS = 100
+
+
+def nearest_neighbor(matrix, instance):
+    """Plus proche voisin : chaque véhicule part du client le plus proche du dépôt
+    puis enchaîne le client faisable le plus proche, jusqu'à saturation.
+
+    Les requêtes passent par une grille spatiale avec suppression (O(n log n) en
+    pratique) ; la matrice n'est pas utilisée et peut valoir None.
+    """
+    demand = instance.demand
+    capacity = instance.capacity
+    x, y = project(instance.lat, instance.lon, instance.depot_lat, instance.depot_lon)
+    index = GridIndex(x, y, demand)
+    # Les clients dont la demande dépasse la capacité ne peuvent être servis
+    for i in np.flatnonzero(demand > capacity):
+        index.remove(i)
+
+    routes = []
+    while index.count and len(routes) < instance.max_vehicles:
+        current = index.nearest(0.0, 0.0)
+        route, load = [], 0.0
+        while current is not None:
+            index.remove(current)
+            route.append(current + 1)
+            load += demand[current]
+            current = index.nearest(x[current], y[current], capacity - load)
+        routes.append(route)
+
+    return routes
+
+
+def _savings_pairs(matrix, nodes, neighbors):
+    """Paires (i, j) candidates triées par économie d0i + d0j - dij décroissante."""
+    if len(nodes) - 1 <= neighbors:
+        a, b = np.triu_indices(len(nodes), k=1)
+        i, j = nodes[a], nodes[b]
+    else:
+        sub = matrix[np.ix_(np.concatenate(([DEPOT], nodes)), np.concatenate(([DEPOT], nodes)))]
+        near = nearest_neighbors(sub, neighbors)[1:]
+        i = np.repeat(nodes, near.shape[1])
+        j = nodes[near.ravel() - 1]
+        # Dédoublonner (i, j) / (j, i)
+        lo, hi = np.minimum(i, j), np.maximum(i, j)
+        keys = np.unique(lo * matrix.shape[0] + hi)
+        i, j = keys // matrix.shape[0], keys % matrix.shape[0]
+
+    saving = matrix[DEPOT, i] + matrix[DEPOT, j] - matrix[i, j]
+    keep = saving > 0
+    i, j, saving = i[keep], j[keep], saving[keep]
+    order = np.argsort(-saving, kind="stable")
+    return i[order].tolist(), j[order].tolist()
+
+
+def savings(matrix, instance, neighbors=SAVINGS_NEIGHBORS):
+    """Clarke & Wright (version parallèle) : fusion des routes par économies décroissantes.
+
+    Les routes sont suivies par union-find : chaque racine connaît ses deux extrémités
+    et sa charge, une fusion coûte donc O(1) au lieu d'un parcours des routes.
+    """
+    demand = instance.node_demand()
+    capacity = instance.capacity
+    nodes = np.flatnonzero(demand[1:] <= capacity) + 1
+    if len(nodes) == 0:
+        return []
+
+    size = matrix.shape[0]
+    parent = list(range(size))
+    ends = [(v, v) for v in range(size)]
+    load = demand.tolist()
+    links = [[] for _ in range(size)]
+
+    def find(v):
+        while parent[v] != v:
+            parent[v] = parent[parent[v]]
+            v = parent[v]
+        return v
+
+    for i, j in zip(*_savings_pairs(matrix, nodes, neighbors)):
+        # Seules les extrémités de route (degré < 2) peuvent être reliées
+        if len(links[i]) == 2 or len(links[j]) == 2:
+            continue
+        ri, rj = find(i), find(j)
+        if ri == rj or load[ri] + load[rj] > capacity:
+            continue
+        other_i = ends[ri][0] if ends[ri][1] == i else ends[ri][1]
+        other_j = ends[rj][0] if ends[rj][1] == j else ends[rj][1]
+        links[i].append(j)
+        links[j].append(i)
+        parent[rj] = ri
+        ends[ri] = (other_i, other_j)
+        load[ri] += load[rj]
+
+    routes = []
+    for v in nodes.tolist():
+        if find(v) != v:
+            continue
+        # Parcours de la chaîne depuis une extrémité
+        route = [ends[v][0]]
+        previous = None
+        while True:
+            following = [w for w in links[route[-1]] if w != previous]
+            if not following:
+                break
+            previous = route[-1]
+            route.append(following[0])
+        routes.append(route)
+    return routes
+
+
+def polar_angles(instance):
+    """Angles polaires (radians, [-pi, pi]) des livraisons autour du dépôt, en une passe.
+
+    Projection équirectangulaire locale : suffisante pour ordonner les clients autour du dépôt.
+    """
+    x = (instance.lon - instance.depot_lon) * np.cos(np.radians(instance.depot_lat))
+    y = instance.lat - instance.depot_lat
+    return np.arctan2(y, x)
+
+
+def _sequence(matrix, cluster):
+    """Ordonne un groupe de clients par plus proche voisin depuis le dépôt (sous-matrice)."""
+    nodes = np.concatenate(([DEPOT], cluster))
+    sub = matrix[np.ix_(nodes, nodes)]
+    unvisited = np.ones(len(nodes), dtype=bool)
+    unvisited[0] = False
+    current, order = 0, []
+    for _ in range(len(cluster)):
+        candidates = np.flatnonzero(unvisited)
+        current = candidates[np.argmin(sub[current, candidates])]
+        unvisited[current] = False
+        order.append(int(nodes[current]))
+    return order
+
+
+def sweep(matrix, instance):
+    """Balayage : tri des clients par angle autour du dépôt puis découpe en groupes
+    respectant la capacité ; chaque groupe est ensuite ordonné comme un petit TSP."""
+    demand = instance.node_demand()
+    capacity = instance.capacity
+    nodes = np.flatnonzero(demand[1:] <= capacity) + 1
+    if len(nodes) == 0:
+        return []
+
+    angles = polar_angles(instance)[nodes - 1]
+    order = np.argsort(angles, kind="stable")
+    nodes, angles = nodes[order], angles[order]
+
+    # Démarrer le balayage après le plus grand écart angulaire pour ne pas couper un groupe naturel
+    gaps = np.diff(np.concatenate((angles, [angles[0] + 2 * np.pi])))
+    start = (int(np.argmax(gaps)) + 1) % len(nodes)
+    nodes = np.roll(nodes, -start)
+
+    clusters, cluster, load = [], [], 0.0
+    for node, node_demand in zip(nodes.tolist(), demand[nodes].tolist()):
+        if load + node_demand > capacity:
+            clusters.append(cluster)
+            cluster, load = [], 0.0
+        cluster.append(node)
+        load += node_demand
+    clusters.append(cluster)
+
+    return [_sequence(matrix, np.array(c)) for c in clusters]
@@ -0,0 +1,212 @@
+import math
+import os
+import time
+from collections import defaultdict
+from functools import partial
+
+import numpy as np
+
+from .engine import solve
+from .local_search import improve_solution
+from .matrix import distance_matrix
+from .model import DEPOT, build_solution
+from .parallel import process_pool, single_process
+from .spatial import balanced_assignment, kmeans, project, squared_distances
+from .timewindows import TimeWindows
+
+
+# Livraisons visées par cluster : assez peu pour une matrice et une recherche locale par cluster
+CLUSTER_SIZE = 400
+
+# Marge de capacité des clusters (fraction) laissée au rééquilibrage
+CLUSTER_SLACK = 0.1
+
+# Clusters voisins (centres les plus proches) considérés pour la réparation des frontières
+NEIGHBOR_CLUSTERS = 3
+
+# Budget (secondes) de réparation de chaque frontière entre deux clusters
+REPAIR_TIME = 1.0
+
+
+def cluster_deliveries(instance, cluster_size=CLUSTER_SIZE, seed=0):
+    """Partitionne les livraisons en clusters compacts à demande bornée.
+
+    K-moyennes sur les coordonnées projetées, puis rééquilibrage sous une capacité
+    de cluster égale à un nombre entier de véhicules (environ cluster_size
+    livraisons) : les routes d'un cluster se remplissent sans déborder sur ses voisins.
+    Retourne (étiquette de chaque livraison, second cluster le plus proche).
+    """
+    x, y = project(instance.lat, instance.lon, instance.depot_lat, instance.depot_lon)
+    vehicles = max(1, round(cluster_size * float(instance.demand.mean()) / instance.capacity))
+    limit = vehicles * instance.capacity
+    k = max(math.ceil(instance.size / cluster_size),
+            math.ceil(float(instance.demand.sum()) / (limit * (1 - CLUSTER_SLACK))))
+    centers, labels = kmeans(x, y, k, seed=seed)
+    points = np.column_stack((x, y))
+    dist = np.sqrt(squared_distances(points, centers))
+    labels = balanced_assignment(dist, instance.demand, np.full(len(centers), limit), labels)
+    dist[np.arange(instance.size), labels] = np.inf
+    return labels, dist.argmin(axis=1) if len(centers) > 1 else labels
+
+
+def split_fleet(demand, capacity, max_vehicles):
+    """Véhicules de chaque cluster, de somme max_vehicles.
+
+    Chaque cluster reçoit d'abord les véhicules qu'exige sa demande, puis le reste
+    de la flotte au prorata de la demande (plus forts restes) ; si la flotte n'y
+    suffit pas, elle est répartie en entier au prorata de la demande.
+    """
+    demand = np.asarray(demand, dtype=np.float64)
+    need = np.ceil(demand / capacity).astype(np.intp)
+    base = need if need.sum() <= max_vehicles else np.zeros_like(need)
+    spare = max_vehicles - int(base.sum())
+    total = float(demand.sum())
+    quota = spare * (demand / total if total > 0 else np.full(len(demand), 1 / max(len(demand), 1)))
+    extra = np.floor(quota).astype(np.intp)
+    extra[np.argsort(extra - quota, kind="stable")[:spare - int(extra.sum())]] += 1
+    return base + extra
+
+
+def _boundary_rounds(labels, second):
+    """Paires de clusters voisins, regroupées en tours de paires disjointes (réparables en parallèle)."""
+    counts = {}
+    for pair in zip(labels.tolist(), second.tolist()):
+        if pair[0] != pair[1]:
+            pair = tuple(sorted(pair))
+            counts[pair] = counts.get(pair, 0) + 1
+    # Chaque cluster garde ses NEIGHBOR_CLUSTERS frontières les plus peuplées
+    kept = {}
+    for pair, count in sorted(counts.items(), key=lambda item: -item[1]):
+        if kept.get(pair[0], 0) < NEIGHBOR_CLUSTERS or kept.get(pair[1], 0) < NEIGHBOR_CLUSTERS:
+            kept[pair[0]] = kept.get(pair[0], 0) + 1
+            kept[pair[1]] = kept.get(pair[1], 0) + 1
+            counts[pair] = -1
+    rounds = []
+    for pair in (p for p, c in counts.items() if c == -1):
+        for used, pairs in rounds:
+            if pair[0] not in used and pair[1] not in used:
+                break
+        else:
+            used, pairs = set(), []
+            rounds.append((used, pairs))
+        used.update(pair)
+        pairs.append(pair)
+    return [pairs for _, pairs in rounds]
+
+
+def repair_boundary(instance, routes, time_limit=REPAIR_TIME):
+    """Recherche locale inter-routes sur les routes de deux clusters voisins (sous-instance).
+
+    Les routes sont en indices de la sous-instance ; elles ne font que s'améliorer.
+    """
+    matrix = distance_matrix(instance)
+    windows = TimeWindows.from_instance(instance, matrix) if instance.has_time_windows else None
+    routes = improve_solution(matrix, routes, instance.node_demand(), instance.capacity, time_limit=time_limit,
+                              windows=windows)
+    return [r for r in routes if len(r)]
+
+
+def _map(pool, function, jobs):
+    """Applique function à chaque tuple d'arguments, sur le pool s'il existe, résultats dans l'ordre."""
+    if pool is None:
+        return [function(*args) for args in jobs]
+    return [future.result() for future in [pool.submit(function, *args) for args in jobs]]
+
+
+def route_schedules(instance, routes):
+    """Horaires de chaque route, calculés sur la seule matrice de ses nœuds."""
+    schedules = []
+    for route in routes:
+        sub = instance.subset(np.asarray(route) - 1)
+        windows = TimeWindows.from_instance(sub, distance_matrix(sub))
+        schedules.append(windows.schedule([DEPOT, *range(1, len(route) + 1), DEPOT])[0])
+    return schedules
+
+
+def solve_clusters(instance, algorithm="nearest", improve=True, improve_time=None, cluster_size=CLUSTER_SIZE,
+                   repair_time=REPAIR_TIME, processes=None, **options):
+    """Décomposition « cluster d'abord, routes ensuite » pour les très grandes instances.
+
+    Les livraisons sont partitionnées (cluster_deliveries), chaque cluster est
+    résolu comme une instance indépendante sur un pool de `processes` processus
+    (défaut : nombre de CPU), puis les frontières entre clusters voisins sont
+    réparées par paires disjointes, elles aussi en parallèle. Aucune matrice ne
+    dépasse la taille de deux clusters : le temps croît avec n et non n², et se
+    divise par le nombre de cœurs. La flotte max_vehicles est partagée entre
+    clusters (split_fleet) ; un cluster sans véhicule laisse ses livraisons non affectées.
+
+    improve_time (et time_limit pour "genetic") est un budget global : chaque
+    cluster en reçoit sa part, à raison de `processes` clusters résolus à la fois.
+    """
+    timings = {}
+    start = time.perf_counter()
+    labels, second = cluster_deliveries(instance, cluster_size)
+    clusters = [np.flatnonzero(labels == c) for c in range(labels.max() + 1 if instance.size else 0)]
+    clusters = [nodes for nodes in clusters if len(nodes)]
+    fleet = split_fleet([instance.demand[nodes].sum() for nodes in clusters], instance.capacity, instance.max_vehicles)
+    timings["clustering"] = time.perf_counter() - start
+
+    processes = min(processes or os.cpu_count() or 1, max(len(clusters), 1))
+    share = processes / max(len(clusters), 1)
+    if improve_time is not None:
+        improve_time *= share
+    if options.get("time_limit") is not None:
+        options = {**options, "time_limit": options["time_limit"] * share}
+    pool = None
+    if processes > 1:
+        options = single_process(algorithm, options)
+        pool = process_pool(processes)
+    try:
+        start = time.perf_counter()
+        solved = [c for c in range(len(clusters)) if fleet[c]]
+        jobs = [(instance.subset(clusters[c], max_vehicles=int(fleet[c])), algorithm, improve, improve_time)
+                for c in solved]
+        solutions = _map(pool, partial(solve, **options), jobs)
+        # Nœud k d'un cluster -> nœud nodes[k - 1] + 1 de l'instance
+        routes, owner = [], []
+        for c, solution in zip(solved, solutions):
+            routes += [(clusters[c][np.asarray(r) - 1] + 1).tolist() for r in solution.routes]
+            owner += [c] * len(solution.routes)
+        timings["cluster_solves"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if improve and len(clusters) > 1:
+            # Cluster d'origine de chaque livraison (réindexé sur les clusters non vides)
+            index = np.full(labels.max() + 1, -1)
+            index[[labels[nodes[0]] for nodes in clusters]] = np.arange(len(clusters))
+            labels, second = index[labels], index[second]
+            for pairs in _boundary_rounds(labels, second):
+                # Routes frontalières : un client au moins a l'autre cluster pour second plus proche
+                frontier = defaultdict(list)
+                for r, route in enumerate(routes):
+                    for other in np.unique(second[np.asarray(route, dtype=np.intp) - 1]).tolist():
+                        frontier[owner[r], other].append(r)
+                jobs, members = [], []
+                for a, b in pairs:
+                    selected = frontier[a, b] + frontier[b, a]
+                    if len(selected) < 2:
+                        continue
+                    nodes = np.concatenate([routes[r] for r in selected]) - 1
+                    local = np.empty(instance.size, dtype=np.intp)
+                    local[nodes] = np.arange(1, len(nodes) + 1)
+                    jobs.append((instance.subset(nodes), [local[np.asarray(routes[r]) - 1].tolist() for r in selected],
+                                 repair_time))
+                    members.append((nodes, selected))
+                for (nodes, selected), repaired in zip(members, _map(pool, repair_boundary, jobs)):
+                    repaired = [(nodes[np.asarray(r) - 1] + 1).tolist() for r in repaired]
+                    for r, route in zip(selected, repaired + [[]] * (len(selected) - len(repaired))):
+                        routes[r] = route
+                        if route:
+                            # La réparation déplace des clients : la route revient au cluster majoritaire
+                            owner[r] = int(np.bincount(labels[np.asarray(route) - 1]).argmax())
+            routes = [r for r in routes if r]
+        timings["boundary_repair"] = time.perf_counter() - start
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    solution = build_solution(None, instance, [np.asarray(r) for r in routes], algorithm)
+    solution.timings = timings
+    if instance.has_time_windows:
+        solution.schedules = route_schedules(instance, solution.routes)
+    return solution
@@ -0,0 +1,74 @@
+import time
+
+from .construction import nearest_neighbor, savings, sweep
+from .genetic import genetic
+from .local_search import improve_solution
+from .matrix import distance_matrix
+from .model import DEPOT, build_solution
+from .timewindows import TimeWindows, repair_routes
+
+
+# Constructions qui n'ont pas besoin de la matrice complète
+MATRIX_FREE = {"nearest"}
+
+# Algorithmes de construction disponibles (clé = valeur du select "algorithm" de l'interface)
+ALGORITHMS = {
+    "nearest": nearest_neighbor,
+    "savings": savings,
+    "sweep": sweep,
+    "genetic": genetic,
+}
+
+
+def limit_fleet(routes, instance):
+    """Garde les max_vehicles routes les plus chargées ; les autres clients restent non affectés."""
+    if len(routes) <= instance.max_vehicles:
+        return routes
+    demand = instance.node_demand()
+    routes = sorted(routes, key=lambda r: demand[r].sum(), reverse=True)
+    return routes[:instance.max_vehicles]
+
+
+def solve(instance, algorithm="nearest", improve=True, improve_time=None, matrix=None, cache=None, travel=None,
+          **options):
+    """Construit puis améliore un plan sur la matrice des distances de l'instance.
+
+    La post-optimisation (2-opt + Or-opt, puis relocate, swap, 2-opt* et
+    cross-exchange entre routes) s'applique à toute construction ;
+    improve_time la borne en secondes. Les options supplémentaires sont
+    transmises à l'algorithme de construction (par exemple time_limit ou
+    workers pour "genetic"). Avec un MatrixCache, la matrice est reprise du cache.
+    La durée de chaque phase est relevée dans Solution.timings.
+
+    Avec des fenêtres horaires, les routes construites sont réparées (clients
+    hors fenêtre réinsérés là où c'est faisable) puis la recherche locale ne
+    retient que des mouvements faisables ; Solution.schedules donne les horaires.
+    Les temps de trajet sont `travel` (minutes, par exemple routiers) ou, à
+    défaut, la matrice parcourue à instance.speed.
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algorithm!r}")
+    timings = {}
+    start = time.perf_counter()
+    windowed = instance.has_time_windows
+    if matrix is None and (improve or windowed or algorithm not in MATRIX_FREE):
+        matrix = cache.matrix(instance) if cache is not None else distance_matrix(instance)
+    windows = TimeWindows.from_instance(instance, matrix, travel) if windowed else None
+    timings["matrix"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    routes = limit_fleet(ALGORITHMS[algorithm](matrix, instance, **options), instance)
+    if windows is not None:
+        routes = repair_routes(matrix, routes, instance.node_demand(), instance.capacity, instance.max_vehicles, windows)
+    timings["construction"] = time.perf_counter() - start
+    if improve:
+        start = time.perf_counter()
+        routes = improve_solution(matrix, routes, instance.node_demand(), instance.capacity, time_limit=improve_time,
+                                  windows=windows)
+        timings["local_search"] = time.perf_counter() - start
+
+    solution = build_solution(matrix, instance, routes, algorithm)
+    solution.timings = timings
+    if windows is not None:
+        solution.schedules = [windows.schedule([DEPOT, *r, DEPOT])[0] for r in solution.routes]
+    return solution
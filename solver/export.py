@@ -0,0 +1,130 @@
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from .matrix import haversine
+from .model import DEPOT
+from .timewindows import format_time
+
+
+# Formats d'export des routes : extension et type MIME
+EXPORT_FORMATS = {
+    "csv": ("csv", "text/csv"),
+    "parquet": ("parquet", "application/vnd.apache.parquet"),
+    "geojson": ("geojson", "application/geo+json"),
+}
+
+
+def _legs(instance, solution):
+    """Chemins concaténés dépôt → arrêts → dépôt : nœuds, route et rang de chaque ligne."""
+    lengths = np.array([len(r) + 2 for r in solution.routes], dtype=np.int64)
+    nodes = np.concatenate([[DEPOT, *r, DEPOT] for r in solution.routes]) if len(lengths) else np.empty(0, np.int64)
+    route = np.repeat(np.arange(len(lengths)), lengths)
+    starts = np.repeat(np.cumsum(lengths) - lengths, lengths)
+    stop = np.arange(len(nodes)) - starts
+    return nodes.astype(np.int64), route, stop, starts
+
+
+def _coordinates(instance, solution, nodes, route):
+    """Latitude, longitude et nom de chaque ligne ; en multi-dépôts, chaque route part de son dépôt."""
+    lat, lon = instance.node_lat()[nodes], instance.node_lon()[nodes]
+    names = np.array([instance.depot_name, *instance.names], dtype=object)[nodes]
+    if solution.route_depots:
+        depot = nodes == DEPOT
+        which = np.asarray(solution.route_depots)[route[depot]]
+        lat[depot] = np.array([d.lat for d in instance.depots])[which]
+        lon[depot] = np.array([d.lon for d in instance.depots])[which]
+        names[depot] = np.array([d.name for d in instance.depots], dtype=object)[which]
+    return lat, lon, names
+
+
+def route_table(instance, solution, matrix=None):
+    """Une ligne par arrêt (départ et retour au dépôt compris), avec distance et charge cumulées
+    (et heure de passage quand l'instance a des fenêtres horaires).
+
+    Les distances viennent de `matrix`, la matrice de la résolution (routière par
+    exemple) ; sans elle, elles sont recalculées à vol d'oiseau. Tout est calculé
+    en un seul passage vectorisé sur les routes concaténées.
+    """
+    nodes, route, stop, starts = _legs(instance, solution)
+    lat, lon, names = _coordinates(instance, solution, nodes, route)
+    demand = instance.node_demand()[nodes]
+
+    leg = np.zeros(len(nodes))
+    if len(nodes) > 1 and matrix is not None:
+        leg[1:] = np.asarray(matrix)[nodes[:-1], nodes[1:]]
+    elif len(nodes) > 1:
+        leg[1:] = haversine(lat[:-1], lon[:-1], lat[1:], lon[1:])
+    leg[stop == 0] = 0.0
+    # Cumuls par route : cumul global moins sa valeur au début de la route
+    cumulative_distance = np.cumsum(leg)
+    cumulative_distance -= cumulative_distance[starts]
+    cumulative_load = np.cumsum(demand)
+    cumulative_load -= cumulative_load[starts]
+
+    customer = nodes != DEPOT
+    ids = np.array([None, *instance.ids], dtype=object)
+    table = pd.DataFrame({
+        "Route": route + 1,
+        "Stop": stop,
+        "Id": ids[nodes],
+        "Name": names,
+        "Type": np.where(customer, "delivery", "depot"),
+        "Latitude": lat,
+        "Longitude": lon,
+        "Demand(kg)": demand,
+        "Leg(km)": leg,
+        "CumulativeDistance(km)": cumulative_distance,
+        "CumulativeLoad(kg)": cumulative_load,
+    })
+    # Horaires (fenêtres horaires) : départ du dépôt, début de service de chaque arrêt, retour
+    if solution.route_vehicles:
+        table["Vehicle"] = np.asarray(solution.route_vehicles, dtype=object)[route]
+    if solution.schedules:
+        table["Time"] = [format_time(t) for times in solution.schedules for t in times]
+    return table
+
+
+def route_geojson(instance, solution):
+    """FeatureCollection : une LineString par route (dépôt compris), propriétés distance et charge."""
+    nodes, route, _, _ = _legs(instance, solution)
+    lat, lon, _ = _coordinates(instance, solution, nodes, route)
+    coords = np.column_stack((lon, lat)).tolist()
+    bounds = np.cumsum([len(r) + 2 for r in solution.routes]).tolist()
+    features = []
+    for index, (start, end) in enumerate(zip([0, *bounds[:-1]], bounds)):
+        features.append({
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": coords[start:end]},
+            "properties": {
+                "route": index + 1,
+                "stops": len(solution.routes[index]),
+                "ids": [instance.ids[node - 1] for node in solution.routes[index]],
+                "distance_km": solution.route_distances[index],
+                "load_kg": solution.route_loads[index],
+                **({"depot": instance.depots[solution.route_depots[index]].name,
+                    "vehicle": solution.route_vehicles[index],
+                    "cost": solution.route_costs[index]} if solution.route_depots else {}),
+                **({"start": format_time(solution.schedules[index][0]),
+                    "end": format_time(solution.schedules[index][-1])} if solution.schedules else {}),
+            },
+        })
+    return {"type": "FeatureCollection", "features": features}
+
+
+def export_routes(instance, solution, fmt="csv", matrix=None):
+    """Contenu du fichier d'export des routes (bytes) au format demandé ; `matrix` comme pour route_table."""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt!r}")
+    if fmt == "geojson":
+        return json.dumps(route_geojson(instance, solution), default=str).encode("utf-8")
+    table = route_table(instance, solution, matrix)
+    if fmt == "csv":
+        return table.to_csv(index=False).encode("utf-8")
+    # Les identifiants peuvent mélanger entiers et textes : colonne texte en Parquet
+    table["Id"] = table["Id"].map(lambda v: None if v is None else str(v))
+    buffer = io.BytesIO()
+    table.to_parquet(buffer, engine="pyarrow", index=False)
+    return buffer.getvalue()
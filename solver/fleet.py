@@ -0,0 +1,177 @@
+import os
+import time
+
+import numpy as np
+
+from .engine import MATRIX_FREE, solve
+from .matrix import distance_matrix, haversine_matrix
+from .model import DEPOT, Solution, path_distance, route_distance
+from .parallel import process_pool, single_process
+from .spatial import balanced_assignment
+from .timewindows import TimeWindows
+
+
+EPSILON = 1e-9
+
+
+def assign_depots(instance, depots):
+    """Dépôt de chaque client (indice dans `depots`) : le plus proche, en un calcul vectorisé.
+
+    Un dépôt dont la demande affectée dépasse la capacité de sa flotte cède ses
+    clients les moins pénalisés au plus proche dépôt ayant encore de la marge.
+    """
+    if not depots:
+        return np.zeros(instance.size, dtype=np.intp)
+    dist = haversine_matrix(instance.lat, instance.lon, [d.lat for d in depots], [d.lon for d in depots])
+    return balanced_assignment(dist, instance.demand, [d.capacity for d in depots])
+
+
+def depot_instance(instance, depot, nodes):
+    """Sous-problème d'un dépôt : ses clients (indices 0-based de l'instance) et sa flotte,
+    à la capacité de son plus grand véhicule."""
+    return instance.subset(
+        nodes,
+        depot_lat=depot.lat,
+        depot_lon=depot.lon,
+        depot_name=depot.name,
+        capacity=max(v.capacity for v in depot.vehicles),
+        max_vehicles=sum(v.count for v in depot.vehicles),
+        depot_open=depot.open if depot.open is not None else instance.depot_open,
+        depot_close=depot.close if depot.close is not None else instance.depot_close,
+    )
+
+
+def _split(route, demand, capacity):
+    chunks, chunk, load = [], [], 0.0
+    for v in route:
+        if chunk and load + demand[v] > capacity + EPSILON:
+            chunks.append(chunk)
+            chunk, load = [], 0.0
+        chunk.append(v)
+        load += demand[v]
+    return chunks + [chunk]
+
+
+def assign_vehicles(routes, demand, distance, vehicles):
+    """Affecte un type de véhicule à chaque route (meilleur ajustement, routes les plus chargées d'abord).
+
+    Chaque route prend le type disponible le moins coûteux dont la capacité suffit ;
+    une route trop chargée pour les véhicules restants est découpée à la capacité
+    du plus grand d'entre eux. Retourne (routes, indices de type, clients non servis).
+    """
+    available = [v.count for v in vehicles]
+    pending = sorted(routes, key=lambda r: demand[r].sum())
+    assigned, types, unassigned = [], [], []
+    while pending:
+        route = pending.pop()
+        load = demand[route].sum()
+        fits = [k for k, v in enumerate(vehicles) if available[k] > 0 and v.capacity >= load - EPSILON]
+        if fits:
+            km = distance(route)
+            k = min(fits, key=lambda k: (vehicles[k].fixed_cost + vehicles[k].cost_per_km * km, vehicles[k].capacity))
+            available[k] -= 1
+            assigned.append(route)
+            types.append(k)
+            continue
+        largest = max((v.capacity for k, v in enumerate(vehicles) if available[k] > 0), default=0.0)
+        if len(route) == 1 or largest <= 0:
+            unassigned.extend(route)
+            continue
+        pending = sorted(pending + _split(route, demand, largest), key=lambda r: demand[r].sum())
+    return assigned, types, unassigned
+
+
+def solve_depot(instance, vehicles, algorithm="nearest", improve=True, improve_time=None, schedules=False,
+                **options):
+    """Résout le sous-problème d'un dépôt puis lui affecte ses types de véhicules.
+
+    Exécuté dans un processus du pool : l'instance et la solution sont sérialisées,
+    la matrice reste locale au processus. Les routes de la solution sont en indices
+    du sous-problème ; route_vehicles donne l'indice du type de chaque route.
+    Avec `schedules`, les horaires sont donnés même sans fenêtres sur ce dépôt.
+    """
+    start = time.perf_counter()
+    matrix = None
+    if improve or schedules or instance.has_time_windows or algorithm not in MATRIX_FREE:
+        matrix = distance_matrix(instance)
+    elapsed = time.perf_counter() - start
+    solution = solve(instance, algorithm, improve, improve_time, matrix=matrix, **options)
+    solution.timings["matrix"] = elapsed
+
+    demand = instance.node_demand()
+
+    def distance(route):
+        return route_distance(matrix, route) if matrix is not None else path_distance(instance, route)
+
+    routes, types, unassigned = assign_vehicles(solution.routes, demand, distance, vehicles)
+    solution.routes = routes
+    solution.route_distances = [distance(r) for r in routes]
+    solution.route_loads = [float(demand[r].sum()) for r in routes]
+    solution.unassigned = sorted(solution.unassigned + unassigned)
+    solution.route_vehicles = types
+    solution.route_costs = [
+        vehicles[k].fixed_cost + vehicles[k].cost_per_km * km for k, km in zip(types, solution.route_distances)
+    ]
+    if schedules or instance.has_time_windows:
+        # Un morceau de route découpée part directement du dépôt : il arrive plus tôt, donc reste faisable
+        windows = TimeWindows.from_instance(instance, matrix)
+        solution.schedules = [windows.schedule([DEPOT, *r, DEPOT])[0] for r in routes]
+    return solution
+
+
+def solve_fleet(instance, algorithm="nearest", improve=True, improve_time=None, processes=None, **options):
+    """Plan multi-dépôts à flotte hétérogène (instance.depots).
+
+    Les clients sont répartis entre dépôts (assign_depots), chaque dépôt est
+    résolu indépendamment sur un pool de `processes` processus (défaut : nombre
+    de CPU), puis les plans sont fusionnés : routes en indices de l'instance,
+    dépôt, type de véhicule et coût de chaque route.
+    """
+    depots = instance.depots
+    if not depots:
+        raise ValueError("The instance has no depots")
+    timings = {}
+    start = time.perf_counter()
+    choice = assign_depots(instance, depots)
+    jobs = []
+    for d, depot in enumerate(depots):
+        nodes = np.flatnonzero(choice == d)
+        if len(nodes) and depot.vehicles:
+            jobs.append((d, nodes, depot_instance(instance, depot, nodes)))
+    timings["assignment"] = time.perf_counter() - start
+    # Horaires pour toutes les routes dès qu'un dépôt a des fenêtres horaires
+    options["schedules"] = any(sub.has_time_windows for _, _, sub in jobs)
+
+    start = time.perf_counter()
+    processes = min(processes or os.cpu_count() or 1, max(len(jobs), 1))
+    if processes == 1:
+        results = [solve_depot(sub, depots[d].vehicles, algorithm, improve, improve_time, **options)
+                   for d, _, sub in jobs]
+    else:
+        options = single_process(algorithm, options)
+        with process_pool(processes) as pool:
+            futures = [pool.submit(solve_depot, sub, depots[d].vehicles, algorithm, improve, improve_time, **options)
+                       for d, _, sub in jobs]
+            results = [future.result() for future in futures]
+    timings["depot_solves"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    merged = Solution(routes=[], route_distances=[], route_loads=[], algorithm=algorithm)
+    served = np.zeros(instance.size + 1, dtype=bool)
+    for (d, nodes, _), solution in zip(jobs, results):
+        # Nœud k du sous-problème -> nœud nodes[k - 1] + 1 de l'instance
+        mapping = np.concatenate(([DEPOT], nodes + 1))
+        for r, route in enumerate(solution.routes):
+            route = mapping[route].tolist()
+            served[route] = True
+            merged.routes.append(route)
+            merged.route_depots.append(d)
+            merged.route_vehicles.append(depots[d].vehicles[solution.route_vehicles[r]].name)
+        merged.route_distances += solution.route_distances
+        merged.route_loads += solution.route_loads
+        merged.route_costs += solution.route_costs
+        merged.schedules += solution.schedules
+    merged.unassigned = (np.flatnonzero(~served[1:]) + 1).tolist()
+    timings["merge"] = time.perf_counter() - start
+    merged.timings = timings
+    return merged
@@ -0,0 +1,224 @@
+import os
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .construction import nearest_neighbor, savings, sweep
+from .local_search import two_opt
+from .model import DEPOT
+from .parallel import process_pool
+
+
+# Pénalité (km) par véhicule au-delà de max_vehicles
+FLEET_PENALTY = 1e6
+
+# En dessous de cette taille de population x clients, l'évaluation reste dans le processus courant
+PARALLEL_THRESHOLD = 20000
+
+# Longueur maximale des segments inversés ou déplacés par la mutation
+MUTATION_SPAN = 12
+
+# État des processus de calcul : matrice attachée en mémoire partagée (lecture seule)
+_WORKER = {}
+
+
+def split(matrix, tour, demand, capacity):
+    """Découpage optimal (Prins) d'un tour géant en routes respectant la capacité.
+
+    Retourne (coût, positions de coupe). Les arcs du tour sont extraits en une
+    passe NumPy ; la programmation dynamique elle-même ne parcourt que des routes
+    courtes (bornées par la capacité), d'où des boucles sur des listes Python.
+    """
+    n = len(tour)
+    depot_leg = matrix[DEPOT, tour].tolist()
+    step = matrix[tour[:-1], tour[1:]].tolist()
+    loads = demand[tour].tolist()
+
+    best = [float("inf")] * (n + 1)
+    best[0] = 0.0
+    pred = [0] * (n + 1)
+    for i in range(n):
+        base, load, cost = best[i], 0.0, depot_leg[i]
+        for j in range(i, n):
+            load += loads[j]
+            if load > capacity:
+                break
+            if j > i:
+                cost += step[j - 1]
+            total = base + cost + depot_leg[j]
+            if total < best[j + 1]:
+                best[j + 1] = total
+                pred[j + 1] = i
+    cuts, j = [], n
+    while j > 0:
+        cuts.append(j)
+        j = pred[j]
+    return best[n], cuts[::-1]
+
+
+def decode(matrix, tour, demand, capacity):
+    _, cuts = split(matrix, tour, demand, capacity)
+    starts = [0] + cuts[:-1]
+    return [list(map(int, tour[a:b])) for a, b in zip(starts, cuts)]
+
+
+def fitness(matrix, tour, demand, capacity, max_vehicles):
+    cost, cuts = split(matrix, tour, demand, capacity)
+    return cost + FLEET_PENALTY * max(0, len(cuts) - max_vehicles)
+
+
+def educate(matrix, tour, demand, capacity):
+    """Décode le tour, applique 2-opt sur chaque route et ré-encode le tour géant."""
+    routes = [two_opt(matrix, r) for r in decode(matrix, tour, demand, capacity)]
+    return np.array([v for r in routes for v in r], dtype=tour.dtype)
+
+
+def _attach(name, shape, dtype, demand, capacity, max_vehicles):
+    # Les processus "spawn" partagent le resource_tracker du parent, qui reste seul à faire l'unlink
+    shm = shared_memory.SharedMemory(name=name)
+    _WORKER.update(
+        shm=shm,
+        matrix=np.ndarray(shape, dtype=dtype, buffer=shm.buf),
+        demand=demand,
+        capacity=capacity,
+        max_vehicles=max_vehicles,
+    )
+
+
+def _evaluate(tours, education):
+    """Évalue (et éduque si demandé) un lot de tours ; retourne (tours, coûts)."""
+    matrix, demand = _WORKER["matrix"], _WORKER["demand"]
+    capacity, max_vehicles = _WORKER["capacity"], _WORKER["max_vehicles"]
+    tours = [educate(matrix, t, demand, capacity) if e else t for t, e in zip(tours, education)]
+    return tours, [fitness(matrix, t, demand, capacity, max_vehicles) for t in tours]
+
+
+def _order_crossover(rng, a, b):
+    n = len(a)
+    i, j = sorted(rng.choice(n, size=2, replace=False))
+    child = np.empty_like(a)
+    child[i:j + 1] = a[i:j + 1]
+    taken = np.zeros(int(max(a.max(), b.max())) + 1, dtype=bool)
+    taken[a[i:j + 1]] = True
+    rest = b[~taken[b]]
+    child[:i] = rest[:i]
+    child[j + 1:] = rest[i:]
+    return child
+
+
+def _mutate(rng, tour, rate, span=MUTATION_SPAN):
+    """Inversion ou déplacement d'un court segment du tour géant."""
+    if rng.random() < rate:
+        n = len(tour)
+        i = int(rng.integers(n - 1))
+        j = min(n, i + 2 + int(rng.integers(span)))
+        if rng.random() < 0.5:
+            tour[i:j] = tour[i:j][::-1].copy()
+        else:
+            segment, rest = tour[i:j].copy(), np.concatenate((tour[:i], tour[j:]))
+            k = int(rng.integers(len(rest) + 1))
+            tour[:] = np.concatenate((rest[:k], segment, rest[k:]))
+    return tour
+
+
+class _Evaluator:
+    """Évalue des lots de tours géants, en parallèle sur un pool de processus si utile."""
+
+    def __init__(self, matrix, demand, capacity, max_vehicles, workers):
+        self.args = (matrix, demand, capacity, max_vehicles)
+        self.workers = workers
+        self.pool = None
+        self.shm = None
+        if workers > 1:
+            matrix = np.ascontiguousarray(matrix)
+            self.shm = shared_memory.SharedMemory(create=True, size=matrix.nbytes)
+            np.ndarray(matrix.shape, dtype=matrix.dtype, buffer=self.shm.buf)[:] = matrix
+            self.pool = process_pool(
+                workers,
+                initializer=_attach,
+                initargs=(self.shm.name, matrix.shape, matrix.dtype, demand, capacity, max_vehicles),
+            )
+
+    def __call__(self, tours, education):
+        if self.pool is None:
+            matrix, demand, capacity, _ = self.args
+            tours = [educate(matrix, t, demand, capacity) if e else t for t, e in zip(tours, education)]
+            return tours, [fitness(matrix, t, *self.args[1:]) for t in tours]
+        chunks = [c for c in np.array_split(np.arange(len(tours)), self.workers) if len(c)]
+        results = self.pool.map(
+            _evaluate,
+            [[tours[k] for k in c] for c in chunks],
+            [[education[k] for k in c] for c in chunks],
+        )
+        tours, costs = [], []
+        for batch_tours, batch_costs in results:
+            tours += batch_tours
+            costs += batch_costs
+        return tours, costs
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+        if self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+
+
+def genetic(matrix, instance, population=40, generations=200, time_limit=10.0,
+            mutation_rate=0.3, education_rate=0.2, workers=None, seed=None):
+    """Algorithme génétique sur tours géants décodés par split.
+
+    Chaque génération produit `population` enfants (croisement OX + mutation),
+    dont une partie est éduquée par 2-opt ; éducation et fitness sont calculées
+    par lots sur `workers` processus. La matrice est placée une seule fois en
+    mémoire partagée et n'est jamais sérialisée par tâche.
+    """
+    demand = instance.node_demand()
+    capacity = instance.capacity
+    nodes = np.flatnonzero(demand[1:] <= capacity) + 1
+    if len(nodes) < 3:
+        return [[int(v)] for v in nodes]
+
+    rng = np.random.default_rng(seed)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if population * len(nodes) < PARALLEL_THRESHOLD:
+        workers = 1
+
+    # Population initiale : heuristiques de construction puis copies perturbées de celles-ci
+    seeds = [np.array([v for r in build(matrix, instance) for v in r]) for build in (nearest_neighbor, savings, sweep)]
+    seeds = [t for t in seeds if len(t) == len(nodes)] or [rng.permutation(nodes)]
+    tours = list(seeds)
+    while len(tours) < population:
+        tour = seeds[len(tours) % len(seeds)].copy()
+        for _ in range(int(rng.integers(1, 10))):
+            tour = _mutate(rng, tour, 1.0)
+        tours.append(tour)
+
+    deadline = time.perf_counter() + time_limit
+    evaluate = _Evaluator(matrix, demand, capacity, instance.max_vehicles, workers)
+    try:
+        tours, costs = evaluate(tours, [False] * len(tours))
+        costs = np.array(costs)
+        for _ in range(generations):
+            if time.perf_counter() > deadline:
+                break
+            # Sélection par tournoi binaire
+            picks = rng.integers(len(tours), size=(population, 2, 2))
+            parents = np.where(costs[picks[..., 0]] <= costs[picks[..., 1]], picks[..., 0], picks[..., 1])
+            children = [_mutate(rng, _order_crossover(rng, tours[a], tours[b]), mutation_rate) for a, b in parents]
+            children, child_costs = evaluate(children, (rng.random(len(children)) < education_rate).tolist())
+            child_costs = np.array(child_costs)
+
+            # Remplacement élitiste (mu + lambda) en écartant les doublons de coût
+            pool_tours = tours + children
+            pool_costs = np.concatenate((costs, child_costs))
+            _, unique = np.unique(np.round(pool_costs, 6), return_index=True)
+            keep = unique[np.argsort(pool_costs[unique], kind="stable")][:population]
+            tours = [pool_tours[k] for k in keep]
+            costs = pool_costs[keep]
+    finally:
+        evaluate.close()
+
+    return decode(matrix, tours[int(np.argmin(costs))], demand, capacity)
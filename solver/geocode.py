@@ -0,0 +1,278 @@
+import argparse
+import asyncio
+import csv
+import json
+import re
+import sqlite3
+import sys
+import threading
+import time
+import unicodedata
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+
+
+# Service public : 1 requête par seconde au plus (politique d'usage de Nominatim)
+NOMINATIM_URL = "https://nominatim.openstreetmap.org/search"
+USER_AGENT = "vrp-route-optimizer/1.0"
+
+# Requêtes simultanées par défaut en mode lot
+CONCURRENCY = 8
+
+# Écritures groupées dans le cache pendant un lot
+CACHE_BATCH = 200
+
+
+@dataclass
+class Location:
+    query: str
+    lat: float = None
+    lon: float = None
+    label: str = ""
+    provider: str = ""
+
+    @property
+    def found(self):
+        return self.lat is not None
+
+
+def normalize_query(query):
+    """Clé de cache : Unicode NFKC, casse repliée, espaces et ponctuation de bord réduits."""
+    text = unicodedata.normalize("NFKC", str(query)).casefold()
+    return re.sub(r"\s+", " ", text).strip(" ,.;")
+
+
+class Provider:
+    """Fournisseur de géocodage ; `rate` borne les requêtes par seconde (None = illimité)."""
+
+    name = "provider"
+    rate = None
+    concurrency = CONCURRENCY
+
+    def lookup(self, query):
+        """Résout une requête (appel bloquant) ; retourne une Location, trouvée ou non."""
+        raise NotImplementedError
+
+
+class NominatimProvider(Provider):
+    """API de recherche Nominatim (publique, ou instance locale sans limite de débit)."""
+
+    name = "nominatim"
+
+    def __init__(self, url=NOMINATIM_URL, user_agent=USER_AGENT, rate=None, concurrency=None, timeout=10.0):
+        self.url = url
+        self.user_agent = user_agent
+        public = url == NOMINATIM_URL
+        self.rate = rate if rate is not None else (1.0 if public else None)
+        self.concurrency = concurrency or (1 if public else CONCURRENCY)
+        self.timeout = timeout
+
+    def lookup(self, query):
+        params = urllib.parse.urlencode({"format": "json", "limit": 1, "q": query})
+        request = urllib.request.Request(f"{self.url}?{params}", headers={"User-Agent": self.user_agent})
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            results = json.load(response)
+        if not results:
+            return Location(query, provider=self.name)
+        best = results[0]
+        return Location(query, float(best["lat"]), float(best["lon"]), best.get("display_name", ""), self.name)
+
+
+class GazetteerProvider(Provider):
+    """Gazetteer hors ligne : CSV name,lat,lon (colonne label optionnelle), recherche exacte normalisée."""
+
+    name = "gazetteer"
+
+    def __init__(self, path):
+        self.entries = {}
+        with open(path, newline="", encoding="utf-8") as handle:
+            for row in csv.DictReader(handle):
+                self.entries[normalize_query(row["name"])] = (
+                    float(row["lat"]), float(row["lon"]), row.get("label") or row["name"],
+                )
+
+    def lookup(self, query):
+        entry = self.entries.get(normalize_query(query))
+        if entry is None:
+            return Location(query, provider=self.name)
+        return Location(query, entry[0], entry[1], entry[2], self.name)
+
+
+def make_provider(spec="nominatim"):
+    """Fournisseur depuis une spécification texte :
+    "nominatim", "nominatim:<url d'une instance locale>" ou "gazetteer:<chemin CSV>"."""
+    kind, _, argument = spec.partition(":")
+    if kind == "nominatim":
+        return NominatimProvider(argument) if argument else NominatimProvider()
+    if kind == "gazetteer" and argument:
+        return GazetteerProvider(argument)
+    raise ValueError(f"Unknown geocoding provider: {spec!r}")
+
+
+class GeocodeCache:
+    """Cache persistant (SQLite) des résultats, échecs compris, par requête normalisée et fournisseur."""
+
+    def __init__(self, path=":memory:"):
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS geocode (key TEXT, provider TEXT, lat REAL, lon REAL, "
+                "label TEXT, created REAL, PRIMARY KEY (key, provider))"
+            )
+
+    def get_many(self, keys, provider):
+        found = {}
+        keys = list(keys)
+        with self._lock:
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                rows = self._db.execute(
+                    f"SELECT key, lat, lon, label FROM geocode WHERE provider = ? AND key IN ({','.join('?' * len(chunk))})",
+                    [provider, *chunk],
+                )
+                for key, lat, lon, label in rows:
+                    found[key] = Location(key, lat, lon, label, provider)
+        return found
+
+    def put_many(self, locations):
+        with self._lock, self._db:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO geocode VALUES (?, ?, ?, ?, ?, ?)",
+                [(normalize_query(loc.query), loc.provider, loc.lat, loc.lon, loc.label, time.time())
+                 for loc in locations],
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM geocode").fetchone()[0]
+
+
+class _RateLimiter:
+    """Débit d'un géocodeur, partagé par tous ses lots (threads et boucles asyncio différents)."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else 0.0
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    async def wait(self):
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            delay = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class Geocoder:
+    """Géocodage avec cache : une requête déjà vue (même forme normalisée) ne repart jamais au fournisseur."""
+
+    def __init__(self, provider=None, cache=None):
+        self.provider = provider or NominatimProvider()
+        self.cache = cache if cache is not None else GeocodeCache()
+        # Un seul limiteur : des lots successifs (recherches de la carte) respectent aussi le débit
+        self._limiter = _RateLimiter(self.provider.rate)
+
+    def geocode(self, query):
+        return self.geocode_many([query])[0]
+
+    def geocode_many(self, queries, concurrency=None):
+        """Version synchrone de geocode_batch (pour Streamlit et la ligne de commande)."""
+        return asyncio.run(self.geocode_batch(queries, concurrency))
+
+    async def geocode_batch(self, queries, concurrency=None):
+        """Géocode une liste (doublons regroupés) ; retourne une Location par requête, dans l'ordre.
+
+        Les requêtes absentes du cache partent en parallèle (au plus `concurrency`
+        à la fois, au débit du fournisseur) ; les erreurs réseau laissent la
+        requête non trouvée sans l'enregistrer.
+        """
+        keys = [normalize_query(q) for q in queries]
+        results = self.cache.get_many(set(keys), self.provider.name)
+        missing = [key for key in dict.fromkeys(keys) if key and key not in results]
+
+        if not missing:
+            return self._ordered(queries, keys, results)
+        concurrency = concurrency or self.provider.concurrency
+        semaphore = asyncio.Semaphore(concurrency)
+        loop = asyncio.get_running_loop()
+        pending = []
+
+        # Un thread par requête simultanée (le pool par défaut d'asyncio plafonne selon les CPU)
+        executor = ThreadPoolExecutor(max_workers=min(concurrency, len(missing)))
+
+        async def resolve(key):
+            async with semaphore:
+                await self._limiter.wait()
+                try:
+                    location = await loop.run_in_executor(executor, self.provider.lookup, key)
+                except (OSError, ValueError):
+                    results[key] = Location(key, provider=self.provider.name)
+                    return
+            results[key] = location
+            pending.append(location)
+            if len(pending) >= CACHE_BATCH:
+                self.cache.put_many(pending[:])
+                pending.clear()
+
+        try:
+            await asyncio.gather(*(resolve(key) for key in missing))
+        finally:
+            executor.shutdown(wait=False)
+        if pending:
+            self.cache.put_many(pending)
+        return self._ordered(queries, keys, results)
+
+    @staticmethod
+    def _ordered(queries, keys, results):
+        return [
+            Location(query, results[key].lat, results[key].lon, results[key].label, results[key].provider)
+            if key in results else Location(query)
+            for query, key in zip(queries, keys)
+        ]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m solver.geocode",
+        description="Geocode the Address column of a delivery file and write Latitude/Longitude columns.",
+    )
+    parser.add_argument("input", help="CSV file with an Address column")
+    parser.add_argument("-o", "--output", default=None, help="output CSV (default: <input>.geocoded.csv)")
+    parser.add_argument("-p", "--provider", default="nominatim",
+                        help='"nominatim", "nominatim:<url>" or "gazetteer:<csv>" (default: %(default)s)')
+    parser.add_argument("--cache", default=".vrp_cache/geocode.sqlite", help="persistent cache file")
+    parser.add_argument("-c", "--concurrency", type=int, default=None, help="simultaneous requests")
+    args = parser.parse_args(argv)
+
+    import pandas as pd
+
+    from .io import COLUMNS
+
+    frame = pd.read_csv(args.input)
+    column = next((c for c in frame.columns if str(c).strip().lower() in ("address", *COLUMNS["Address"])), None)
+    if column is None:
+        print("No Address column found", file=sys.stderr)
+        return 1
+    Path(args.cache).parent.mkdir(parents=True, exist_ok=True)
+    geocoder = Geocoder(make_provider(args.provider), GeocodeCache(args.cache))
+    start = time.perf_counter()
+    locations = geocoder.geocode_many(frame[column].fillna("").astype(str).tolist(), args.concurrency)
+    frame["Latitude"] = [loc.lat for loc in locations]
+    frame["Longitude"] = [loc.lon for loc in locations]
+    output = args.output or str(Path(args.input).with_suffix(".geocoded.csv"))
+    frame.to_csv(output, index=False)
+    found = sum(loc.found for loc in locations)
+    print(f"{found}/{len(locations)} addresses geocoded in {time.perf_counter() - start:.1f}s -> {output}",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
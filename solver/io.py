@@ -0,0 +1,207 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from .model import TIME_COLUMNS
+from .timewindows import parse_time
+
+
+# Lignes lues par bloc pour les gros fichiers
+CHUNK_ROWS = 50_000
+
+# Colonnes canoniques (format d'export CSV de l'application) et alias acceptés
+COLUMNS = {
+    "Id": ("id", "delivery_id"),
+    "Name": ("name", "customer", "customer name"),
+    "Latitude": ("latitude", "lat"),
+    "Longitude": ("longitude", "lon", "lng", "long"),
+    "Demand(kg)": ("demand(kg)", "demand", "demand_kg", "weight", "weight(kg)"),
+    "Address": ("address", "location", "adresse"),
+    "ReadyTime": ("ready", "ready_time", "readytime", "window_start", "tw_start", "earliest"),
+    "DueTime": ("due", "due_time", "duetime", "window_end", "tw_end", "latest"),
+    "ServiceTime(min)": ("service", "service_time", "service(min)", "service_min", "servicetime"),
+}
+REQUIRED = ("Latitude", "Longitude", "Demand(kg)")
+COORDINATES = ("Latitude", "Longitude")
+
+FORMATS = {".csv": "csv", ".txt": "csv", ".xlsx": "excel", ".xlsm": "excel", ".parquet": "parquet", ".pq": "parquet"}
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    accepted: int = 0
+    rejected: dict = field(default_factory=dict)
+
+    def reject(self, reason, count):
+        if count:
+            self.rejected[reason] = self.rejected.get(reason, 0) + int(count)
+
+
+def detect_format(filename):
+    suffix = Path(filename).suffix.lower()
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported delivery file format: {suffix or filename!r}")
+    return FORMATS[suffix]
+
+
+def normalize_columns(frame):
+    """Renomme les colonnes reconnues vers les noms canoniques."""
+    lookup = {alias: canonical for canonical, aliases in COLUMNS.items() for alias in (canonical.lower(), *aliases)}
+    renamed = {col: lookup[str(col).strip().lower()] for col in frame.columns if str(col).strip().lower() in lookup}
+    frame = frame.rename(columns=renamed)
+    # Sans coordonnées, une colonne d'adresse suffit (géocodée ensuite)
+    if "Address" in frame.columns:
+        for col in COORDINATES:
+            if col not in frame.columns:
+                frame[col] = np.nan
+    missing = [col for col in REQUIRED if col not in frame.columns]
+    if missing:
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+    return frame[[col for col in COLUMNS if col in frame.columns]]
+
+
+def _minutes(column):
+    """Colonne horaire ("HH:MM" ou minutes) -> minutes depuis minuit ; NaN si vide, None si illisible."""
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+    values = []
+    for value in column.tolist():
+        try:
+            values.append(parse_time(value))
+        except ValueError:
+            values.append(None)
+    return np.array(values, dtype=object)
+
+
+def _validate_windows(frame, keep, report):
+    """Fenêtres horaires en minutes ; écarte les heures illisibles, début > fin et service < 0."""
+    present = [col for col in TIME_COLUMNS if col in frame.columns]
+    if not present:
+        return keep, {}
+    parsed = {col: _minutes(frame[col]) for col in present}
+    bad = np.zeros(len(frame), dtype=bool)
+    for col, values in parsed.items():
+        unreadable = np.array([v is None for v in values], dtype=bool)
+        parsed[col] = np.where(unreadable, np.nan, values).astype(np.float64)
+        bad |= unreadable
+    ready, due = parsed.get("ReadyTime"), parsed.get("DueTime")
+    if ready is not None and due is not None:
+        bad |= ready > due
+    if "ServiceTime(min)" in parsed:
+        bad |= parsed["ServiceTime(min)"] < 0
+    bad &= keep
+    report.reject("invalid time window", bad.sum())
+    return keep & ~bad, parsed
+
+
+def validate(frame, report):
+    """Filtre vectorisé des lignes invalides (coordonnées hors bornes, demande <= 0 ou non numérique,
+    fenêtre horaire illisible ou inversée)."""
+    lat = pd.to_numeric(frame["Latitude"], errors="coerce").to_numpy(dtype=np.float64)
+    lon = pd.to_numeric(frame["Longitude"], errors="coerce").to_numpy(dtype=np.float64)
+    demand = pd.to_numeric(frame["Demand(kg)"], errors="coerce").to_numpy(dtype=np.float64)
+
+    bad_coords = ~(np.isfinite(lat) & np.isfinite(lon) & (np.abs(lat) <= 90) & (np.abs(lon) <= 180))
+    bad_demand = ~bad_coords & ~(np.isfinite(demand) & (demand > 0))
+    report.rows += len(frame)
+    report.reject("invalid coordinates", bad_coords.sum())
+    report.reject("invalid demand", bad_demand.sum())
+
+    keep, windows = _validate_windows(frame, ~(bad_coords | bad_demand), report)
+    frame = frame.loc[keep].copy()
+    frame["Latitude"], frame["Longitude"], frame["Demand(kg)"] = lat[keep], lon[keep], demand[keep]
+    for col, values in windows.items():
+        frame[col] = values[keep]
+    report.accepted += int(keep.sum())
+    return frame
+
+
+def geocode_missing(frame, geocoder, report):
+    """Complète par géocodage (en un lot) les lignes sans coordonnées mais avec une adresse.
+
+    Les adresses introuvables sont écartées et comptées dans le rapport.
+    """
+    if geocoder is None or "Address" not in frame.columns:
+        return frame
+    lat = pd.to_numeric(frame["Latitude"], errors="coerce")
+    lon = pd.to_numeric(frame["Longitude"], errors="coerce")
+    address = frame["Address"].astype("string").str.strip()
+    todo = (lat.isna() | lon.isna()).to_numpy() & address.fillna("").ne("").to_numpy()
+    if not todo.any():
+        return frame
+    locations = geocoder.geocode_many(address[todo].tolist())
+    lat, lon = lat.to_numpy(dtype=np.float64), lon.to_numpy(dtype=np.float64)
+    lat[todo] = [np.nan if loc.lat is None else loc.lat for loc in locations]
+    lon[todo] = [np.nan if loc.lon is None else loc.lon for loc in locations]
+    frame = frame.copy()
+    frame["Latitude"], frame["Longitude"] = lat, lon
+    unresolved = np.zeros(len(frame), dtype=bool)
+    unresolved[todo] = [not loc.found for loc in locations]
+    report.rows += int(unresolved.sum())
+    report.reject("address not found", unresolved.sum())
+    return frame.loc[~unresolved]
+
+
+def _excel_chunks(source, chunksize):
+    from openpyxl import load_workbook
+
+    # Mode lecture seule : les lignes sont lues en flux sans charger tout le classeur
+    workbook = load_workbook(source, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        block = []
+        for row in rows:
+            block.append(row)
+            if len(block) == chunksize:
+                yield pd.DataFrame(block, columns=header)
+                block = []
+        if block:
+            yield pd.DataFrame(block, columns=header)
+    finally:
+        workbook.close()
+
+
+def _parquet_chunks(source, chunksize):
+    import pyarrow.parquet as pq
+
+    for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def iter_chunks(source, filename, chunksize=CHUNK_ROWS):
+    """Lit un fichier de livraisons (CSV, Excel, Parquet) par blocs de DataFrames."""
+    kind = detect_format(filename)
+    if kind == "csv":
+        yield from pd.read_csv(source, chunksize=chunksize)
+    elif kind == "excel":
+        yield from _excel_chunks(source, chunksize)
+    else:
+        yield from _parquet_chunks(source, chunksize)
+
+
+def read_deliveries(source, filename=None, chunksize=CHUNK_ROWS, geocoder=None):
+    """Lit, normalise et valide un fichier de livraisons bloc par bloc.
+
+    Avec un `geocoder` (solver.geocode.Geocoder), les lignes n'ayant qu'une
+    adresse sont géocodées par lots. Retourne un DataFrame unique (à charger
+    en un seul lot) et un ImportReport.
+    """
+    filename = filename or getattr(source, "name", None) or str(source)
+    report = ImportReport()
+    frames = [validate(geocode_missing(normalize_columns(chunk), geocoder, report), report)
+              for chunk in iter_chunks(source, filename, chunksize)]
+    if not frames:
+        return pd.DataFrame(columns=list(REQUIRED)), report
+    frame = pd.concat(frames, ignore_index=True)
+    if "Id" in frame:
+        duplicated = frame["Id"].duplicated().to_numpy()
+        report.reject("duplicate id", duplicated.sum())
+        report.accepted -= int(duplicated.sum())
+        frame = frame.loc[~duplicated].reset_index(drop=True)
+    return frame, report
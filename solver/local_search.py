@@ -0,0 +1,354 @@
+import time
+from collections import deque
+
+import numpy as np
+
+from .matrix import nearest_neighbors
+from .model import DEPOT
+
+
+# Taille des listes de voisins candidats
+NEIGHBORS = 20
+
+# Longueur maximale des segments déplacés par Or-opt
+OR_OPT_SEGMENT = 3
+
+EPSILON = 1e-9
+
+
+def two_opt(matrix, route):
+    """2-opt par première amélioration sur une route (dépôt implicite aux deux bouts)."""
+    if len(route) < 3:
+        return list(route)
+    path = np.array([DEPOT, *route, DEPOT])
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, len(path) - 2):
+            a, b = path[i - 1], path[i]
+            # Gain de l'inversion path[i..j] pour tous les j d'un coup
+            c = path[i + 1:len(path) - 1]
+            d = path[i + 2:]
+            delta = matrix[a, c] + matrix[b, d] - matrix[a, b] - matrix[c, d]
+            j = int(np.argmin(delta))
+            if delta[j] < -1e-9:
+                j += i + 1
+                path[i:j + 1] = path[i:j + 1][::-1].copy()
+                improved = True
+    return path[1:-1].tolist()
+
+
+def _reindex(path, pos, start, end):
+    """Positions de path[start..end], seule plage qu'un mouvement intra-route a réordonnée."""
+    for idx in range(start, end + 1):
+        pos[path[idx]] = idx
+
+
+def _try_two_opt(matrix, path, pos, a, near, windows=None, times=None):
+    """Cherche un 2-opt créant l'arc (a, c) pour un voisin c de la même route.
+
+    Avec fenêtres horaires, le segment inversé n'est simulé que pour un gain positif.
+    """
+    i = pos[a]
+    for c in near:
+        j = pos.get(c)
+        if j is None:
+            continue
+        p, q = min(i, j), max(i, j)
+        if q - p < 2:
+            continue
+        u, v = path[p], path[q]
+        # Variante successeurs : (u, u+) (v, v+) -> (u, v) (u+, v+)
+        gain = matrix[u, path[p + 1]] + matrix[v, path[q + 1]] - matrix[u, v] - matrix[path[p + 1], path[q + 1]]
+        if gain > EPSILON and (windows is None or windows.closes(
+                windows.extend((times[0][p], u), path[q:p:-1]), path, times[1], q + 1)):
+            touched = [u, v, path[p + 1], path[q + 1]]
+            path[p + 1:q + 1] = path[p + 1:q + 1][::-1]
+            _reindex(path, pos, p + 1, q)
+            return touched
+        # Variante prédécesseurs : (u-, u) (v-, v) -> (u-, v-) (u, v)
+        gain = matrix[path[p - 1], u] + matrix[path[q - 1], v] - matrix[path[p - 1], path[q - 1]] - matrix[u, v]
+        if gain > EPSILON and (windows is None or windows.closes(
+                windows.extend((times[0][p - 1], path[p - 1]), path[p:q][::-1]), path, times[1], q)):
+            touched = [path[p - 1], u, path[q - 1], v]
+            path[p:q] = path[p:q][::-1]
+            _reindex(path, pos, p, q - 1)
+            return touched
+    return None
+
+
+def _try_or_opt(matrix, path, pos, a, near, windows=None, times=None):
+    """Cherche un déplacement du segment commençant en a (1 à 3 clients, éventuellement
+    inversé) contre un voisin c de la même route."""
+    i = pos[a]
+    for length in range(1, OR_OPT_SEGMENT + 1):
+        k = i + length - 1
+        if k > len(path) - 2:
+            break
+        first, end = path[i], path[k]
+        removal = matrix[path[i - 1], first] + matrix[end, path[k + 1]] - matrix[path[i - 1], path[k + 1]]
+        for c in near:
+            j = pos.get(c)
+            if j is None or i <= j <= k:
+                continue
+            # Insertion dans l'arc (path[t], path[t + 1]) : après c puis avant c
+            for t in (j, j - 1):
+                if i - 1 <= t <= k:
+                    continue
+                u, v = path[t], path[t + 1]
+                forward = matrix[u, first] + matrix[end, v] - matrix[u, v]
+                backward = matrix[u, end] + matrix[first, v] - matrix[u, v]
+                if removal - min(forward, backward) <= EPSILON:
+                    continue
+                segment = path[i:k + 1]
+                if backward < forward:
+                    segment = segment[::-1]
+                if windows is not None and not _or_opt_fits(windows, times, path, i, k, t, segment):
+                    continue
+                touched = [path[i - 1], path[k + 1], u, v, first, end]
+                if t < i:
+                    path[t + 1:k + 1] = segment + path[t + 1:i]
+                    _reindex(path, pos, t + 1, k)
+                else:
+                    path[i:t + 1] = path[k + 1:t + 1] + segment
+                    _reindex(path, pos, i, t)
+                return touched
+    return None
+
+
+def _or_opt_fits(windows, times, path, i, k, t, segment):
+    """Fenêtres horaires après déplacement de path[i..k] (segment) entre path[t] et path[t + 1]."""
+    earliest, latest = times
+    if t < i:
+        state = windows.extend((earliest[t], path[t]), segment)
+        state = windows.extend_run(state, path, earliest, t + 1, i - 1)
+        return windows.closes(state, path, latest, k + 1)
+    state = windows.extend_run((earliest[i - 1], path[i - 1]), path, earliest, k + 1, t)
+    return windows.closes(windows.extend(state, segment), path, latest, t + 1)
+
+
+def optimize_route(matrix, route, neighbors, deadline=None, windows=None):
+    """2-opt + Or-opt sur une route, restreint aux listes de voisins, avec don't-look bits.
+
+    Seuls les clients dont un arc a changé sont réexaminés, si bien qu'une passe
+    coûte O(n·k) au lieu de O(n²). Avec des fenêtres horaires (TimeWindows),
+    un mouvement n'est retenu que si la route reste faisable.
+    """
+    if len(route) < 2:
+        return list(route)
+    path = [DEPOT, *route, DEPOT]
+    pos = {v: idx for idx, v in enumerate(path) if v != DEPOT}
+    times = windows.schedule(path) if windows is not None else None
+    active = deque(route)
+    queued = set(route)
+
+    while active:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        a = active.popleft()
+        queued.discard(a)
+        near = neighbors[a]
+        touched = (_try_two_opt(matrix, path, pos, a, near, windows, times)
+                   or _try_or_opt(matrix, path, pos, a, near, windows, times))
+        if touched is None:
+            continue
+        if windows is not None:
+            times = windows.schedule(path)
+        for v in [a, *touched]:
+            if v != DEPOT and v not in queued:
+                active.append(v)
+                queued.add(v)
+    return path[1:-1]
+
+
+def improve_routes(matrix, routes, time_limit=None, k=NEIGHBORS, windows=None):
+    """Post-optimisation intra-route de toutes les routes, bornée dans le temps si demandé."""
+    if not routes:
+        return routes
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    near = nearest_neighbors(matrix, k).tolist()
+    return [optimize_route(matrix, r, near, deadline, windows) for r in routes]
+
+
+class _RouteSet:
+    """Routes (avec dépôt aux deux bouts), position et route de chaque client,
+    et charges cumulées par position : toute charge de segment s'obtient en O(1).
+    Avec fenêtres horaires, les heures au plus tôt / au plus tard sont tenues de même."""
+
+    def __init__(self, routes, demand, windows=None):
+        self.demand = demand
+        self.windows = windows
+        self.paths = [[DEPOT, *r, DEPOT] for r in routes]
+        self.route_of = {}
+        self.pos = {}
+        self.prefix = [None] * len(self.paths)
+        self.times = [None] * len(self.paths)
+        for r in range(len(self.paths)):
+            self.refresh(r)
+
+    def refresh(self, r):
+        acc, prefix = 0.0, []
+        for t, v in enumerate(self.paths[r]):
+            if v != DEPOT:
+                self.route_of[v] = r
+                self.pos[v] = t
+                acc += self.demand[v]
+            prefix.append(acc)
+        self.prefix[r] = prefix
+        if self.windows is not None:
+            self.times[r] = self.windows.schedule(self.paths[r])
+
+    def load(self, r):
+        return self.prefix[r][-1]
+
+    def head_load(self, r, t):
+        """Charge de path[1..t]."""
+        return self.prefix[r][t]
+
+    def routes(self):
+        return [p[1:-1] for p in self.paths if len(p) > 2]
+
+    def joins(self, r, t, nodes, s, j):
+        """Vrai si path_r[..t] + nodes + path_s[j..] respecte les fenêtres horaires (O(len(nodes)))."""
+        w = self.windows
+        if w is None:
+            return True
+        start = (self.times[r][0][t], self.paths[r][t])
+        return w.closes(w.extend(start, nodes), self.paths[s], self.times[s][1], j)
+
+
+def _inter_moves(matrix, routes, capacity, a, near):
+    """Premier mouvement améliorant entre la route de a et celle d'un voisin c :
+    relocate, swap, 2-opt* (deux variantes) puis cross-exchange.
+
+    Retourne les clients à réactiver, ou None si aucun mouvement n'améliore.
+    """
+    D = matrix
+    demand = routes.demand
+    ra = routes.route_of[a]
+    for c in near:
+        rc = routes.route_of.get(c)
+        if rc is None or rc == ra:
+            continue
+        A, C = routes.paths[ra], routes.paths[rc]
+        i, j = routes.pos[a], routes.pos[c]
+        load_a, load_c = routes.load(ra), routes.load(rc)
+        pa, na = A[i - 1], A[i + 1]
+
+        # Relocate : a inséré juste après ou juste avant c
+        if load_c + demand[a] <= capacity:
+            removal = D[pa, a] + D[a, na] - D[pa, na]
+            for t in (j, j - 1):
+                u, v = C[t], C[t + 1]
+                if (removal - (D[u, a] + D[a, v] - D[u, v]) > EPSILON
+                        and routes.joins(rc, t, (a,), rc, t + 1) and routes.joins(ra, i - 1, (), ra, i + 1)):
+                    routes.paths[ra] = A[:i] + A[i + 1:]
+                    routes.paths[rc] = C[:t + 1] + [a] + C[t + 1:]
+                    return ra, rc, [a, c, pa, na, u, v]
+
+        # Swap : a échangé avec le prédécesseur ou le successeur de c (a devient voisin de c)
+        for t in (j - 1, j + 1):
+            x = C[t]
+            if x == DEPOT:
+                continue
+            if load_a - demand[a] + demand[x] > capacity or load_c - demand[x] + demand[a] > capacity:
+                continue
+            px, nx = C[t - 1], C[t + 1]
+            delta = (D[pa, x] + D[x, na] - D[pa, a] - D[a, na]
+                     + D[px, a] + D[a, nx] - D[px, x] - D[x, nx])
+            if (delta < -EPSILON
+                    and routes.joins(ra, i - 1, (x,), ra, i + 1) and routes.joins(rc, t - 1, (a,), rc, t + 1)):
+                A[i], C[t] = x, a
+                return ra, rc, [a, x, pa, na, px, nx]
+
+        # 2-opt* : échange des fins de route, arc (a, c) créé
+        head_a, head_c = routes.head_load(ra, i), routes.head_load(rc, j)
+        cp = C[j - 1]
+        if (head_a + load_c - routes.head_load(rc, j - 1) <= capacity
+                and routes.head_load(rc, j - 1) + load_a - head_a <= capacity):
+            gain = D[a, na] + D[cp, c] - D[a, c] - D[cp, na]
+            if gain > EPSILON and routes.joins(ra, i, (), rc, j) and routes.joins(rc, j - 1, (), ra, i + 1):
+                routes.paths[ra] = A[:i + 1] + C[j:]
+                routes.paths[rc] = C[:j] + A[i + 1:]
+                return ra, rc, [a, c, na, cp]
+        # 2-opt* inversé : début de a relié au début (inversé) de c
+        if head_a + head_c <= capacity and load_a - head_a + load_c - head_c <= capacity:
+            nc = C[j + 1]
+            gain = D[a, na] + D[c, nc] - D[a, c] - D[na, nc]
+            # Débuts inversés : retour au dépôt (dernière position de A), départ du dépôt (position 0)
+            if (gain > EPSILON and routes.joins(ra, i, C[1:j + 1][::-1], ra, len(A) - 1)
+                    and routes.joins(ra, 0, A[i + 1:-1][::-1], rc, j + 1)):
+                routes.paths[ra] = A[:i + 1] + C[:j + 1][::-1]
+                routes.paths[rc] = A[i + 1:][::-1] + C[j + 1:]
+                return ra, rc, [a, c, na, nc]
+
+        # Cross-exchange : segment commençant en a contre segment suivant c (c -> a créé)
+        for l1 in range(1, OR_OPT_SEGMENT + 1):
+            e1 = i + l1 - 1
+            if e1 > len(A) - 2:
+                break
+            seg_a = routes.head_load(ra, e1) - routes.head_load(ra, i - 1)
+            for l2 in range(1, OR_OPT_SEGMENT + 1):
+                e2 = j + l2
+                if e2 > len(C) - 2:
+                    break
+                seg_c = routes.head_load(rc, e2) - routes.head_load(rc, j)
+                if load_a - seg_a + seg_c > capacity or load_c - seg_c + seg_a > capacity:
+                    continue
+                removed = D[pa, a] + D[A[e1], A[e1 + 1]] + D[c, C[j + 1]] + D[C[e2], C[e2 + 1]]
+                added = D[pa, C[j + 1]] + D[C[e2], A[e1 + 1]] + D[c, a] + D[A[e1], C[e2 + 1]]
+                if (removed - added > EPSILON and routes.joins(ra, i - 1, C[j + 1:e2 + 1], ra, e1 + 1)
+                        and routes.joins(rc, j, A[i:e1 + 1], rc, e2 + 1)):
+                    touched = [a, c, pa, A[e1], A[e1 + 1], C[j + 1], C[e2], C[e2 + 1]]
+                    routes.paths[ra] = A[:i] + C[j + 1:e2 + 1] + A[e1 + 1:]
+                    routes.paths[rc] = C[:j + 1] + A[i:e1 + 1] + C[e2 + 1:]
+                    return ra, rc, touched
+    return None
+
+
+def inter_route(matrix, routes, demand, capacity, time_limit=None, k=NEIGHBORS, neighbors=None, windows=None):
+    """Recherche locale inter-routes sur voisinages granulaires (k plus proches voisins),
+    avec don't-look bits et contrôle de capacité (et de fenêtres horaires) en O(1)."""
+    if len(routes) < 2:
+        return routes
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    near = nearest_neighbors(matrix, k).tolist() if neighbors is None else neighbors
+    state = _RouteSet(routes, demand.tolist() if isinstance(demand, np.ndarray) else demand, windows)
+
+    active = deque(state.route_of)
+    queued = set(active)
+    while active:
+        if deadline is not None and time.perf_counter() > deadline:
+            break
+        a = active.popleft()
+        queued.discard(a)
+        move = _inter_moves(matrix, state, capacity, a, near[a])
+        if move is None:
+            continue
+        ra, rc, touched = move
+        state.refresh(ra)
+        state.refresh(rc)
+        for v in [a, *touched]:
+            if v != DEPOT and v not in queued:
+                active.append(v)
+                queued.add(v)
+    return state.routes()
+
+
+def improve_solution(matrix, routes, demand, capacity, time_limit=None, k=NEIGHBORS, windows=None):
+    """Intra-route, puis inter-routes, puis intra-route à nouveau, sous un budget commun.
+
+    Avec `windows` (TimeWindows), les routes doivent déjà être faisables ; elles le restent.
+    """
+    if not routes:
+        return routes
+    start = time.perf_counter()
+    near = nearest_neighbors(matrix, k).tolist()
+
+    def remaining():
+        return None if time_limit is None else max(0.0, time_limit - (time.perf_counter() - start))
+
+    deadline = None if time_limit is None else start + time_limit
+    routes = [optimize_route(matrix, r, near, deadline, windows) for r in routes]
+    routes = inter_route(matrix, routes, demand, capacity, time_limit=remaining(), neighbors=near, windows=windows)
+    return [optimize_route(matrix, r, near, deadline, windows) for r in routes]
@@ -0,0 +1,164 @@
+import numpy as np
+
+
+EARTH_RADIUS_KM = 6371.0
+
+# Nombre de lignes calculées à la fois : borne la mémoire des temporaires à ~BLOCK * n
+BLOCK_ROWS = 1024
+
+
+def haversine(lat1, lon1, lat2, lon2):
+    """Distance de Haversine en km, vectorisée (même formule que calculateDistance côté JS)."""
+    phi1 = np.radians(lat1)
+    phi2 = np.radians(lat2)
+    dphi = phi2 - phi1
+    dlam = np.radians(lon2) - np.radians(lon1)
+    a = np.sin(dphi / 2) ** 2 + np.cos(phi1) * np.cos(phi2) * np.sin(dlam / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arctan2(np.sqrt(a), np.sqrt(np.clip(1 - a, 0.0, None)))
+
+
+def haversine_matrix(lat, lon, lat2=None, lon2=None, dtype=np.float64):
+    """Matrice des distances (km) entre deux ensembles de points, calculée par blocs de lignes."""
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    lat2 = lat if lat2 is None else np.asarray(lat2, dtype=np.float64)
+    lon2 = lon if lon2 is None else np.asarray(lon2, dtype=np.float64)
+
+    out = np.empty((len(lat), len(lat2)), dtype=dtype)
+    for start in range(0, len(lat), BLOCK_ROWS):
+        stop = min(start + BLOCK_ROWS, len(lat))
+        out[start:stop] = haversine(
+            lat[start:stop, None], lon[start:stop, None], lat2[None, :], lon2[None, :]
+        )
+    return out
+
+
+def distance_matrix(instance, dtype=np.float64):
+    """Matrice (n+1)x(n+1) dépôt + livraisons ; le nœud 0 est le dépôt."""
+    return haversine_matrix(instance.node_lat(), instance.node_lon(), dtype=dtype)
+
+
+def nearest_neighbors(matrix, k):
+    """Pour chaque nœud, les k clients les plus proches (hors dépôt et hors lui-même), triés."""
+    size = matrix.shape[0]
+    k = max(0, min(k, size - 2))
+    if k == 0:
+        return np.empty((size, 0), dtype=np.intp)
+    masked = matrix[:, 1:].astype(np.float64, copy=True)
+    masked[np.arange(1, size), np.arange(size - 1)] = np.inf
+    part = np.argpartition(masked, k - 1, axis=1)[:, :k]
+    order = np.take_along_axis(masked, part, axis=1).argsort(axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1) + 1
+
+
+class DynamicMatrix:
+    """Matrice dépôt + livraisons maintenue incrémentalement lors de l'édition.
+
+    Un ajout calcule une ligne (et la colonne symétrique) en un appel vectorisé,
+    une suppression marque l'emplacement comme libre ; le tampon n'est compacté
+    que lorsque les emplacements morts dépassent les vivants, d'où un coût
+    amorti O(n) par édition. Les livraisons sont désignées par une clé.
+    """
+
+    def __init__(self, depot_lat, depot_lon, reserve=64, dtype=np.float64):
+        self._data = np.zeros((reserve, reserve), dtype=dtype)
+        self._lat = np.zeros(reserve)
+        self._lon = np.zeros(reserve)
+        self._alive = np.zeros(reserve, dtype=bool)
+        self._lat[0], self._lon[0], self._alive[0] = depot_lat, depot_lon, True
+        self._size = 1
+        self._slots = {}
+        self._dead = 0
+
+    @classmethod
+    def from_matrix(cls, matrix, lat, lon, keys):
+        """Reprend une matrice déjà calculée (nœud 0 = dépôt), par exemple depuis un cache."""
+        size = len(lat)
+        dynamic = cls(lat[0], lon[0], reserve=max(64, 2 * size), dtype=matrix.dtype)
+        dynamic._data[:size, :size] = matrix
+        dynamic._lat[:size], dynamic._lon[:size] = lat, lon
+        dynamic._alive[:size] = True
+        dynamic._size = size
+        dynamic._slots = {key: slot for slot, key in enumerate(keys, start=1)}
+        return dynamic
+
+    def __len__(self):
+        return len(self._slots)
+
+    def __contains__(self, key):
+        return key in self._slots
+
+    def keys(self):
+        return list(self._slots)
+
+    def _reserve(self, size):
+        if size <= len(self._lat):
+            return
+        capacity = max(size, 2 * len(self._lat))
+        data = np.zeros((capacity, capacity), dtype=self._data.dtype)
+        data[:self._size, :self._size] = self._data[:self._size, :self._size]
+        self._data = data
+        for name in ("_lat", "_lon", "_alive"):
+            old = getattr(self, name)
+            grown = np.zeros(capacity, dtype=old.dtype)
+            grown[:self._size] = old[:self._size]
+            setattr(self, name, grown)
+
+    def add(self, key, lat, lon):
+        self.add_many([key], [lat], [lon])
+
+    def add_many(self, keys, lat, lon):
+        """Ajoute un lot de livraisons : un seul bloc de lignes est calculé."""
+        keys = list(keys)
+        if any(k in self._slots for k in keys) or len(set(keys)) != len(keys):
+            raise KeyError("Delivery keys must be unique")
+        count = len(keys)
+        if count == 0:
+            return
+        start, stop = self._size, self._size + count
+        self._reserve(stop)
+        self._lat[start:stop], self._lon[start:stop] = lat, lon
+        self._alive[start:stop] = True
+        rows = haversine_matrix(self._lat[start:stop], self._lon[start:stop], self._lat[:stop], self._lon[:stop],
+                                dtype=self._data.dtype)
+        self._data[start:stop, :stop] = rows
+        self._data[:stop, start:stop] = rows.T
+        self._slots.update(zip(keys, range(start, stop)))
+        self._size = stop
+
+    def remove(self, key):
+        slot = self._slots.pop(key)
+        self._alive[slot] = False
+        self._dead += 1
+        if self._dead > len(self._slots):
+            self.compact()
+
+    def set_depot(self, lat, lon):
+        """Déplace le dépôt : seule la ligne 0 est recalculée."""
+        self._lat[0], self._lon[0] = lat, lon
+        row = haversine_matrix([lat], [lon], self._lat[:self._size], self._lon[:self._size],
+                               dtype=self._data.dtype)[0]
+        self._data[0, :self._size] = row
+        self._data[:self._size, 0] = row
+
+    def compact(self):
+        keep = np.flatnonzero(self._alive[:self._size])
+        size = len(keep)
+        self._data[:size, :size] = self._data.take(keep, axis=0).take(keep, axis=1)
+        for name in ("_lat", "_lon", "_alive"):
+            array = getattr(self, name)
+            array[:size] = array[keep]
+            array[size:] = 0
+        remap = np.zeros(self._size, dtype=np.intp)
+        remap[keep] = np.arange(size)
+        self._slots = {key: int(remap[slot]) for key, slot in self._slots.items()}
+        self._size = size
+        self._dead = 0
+
+    def matrix(self, keys=None):
+        """Matrice (dépôt + livraisons dans l'ordre de `keys`) ; vue sans copie si possible."""
+        slots = [self._slots[k] for k in (self._slots if keys is None else keys)]
+        if self._dead == 0 and slots == list(range(1, self._size)):
+            return self._data[:self._size, :self._size]
+        index = np.array([0, *slots])
+        return self._data.take(index, axis=0).take(index, axis=1)
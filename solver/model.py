@@ -0,0 +1,267 @@
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from .matrix import haversine
+
+
+# Indexation des nœuds : 0 = dépôt, 1..n = livraisons (dans l'ordre de l'instance)
+DEPOT = 0
+
+# Vitesse moyenne (km/h) qui convertit les distances en temps de trajet pour les fenêtres horaires
+SPEED_KMH = 40.0
+
+# Colonnes de fenêtres horaires (format d'export CSV) et champs correspondants de l'Instance
+TIME_COLUMNS = {"ReadyTime": "ready", "DueTime": "due", "ServiceTime(min)": "service"}
+
+
+@dataclass
+class VehicleType:
+    """Type de véhicule d'un dépôt : capacité (kg), nombre disponible et coûts."""
+
+    name: str
+    capacity: float
+    count: int
+    cost_per_km: float = 1.0
+    fixed_cost: float = 0.0
+
+
+@dataclass
+class Depot:
+    """Dépôt d'une flotte multi-dépôts, avec ses types de véhicules et ses heures d'ouverture."""
+
+    name: str
+    lat: float
+    lon: float
+    vehicles: list = field(default_factory=list)
+    open: float = None
+    close: float = None
+
+    @property
+    def capacity(self):
+        return sum(v.capacity * v.count for v in self.vehicles)
+
+
+@dataclass
+class Instance:
+    """Problème de tournées : un dépôt, des livraisons et une flotte homogène.
+
+    Fenêtres horaires optionnelles, en minutes depuis minuit : ready / due /
+    service par livraison (NaN = sans contrainte), heures d'ouverture du dépôt.
+    Avec `depots` (liste de Depot), la flotte est multi-dépôts et hétérogène :
+    voir solver.fleet ; depot_* et capacity / max_vehicles sont alors ignorés.
+    """
+
+    depot_lat: float
+    depot_lon: float
+    lat: np.ndarray
+    lon: np.ndarray
+    demand: np.ndarray
+    capacity: float
+    max_vehicles: int
+    names: list = field(default_factory=list)
+    ids: list = field(default_factory=list)
+    depot_name: str = "Main Depot"
+    ready: np.ndarray = None
+    due: np.ndarray = None
+    service: np.ndarray = None
+    depot_open: float = None
+    depot_close: float = None
+    speed: float = SPEED_KMH
+    depots: list = field(default_factory=list)
+
+    def __post_init__(self):
+        self.lat = np.asarray(self.lat, dtype=np.float64)
+        self.lon = np.asarray(self.lon, dtype=np.float64)
+        self.demand = np.asarray(self.demand, dtype=np.float64)
+        for name in ("ready", "due", "service"):
+            if getattr(self, name) is not None:
+                setattr(self, name, np.asarray(getattr(self, name), dtype=np.float64))
+        if not self.names:
+            self.names = [f"Customer {i + 1}" for i in range(len(self.lat))]
+        if not self.ids:
+            self.ids = list(range(1, len(self.lat) + 1))
+
+    @property
+    def size(self):
+        return len(self.lat)
+
+    def node_lat(self):
+        return np.concatenate(([self.depot_lat], self.lat))
+
+    def node_lon(self):
+        return np.concatenate(([self.depot_lon], self.lon))
+
+    def node_demand(self):
+        return np.concatenate(([0.0], self.demand))
+
+    def subset(self, nodes, **changes):
+        """Sous-instance réduite aux livraisons `nodes` (indices 0-based), même dépôt et même flotte
+        sauf `changes` ; sans la flotte multi-dépôts."""
+        fields = {name: getattr(self, name) for name in ("depot_lat", "depot_lon", "capacity", "max_vehicles",
+                                                          "depot_name", "depot_open", "depot_close", "speed")}
+        for name in TIME_COLUMNS.values():
+            if getattr(self, name) is not None:
+                fields[name] = getattr(self, name)[nodes]
+        return Instance(
+            lat=self.lat[nodes],
+            lon=self.lon[nodes],
+            demand=self.demand[nodes],
+            names=[self.names[i] for i in nodes],
+            ids=[self.ids[i] for i in nodes],
+            **{**fields, **changes},
+        )
+
+    @property
+    def has_time_windows(self):
+        return any(v is not None for v in (self.ready, self.due, self.service, self.depot_open, self.depot_close))
+
+    @classmethod
+    def from_frame(cls, frame, depot_lat, depot_lon, capacity, max_vehicles, depot_name="Main Depot", **windows):
+        """Construit une instance depuis un DataFrame au format d'export CSV de l'application
+        (colonnes de fenêtres horaires en minutes, voir solver.io) ; `windows` transmet
+        depot_open, depot_close et speed."""
+        names = frame["Name"].astype(str).tolist() if "Name" in frame else []
+        ids = frame["Id"].tolist() if "Id" in frame else []
+        for column, name in TIME_COLUMNS.items():
+            if column in frame:
+                windows[name] = frame[column].to_numpy(dtype=np.float64)
+        return cls(
+            depot_lat=float(depot_lat),
+            depot_lon=float(depot_lon),
+            lat=frame["Latitude"].to_numpy(dtype=np.float64),
+            lon=frame["Longitude"].to_numpy(dtype=np.float64),
+            demand=frame["Demand(kg)"].to_numpy(dtype=np.float64),
+            capacity=float(capacity),
+            max_vehicles=int(max_vehicles),
+            names=names,
+            ids=ids,
+            depot_name=depot_name,
+            **windows,
+        )
+
+
+@dataclass
+class Solution:
+    """Résultat d'optimisation ; chaque route est une liste d'indices de nœuds sans le dépôt.
+
+    timings donne la durée de chaque phase en secondes (matrix, construction, local_search).
+    Avec fenêtres horaires, schedules donne par route les heures (minutes) de départ
+    du dépôt, de début de service de chaque client et de retour au dépôt. En flotte
+    multi-dépôts, route_depots / route_vehicles / route_costs donnent par route l'indice
+    du dépôt (dans instance.depots), le nom du type de véhicule et le coût.
+    """
+
+    routes: list
+    route_distances: list
+    route_loads: list
+    unassigned: list = field(default_factory=list)
+    algorithm: str = ""
+    timings: dict = field(default_factory=dict)
+    schedules: list = field(default_factory=list)
+    route_depots: list = field(default_factory=list)
+    route_vehicles: list = field(default_factory=list)
+    route_costs: list = field(default_factory=list)
+
+    @property
+    def cost(self):
+        return float(sum(self.route_costs)) if self.route_costs else self.distance
+
+    @property
+    def distance(self):
+        return float(sum(self.route_distances))
+
+    @property
+    def load(self):
+        return float(sum(self.route_loads))
+
+
+def route_distance(matrix, route):
+    if len(route) == 0:
+        return 0.0
+    path = np.concatenate(([DEPOT], route, [DEPOT]))
+    return float(matrix[path[:-1], path[1:]].sum())
+
+
+def path_distance(instance, route):
+    """Distance d'une route recalculée depuis les coordonnées (sans matrice)."""
+    if len(route) == 0:
+        return 0.0
+    path = np.concatenate(([DEPOT], route, [DEPOT]))
+    lat, lon = instance.node_lat()[path], instance.node_lon()[path]
+    return float(haversine(lat[:-1], lon[:-1], lat[1:], lon[1:]).sum())
+
+
+def build_solution(matrix, instance, routes, algorithm=""):
+    """Assemble une Solution (distances, charges, non-affectés) à partir de routes brutes.
+
+    Sans matrice (construction seule sur grande instance), les distances sont
+    recalculées depuis les coordonnées.
+    """
+    demand = instance.node_demand()
+    routes = [list(map(int, r)) for r in routes if len(r) > 0]
+    served = np.zeros(instance.size + 1, dtype=bool)
+    for r in routes:
+        served[r] = True
+    unassigned = (np.flatnonzero(~served[1:]) + 1).tolist()
+    return Solution(
+        routes=routes,
+        route_distances=[
+            route_distance(matrix, r) if matrix is not None else path_distance(instance, r) for r in routes
+        ],
+        route_loads=[float(demand[r].sum()) for r in routes],
+        unassigned=unassigned,
+        algorithm=algorithm,
+    )
+
+
+def plan_payload(instance, solution):
+    """Sérialise le plan pour la carte : livraisons (avec fenêtres horaires éventuelles),
+    routes (ids), métriques et horaires par route, durées des phases en millisecondes ;
+    en multi-dépôts, les dépôts et le dépôt / véhicule / coût de chaque route."""
+    deliveries = [
+        {
+            "id": instance.ids[i],
+            "name": instance.names[i],
+            "lat": float(instance.lat[i]),
+            "lon": float(instance.lon[i]),
+            "demand": float(instance.demand[i]),
+        }
+        for i in range(instance.size)
+    ]
+    # Fenêtres horaires : seules les valeurs renseignées sont transmises
+    for name in TIME_COLUMNS.values():
+        values = getattr(instance, name)
+        if values is None:
+            continue
+        for delivery, value in zip(deliveries, values.tolist()):
+            if np.isfinite(value):
+                delivery[name] = value
+    depot = {"name": instance.depot_name, "lat": instance.depot_lat, "lon": instance.depot_lon}
+    if instance.depot_open is not None:
+        depot["open"] = instance.depot_open
+    if instance.depot_close is not None:
+        depot["close"] = instance.depot_close
+    payload = {
+        "depot": depot,
+        "deliveries": deliveries,
+        "capacity": instance.capacity,
+        "algorithm": solution.algorithm,
+        "routes": [[instance.ids[node - 1] for node in r] for r in solution.routes],
+        "routeDistances": solution.route_distances,
+        "routeLoads": solution.route_loads,
+        "unassigned": [instance.ids[node - 1] for node in solution.unassigned],
+        "timings": {phase: round(seconds * 1000, 3) for phase, seconds in solution.timings.items()},
+        "schedules": [[round(t, 2) for t in times] for times in solution.schedules],
+    }
+    if instance.depots:
+        # Flotte multi-dépôts : dépôt, type de véhicule et coût de chaque route
+        payload["depots"] = [
+            {"name": d.name, "lat": d.lat, "lon": d.lon,
+             "vehicles": [{"name": v.name, "capacity": v.capacity, "count": v.count} for v in d.vehicles]}
+            for d in instance.depots
+        ]
+        payload["routeDepots"] = solution.route_depots
+        payload["routeVehicles"] = solution.route_vehicles
+        payload["routeCosts"] = [round(cost, 3) for cost in solution.route_costs]
+    return payload
@@ -0,0 +1,23 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+
+# Démarrage des processus de calcul : "spawn" pour tous les pools, jamais de fork d'un
+# parent multi-thread (Streamlit, service HTTP) dont les verrous seraient copiés tenus
+START_METHOD = "spawn"
+
+
+def process_pool(workers, **kwargs):
+    """Pool de `workers` processus démarrés par START_METHOD."""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=get_context(START_METHOD), **kwargs)
+
+
+def single_process(algorithm, options):
+    """Options de construction d'une tâche exécutée dans un pool appelant.
+
+    Le parallélisme est assuré par ce pool : "genetic" n'ouvre pas son propre
+    pool d'évaluation et reste à un seul processus par tâche.
+    """
+    if algorithm == "genetic":
+        return {**options, "workers": 1}
+    return options
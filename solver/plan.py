@@ -0,0 +1,138 @@
+import numpy as np
+
+from .matrix import DynamicMatrix
+from .model import TIME_COLUMNS, Instance
+
+
+# Au-delà de ce nombre de livraisons, la matrice complète n'est plus maintenue (mémoire en n²)
+MATRIX_LIMIT = 5000
+
+
+class DeliveryPlan:
+    """Livraisons éditables (ajout / suppression) et leur matrice de distances incrémentale.
+
+    La matrice n'est tenue à jour que sous MATRIX_LIMIT livraisons ; au-delà,
+    matrix() retourne None et seuls les algorithmes sans matrice s'appliquent.
+    """
+
+    def __init__(self, depot_lat=48.8566, depot_lon=2.3522, depot_name="Main Depot"):
+        self.depot_lat = float(depot_lat)
+        self.depot_lon = float(depot_lon)
+        self.depot_name = depot_name
+        self.deliveries = {}
+        self.distances = DynamicMatrix(self.depot_lat, self.depot_lon)
+        self._next_id = 1
+
+    def __len__(self):
+        return len(self.deliveries)
+
+    @property
+    def has_matrix(self):
+        return len(self.deliveries) <= MATRIX_LIMIT
+
+    def set_depot(self, lat, lon, name=None):
+        if name is not None:
+            self.depot_name = name
+        if (float(lat), float(lon)) != (self.depot_lat, self.depot_lon):
+            self.depot_lat, self.depot_lon = float(lat), float(lon)
+            if self.distances is not None:
+                self.distances.set_depot(self.depot_lat, self.depot_lon)
+
+    def add_delivery(self, name, lat, lon, demand, delivery_id=None, **windows):
+        windows = {key: [value] for key, value in windows.items()}
+        return self.add_deliveries([name], [lat], [lon], [demand], None if delivery_id is None else [delivery_id],
+                                   **windows)[0]
+
+    def add_deliveries(self, names, lat, lon, demand, ids=None, **windows):
+        """Ajoute un lot de livraisons ; retourne leurs identifiants.
+
+        `windows` accepte des listes ready, due et service (minutes, NaN = sans contrainte).
+        """
+        if ids is None:
+            ids = list(range(self._next_id, self._next_id + len(names)))
+        ids = list(ids)
+        if any(k in self.deliveries for k in ids) or len(set(ids)) != len(ids):
+            raise KeyError("Delivery ids must be unique")
+        for index, (key, name, la, lo, dem) in enumerate(zip(ids, names, lat, lon, demand)):
+            self.deliveries[key] = {"name": str(name), "lat": float(la), "lon": float(lo), "demand": float(dem)}
+            self.deliveries[key].update(_windows(windows, index))
+        if self.distances is not None:
+            if self.has_matrix:
+                self.distances.add_many(ids, lat, lon)
+            else:
+                self.distances = None
+        numeric = [k for k in ids if isinstance(k, (int, np.integer))]
+        if numeric:
+            self._next_id = max(self._next_id, int(max(numeric)) + 1)
+        return ids
+
+    def remove_delivery(self, delivery_id):
+        del self.deliveries[delivery_id]
+        if self.distances is not None:
+            self.distances.remove(delivery_id)
+
+    def clear(self):
+        self.deliveries = {}
+        self.distances = DynamicMatrix(self.depot_lat, self.depot_lon)
+        self._next_id = 1
+
+    def load_frame(self, frame, cache=None):
+        """Remplace les livraisons par celles d'un DataFrame (format d'export CSV) ;
+        la matrice est reprise du cache quand il est fourni."""
+        self.clear()
+        ids = frame["Id"].tolist() if "Id" in frame else list(range(1, len(frame) + 1))
+        names = [f"Customer {i}" for i in ids]
+        if "Name" in frame:
+            names = [name if isinstance(name, str) and name else default
+                     for name, default in zip(frame["Name"].tolist(), names)]
+        lat = frame["Latitude"].to_numpy(dtype=np.float64)
+        lon = frame["Longitude"].to_numpy(dtype=np.float64)
+        demand = frame["Demand(kg)"].to_numpy(dtype=np.float64)
+        windows = {name: frame[col].tolist() for col, name in TIME_COLUMNS.items() if col in frame}
+        if cache is None or len(ids) > MATRIX_LIMIT:
+            self.add_deliveries(names, lat, lon, demand, ids, **windows)
+            return
+        node_lat = np.concatenate(([self.depot_lat], lat))
+        node_lon = np.concatenate(([self.depot_lon], lon))
+        self.distances = DynamicMatrix.from_matrix(cache.get(node_lat, node_lon), node_lat, node_lon, ids)
+        for index, (key, name, la, lo, dem) in enumerate(zip(ids, names, lat, lon, demand)):
+            self.deliveries[key] = {"name": name, "lat": float(la), "lon": float(lo), "demand": float(dem)}
+            self.deliveries[key].update(_windows(windows, index))
+        self._next_id = max([self._next_id] + [int(k) + 1 for k in ids if isinstance(k, (int, np.integer))])
+
+    def matrix(self):
+        """Matrice dans l'ordre des livraisons, ou None au-delà de MATRIX_LIMIT."""
+        if not self.has_matrix:
+            return None
+        if self.distances is None:
+            # Retour sous la limite après des suppressions : reconstruction en un lot
+            values = list(self.deliveries.values())
+            self.distances = DynamicMatrix(self.depot_lat, self.depot_lon)
+            self.distances.add_many(list(self.deliveries), [d["lat"] for d in values], [d["lon"] for d in values])
+        return self.distances.matrix(list(self.deliveries))
+
+    def to_instance(self, capacity, max_vehicles, **windows):
+        """Instance du plan ; `windows` transmet depot_open, depot_close et speed."""
+        values = list(self.deliveries.values())
+        for name in TIME_COLUMNS.values():
+            if any(name in d for d in values):
+                windows[name] = [d.get(name, np.nan) for d in values]
+        return Instance(
+            depot_lat=self.depot_lat,
+            depot_lon=self.depot_lon,
+            lat=[d["lat"] for d in values],
+            lon=[d["lon"] for d in values],
+            demand=[d["demand"] for d in values],
+            capacity=float(capacity),
+            max_vehicles=int(max_vehicles),
+            names=[d["name"] for d in values],
+            ids=list(self.deliveries),
+            depot_name=self.depot_name,
+            **windows,
+        )
+
+
+def _windows(windows, index):
+    """Champs de fenêtre horaire renseignés (non NaN) de la livraison `index`."""
+    values = {name: windows[name][index] for name in windows if windows[name][index] is not None}
+    return {name: float(value) for name, value in values.items() if not np.isnan(value)}
@@ -0,0 +1,353 @@
+import hashlib
+import os
+import re
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import dijkstra
+from scipy.spatial import cKDTree
+
+from .matrix import haversine, haversine_matrix
+
+
+# Vitesses par défaut (km/h) par type de voie OSM ; les autres voies sont ignorées
+SPEEDS = {
+    "motorway": 110, "motorway_link": 60,
+    "trunk": 90, "trunk_link": 50,
+    "primary": 65, "primary_link": 40,
+    "secondary": 55, "secondary_link": 35,
+    "tertiary": 45, "tertiary_link": 30,
+    "unclassified": 35, "residential": 30, "road": 30,
+    "living_street": 10, "service": 15,
+}
+
+# Vitesse d'accès entre un point et le nœud routier le plus proche (km/h)
+ACCESS_SPEED = 15
+
+# Budget mémoire par défaut (octets) des matrices entre nœuds gardées en cache (LRU)
+MEMORY_BUDGET = 256 * 1024 ** 2
+
+# Part minimale de nœuds déjà connus pour dériver une matrice d'une entrée du cache
+REUSE_THRESHOLD = 0.5
+
+# Cellules (sources x nœuds du graphe) calculées par appel à dijkstra
+DIJKSTRA_CELLS = 4_000_000
+
+# Unités entières des poids d'arc : centièmes de seconde et décimètres (par seconde, par km)
+TIME_UNITS = 100
+DISTANCE_UNITS = 10_000
+
+# Bits de mantisse d'un float64 : les sommes d'entiers de dijkstra restent exactes en deçà
+EXACT_BITS = 53
+
+# Paires non reliées par la route : distance à vol d'oiseau multipliée par ce facteur
+UNREACHABLE_FACTOR = 10.0
+
+# Version du format du cache disque (à incrémenter si le prétraitement change)
+CACHE_VERSION = 2
+
+
+def _speed(tags):
+    speed = SPEEDS[tags["highway"]]
+    match = re.match(r"\s*(\d+(?:\.\d+)?)\s*(mph)?", tags.get("maxspeed", ""))
+    if match:
+        speed = float(match.group(1)) * (1.609 if match.group(2) else 1.0)
+    return speed
+
+
+def _direction(tags):
+    """1 = sens de la voie, -1 = sens inverse, 0 = double sens."""
+    oneway = tags.get("oneway", "")
+    if oneway in ("-1", "reverse"):
+        return -1
+    if oneway in ("yes", "true", "1") or tags.get("junction") in ("roundabout", "circular"):
+        return 1
+    if oneway in ("no", "false", "0"):
+        return 0
+    return 1 if tags["highway"] in ("motorway", "motorway_link") else 0
+
+
+def _ways_xml(path):
+    import xml.etree.ElementTree as ET
+
+    coords = {}
+    for _, element in ET.iterparse(path, events=("end",)):
+        if element.tag == "node":
+            coords[int(element.get("id"))] = (float(element.get("lat")), float(element.get("lon")))
+            element.clear()
+        elif element.tag == "way":
+            tags = {tag.get("k"): tag.get("v") for tag in element.iter("tag")}
+            if tags.get("highway") in SPEEDS:
+                yield [int(nd.get("ref")) for nd in element.iter("nd")], tags, coords
+            element.clear()
+
+
+def _ways_pbf(path):
+    import osmium
+
+    coords = {}
+    for obj in osmium.FileProcessor(str(path)).with_locations():
+        if obj.is_node():
+            coords[obj.id] = (obj.location.lat, obj.location.lon)
+        elif obj.is_way() and obj.tags.get("highway") in SPEEDS:
+            yield [n.ref for n in obj.nodes], dict(obj.tags), coords
+
+
+def read_osm(path):
+    """Arcs dirigés du réseau routier d'un extrait OSM (.osm XML, ou .pbf avec pyosmium).
+
+    Retourne (lat, lon, tails, heads, km, secondes) avec des nœuds renumérotés 0..n-1.
+    """
+    path = Path(path)
+    ways = _ways_pbf(path) if path.suffix.lower() == ".pbf" else _ways_xml(path)
+    index, lat, lon, edges = {}, [], [], []
+
+    def node(osm_id, coords):
+        if osm_id not in index:
+            index[osm_id] = len(lat)
+            lat.append(coords[osm_id][0])
+            lon.append(coords[osm_id][1])
+        return index[osm_id]
+
+    for refs, tags, coords in ways:
+        refs = [r for r in refs if r in coords]
+        speed, direction = _speed(tags), _direction(tags)
+        for a, b in zip(refs[:-1], refs[1:]):
+            u, v = node(a, coords), node(b, coords)
+            length = float(haversine(lat[u], lon[u], lat[v], lon[v]))
+            time = length / speed * 3600
+            if direction >= 0:
+                edges.append((u, v, length, time))
+            if direction <= 0:
+                edges.append((v, u, length, time))
+    if not edges:
+        raise ValueError(f"No drivable roads found in {path}")
+    tails, heads, km, seconds = map(np.array, zip(*edges))
+    return np.array(lat), np.array(lon), tails, heads, km, seconds
+
+
+def _unit_vectors(lat, lon):
+    lat, lon = np.radians(lat), np.radians(lon)
+    return np.column_stack((np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)))
+
+
+class RoadNetwork:
+    """Réseau routier (graphe CSR) pour des matrices plusieurs-à-plusieurs.
+
+    Un seul dijkstra (scipy.sparse.csgraph, en C) par point : le poids d'un arc
+    code son temps puis sa longueur en entiers (temps * scale + longueur), le
+    chemin retenu est le plus rapide et sa longueur se lit dans le même total.
+    Chaque recherche s'arrête à une borne tirée d'un nœud pivot ; les matrices
+    entre nœuds sont gardées en mémoire (LRU borné à max_bytes) : une matrice
+    voisine d'une précédente ne recherche que ses nouveaux nœuds. La lecture
+    d'un extrait OSM est mise en cache disque (.npz) : les démarrages suivants
+    ne font que recharger les tableaux.
+    """
+
+    def __init__(self, lat, lon, offsets, heads, km, seconds, max_bytes=MEMORY_BUDGET):
+        self.lat = lat
+        self.lon = lon
+        shape = (len(lat), len(lat))
+        # Plus proche nœud par la corde : même ordre que la distance sur la sphère
+        self._tree = cKDTree(_unit_vectors(lat, lon))
+        # Temps d'au moins une unité : poids tous positifs (csgraph ignore les zéros)
+        time = np.maximum(np.rint(seconds * TIME_UNITS), 1)
+        length = np.rint(km * DISTANCE_UNITS)
+        # Longueur d'un chemin < temps * ratio : avec scale ** 2 >= 2 ** EXACT_BITS * ratio,
+        # elle reste sous scale tant que le total reste exact (sous limit)
+        ratio = max(float((length / time).max(initial=0)), 1.0)
+        self._scale = 2.0 ** np.ceil((EXACT_BITS + np.log2(ratio)) / 2)
+        self._limit = (2.0 ** EXACT_BITS // self._scale - 1) * self._scale
+        self._graph = csr_matrix((time * self._scale + length, heads, offsets), shape=shape)
+        # Graphe transposé : recherches en arrière, vers un nœud
+        self._reverse = self._graph.T.tocsr()
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"hit": 0, "partial": 0, "miss": 0}
+
+    @property
+    def size(self):
+        return len(self.lat)
+
+    @classmethod
+    def build(cls, lat, lon, tails, heads, km, seconds):
+        return cls._from_arrays(cls._preprocess(lat, lon, tails, heads, km, seconds))
+
+    @staticmethod
+    def _preprocess(lat, lon, tails, heads, km, seconds):
+        """Arcs triés par origine (CSR), un seul par couple de nœuds : le plus rapide."""
+        keep = tails != heads
+        tails, heads, km, seconds = tails[keep], heads[keep], km[keep], seconds[keep]
+        order = np.lexsort((seconds, heads, tails))
+        tails, heads, km, seconds = tails[order], heads[order], km[order], seconds[order]
+        first = np.ones(len(tails), dtype=bool)
+        first[1:] = (tails[1:] != tails[:-1]) | (heads[1:] != heads[:-1])
+        offsets = np.zeros(len(lat) + 1, dtype=np.int64)
+        np.add.at(offsets, tails[first] + 1, 1)
+        return {
+            "lat": lat, "lon": lon, "version": np.array(CACHE_VERSION),
+            "offsets": np.cumsum(offsets), "heads": heads[first].astype(np.int64),
+            "km": km[first].astype(np.float64), "seconds": seconds[first].astype(np.float64),
+        }
+
+    @classmethod
+    def _from_arrays(cls, arrays):
+        return cls(*(np.asarray(arrays[key]) for key in ("lat", "lon", "offsets", "heads", "km", "seconds")))
+
+    @classmethod
+    def load(cls, path, cache_dir=None):
+        """Charge un extrait OSM, depuis le cache disque s'il a déjà été prétraité."""
+        path = Path(path)
+        stat = path.stat()
+        key = hashlib.sha1(f"{path.resolve()}:{stat.st_size}:{stat.st_mtime_ns}:{CACHE_VERSION}".encode()).hexdigest()
+        cache = Path(cache_dir) / f"road-{key}.npz" if cache_dir else None
+        if cache is not None and cache.exists():
+            with np.load(cache) as arrays:
+                return cls._from_arrays(dict(arrays))
+
+        arrays = cls._preprocess(*read_osm(path))
+        if cache is not None:
+            cache.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=cache.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as handle:
+                np.savez(handle, **arrays)
+            os.replace(tmp, cache)
+        return cls._from_arrays(arrays)
+
+    def snap(self, lat, lon):
+        """Nœud routier le plus proche de chaque point et distance d'accès (km)."""
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        _, nodes = self._tree.query(_unit_vectors(lat, lon))
+        nodes = np.asarray(nodes, dtype=np.int64)
+        return nodes, haversine(lat, lon, self.lat[nodes], self.lon[nodes])
+
+    def node_matrices(self, nodes):
+        """Matrices (km, secondes) entre des nœuds du graphe triés sans doublons ; inf si non relié.
+
+        Les deux suivent le même chemin, le plus rapide. Si une matrice en cache
+        partage au moins REUSE_THRESHOLD des nœuds, son bloc commun est repris et
+        seuls les nouveaux nœuds sont recherchés, en avant (lignes) puis en
+        arrière (colonnes). Le pivot h, nouveau nœud le plus central, est
+        recherché sans borne ; les autres s'arrêtent à d(s, h) + max d(h, t),
+        majorant de d(s, t) par l'inégalité triangulaire.
+        """
+        nodes = np.asarray(nodes, dtype=np.int64)
+        index, old = self._reuse(nodes)
+        known, fresh = np.flatnonzero(index >= 0), np.flatnonzero(index < 0)
+        cost = np.empty((len(nodes), len(nodes)))
+        if old is not None:
+            cost[np.ix_(known, known)] = old[np.ix_(index[known], index[known])]
+        if len(fresh):
+            centre = _unit_vectors(self.lat[nodes], self.lon[nodes]).mean(axis=0)
+            hub = fresh[np.argmax(_unit_vectors(self.lat[nodes[fresh]], self.lon[nodes[fresh]]) @ centre)]
+            cost[hub] = self._search(self._graph, nodes[[hub]], np.array([np.inf]), nodes)[0]
+            cost[:, hub] = self._search(self._reverse, nodes[[hub]], np.array([np.inf]), nodes)[0]
+            rows = fresh[fresh != hub]
+            cost[rows] = self._search(self._graph, nodes[rows], cost[rows, hub] + cost[hub].max(), nodes)
+            if old is not None:
+                cost[:, rows] = self._search(self._reverse, nodes[rows], cost[hub, rows] + cost[:, hub].max(), nodes).T
+            self._remember(nodes, cost)
+        return self._decode(cost)
+
+    def _search(self, graph, sources, bounds, targets):
+        """Poids codés des sources vers les cibles : dijkstra par lots de bornes voisines.
+
+        Chaque lot s'arrête à la plus grande borne de ses sources (au plus limit) ;
+        au-delà, la cible vaut inf.
+        """
+        bounds = np.minimum(bounds, self._limit)
+        order = np.argsort(bounds)
+        result = np.empty((len(sources), len(targets)))
+        step = max(1, DIJKSTRA_CELLS // max(self.size, 1))
+        for start in range(0, len(order), step):
+            batch = order[start:start + step]
+            result[batch] = dijkstra(graph, indices=sources[batch], limit=bounds[batch].max())[:, targets]
+        return result
+
+    def _decode(self, cost):
+        """(km, secondes) d'une matrice de poids codés ; inf reste inf."""
+        finite = np.isfinite(cost)
+        km = np.full(cost.shape, np.inf)
+        seconds = np.full(cost.shape, np.inf)
+        time = np.floor(cost[finite] / self._scale)
+        km[finite] = (cost[finite] - time * self._scale) / DISTANCE_UNITS
+        seconds[finite] = time / TIME_UNITS
+        return km, seconds
+
+    def _reuse(self, nodes):
+        """(position de chaque nœud dans l'entrée du cache qui en partage le plus, entrée) ;
+        positions à -1 et entrée None si le partage est sous REUSE_THRESHOLD."""
+        with self._lock:
+            entries = list(self._entries.items())
+        best, best_key, best_hits = None, None, 0
+        for key, (old, _) in entries:
+            position = np.minimum(np.searchsorted(old, nodes), len(old) - 1)
+            index = np.where(old[position] == nodes, position, -1)
+            hits = int((index >= 0).sum())
+            if hits > best_hits:
+                best, best_key, best_hits = index, key, hits
+        with self._lock:
+            if best_hits < REUSE_THRESHOLD * len(nodes) or best_key not in self._entries:
+                self.stats["miss"] += 1
+                return np.full(len(nodes), -1), None
+            self._entries.move_to_end(best_key)
+            self.stats["hit" if best_hits == len(nodes) else "partial"] += 1
+            return best, self._entries[best_key][1]
+
+    def _remember(self, nodes, cost):
+        key = hashlib.sha1(nodes.tobytes()).hexdigest()
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (nodes, cost)
+            self._bytes += cost.nbytes
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, (_, old_cost) = self._entries.popitem(last=False)
+                self._bytes -= old_cost.nbytes
+
+    def matrices(self, lat, lon):
+        """Matrices routières (km, secondes) entre des points quelconques, asymétriques.
+
+        Chaque point est rattaché à son nœud le plus proche (trajet d'accès à
+        ACCESS_SPEED) ; les paires non reliées reçoivent UNREACHABLE_FACTOR fois
+        la distance à vol d'oiseau.
+        """
+        lat = np.asarray(lat, dtype=np.float64)
+        lon = np.asarray(lon, dtype=np.float64)
+        nodes, access = self.snap(lat, lon)
+        unique, inverse = np.unique(nodes, return_inverse=True)
+        km, seconds = self.node_matrices(unique)
+        km, seconds = km[np.ix_(inverse, inverse)], seconds[np.ix_(inverse, inverse)]
+
+        offset = access[:, None] + access[None, :]
+        km += offset
+        seconds += offset / ACCESS_SPEED * 3600
+        unreachable = ~np.isfinite(km)
+        if unreachable.any():
+            crow = haversine_matrix(lat, lon) * UNREACHABLE_FACTOR
+            km[unreachable] = crow[unreachable]
+            seconds[unreachable] = crow[unreachable] / ACCESS_SPEED * 3600
+        np.fill_diagonal(km, 0.0)
+        np.fill_diagonal(seconds, 0.0)
+        return km, seconds
+
+
+def road_matrices(instance, network, metric="distance"):
+    """Matrices routières des nœuds de l'instance (0 = dépôt) pour solve() : (matrice, trajets).
+
+    La recherche locale suppose des coûts symétriques : la matrice est la moyenne
+    des deux sens (km, ou minutes pour metric="time"). Les temps de trajet (minutes,
+    dans chaque sens) servent aux fenêtres horaires (argument travel de solve()).
+    """
+    if metric not in ("distance", "time"):
+        raise ValueError(f"Unknown road metric: {metric!r}")
+    km, seconds = network.matrices(instance.node_lat(), instance.node_lon())
+    matrix = km if metric == "distance" else seconds / 60
+    return (matrix + matrix.T) / 2, seconds / 60
@@ -0,0 +1,205 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from .batch import GENETIC_TIME, IMPROVE_TIME, instance_from_dict, solve_instance
+from .engine import ALGORITHMS
+from .model import plan_payload
+from .parallel import process_pool
+
+
+# Demandes en attente ou en cours par processus de calcul ; au-delà, le service répond 429
+QUEUE_PER_WORKER = 4
+
+# Résultats terminés conservés en mémoire (les plus anciens sont oubliés)
+RESULT_LIMIT = 256
+
+# Taille maximale d'un corps de requête (octets)
+MAX_BODY = 64 * 1024 ** 2
+
+
+def request_key(request):
+    """Empreinte d'une demande : deux demandes identiques partagent le même calcul."""
+    canonical = json.dumps(request, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def _solve_request(request):
+    instance = instance_from_dict(request)
+    solution = solve_instance(instance, request.get("algorithm", "nearest"),
+                              float(request.get("timeLimit", IMPROVE_TIME)),
+                              genetic_time=float(request.get("geneticTime", GENETIC_TIME)))
+    return plan_payload(instance, solution)
+
+
+class SolveService:
+    """Pool borné de calculs, avec regroupement des demandes identiques.
+
+    Une demande dont l'empreinte est déjà en attente, en cours ou terminée
+    réutilise ce calcul au lieu d'en lancer un nouveau.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = self.workers * QUEUE_PER_WORKER
+        self._pool = process_pool(self.workers)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"submitted": 0, "coalesced": 0, "rejected": 0}
+
+    def submit(self, request):
+        """Retourne (job, nouveau) ; job vaut None si la file est pleine."""
+        algorithm = request.get("algorithm", "nearest")
+        if not isinstance(algorithm, str) or algorithm not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algorithm!r}")
+        if not isinstance(request.get("deliveries"), list):
+            raise ValueError("Request must contain a 'deliveries' list")
+        key = request_key(request)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and not (job["future"].done() and job["future"].exception() is not None):
+                self._jobs.move_to_end(key)
+                self.stats["coalesced"] += 1
+                return job, False
+            if self.pending() >= self.max_pending:
+                self.stats["rejected"] += 1
+                return None, False
+            job = {"id": key, "submitted": time.time(), "future": self._pool.submit(_solve_request, request)}
+            self._jobs[key] = job
+            self.stats["submitted"] += 1
+            self._evict()
+            return job, True
+
+    def pending(self):
+        return sum(not job["future"].done() for job in self._jobs.values())
+
+    def _evict(self):
+        done = [key for key, job in self._jobs.items() if job["future"].done()]
+        for key in done[:max(0, len(done) - RESULT_LIMIT)]:
+            del self._jobs[key]
+
+    def get(self, key):
+        with self._lock:
+            return self._jobs.get(key)
+
+    @staticmethod
+    def status(job):
+        future = job["future"]
+        if not future.done():
+            return {"id": job["id"], "status": "running" if future.running() else "queued"}
+        error = future.exception()
+        if error is not None:
+            return {"id": job["id"], "status": "error", "error": f"{type(error).__name__}: {error}"}
+        return {"id": job["id"], "status": "done"}
+
+    def close(self):
+        self._pool.shutdown(cancel_futures=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    service = None
+
+    def _send(self, status, body, headers=None):
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _job(self, prefix):
+        job = self.service.get(self.path[len(prefix):])
+        if job is None:
+            self._send(HTTPStatus.NOT_FOUND, {"error": "Unknown job id"})
+        return job
+
+    def do_POST(self):
+        if self.path != "/solve":
+            return self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+            if length < 0:
+                raise ValueError("Content-Length must not be negative")
+            if length > MAX_BODY:
+                return self._send(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "Request body too large"})
+            request = json.loads(self.rfile.read(length) or b"{}")
+            if not isinstance(request, dict):
+                raise ValueError("Request body must be a JSON object")
+            job, created = self.service.submit(request)
+        except ValueError as error:
+            return self._send(HTTPStatus.BAD_REQUEST, {"error": str(error)})
+        if job is None:
+            return self._send(HTTPStatus.TOO_MANY_REQUESTS, {"error": "Solver queue is full"}, {"Retry-After": "1"})
+        self._send(HTTPStatus.ACCEPTED if created else HTTPStatus.OK,
+                   {**self.service.status(job), "coalesced": not created},
+                   {"Location": f"/result/{job['id']}"})
+
+    def do_GET(self):
+        if self.path == "/health":
+            return self._send(HTTPStatus.OK, {
+                "workers": self.service.workers, "pending": self.service.pending(), **self.service.stats,
+            })
+        if self.path.startswith("/status/"):
+            job = self._job("/status/")
+            if job is not None:
+                self._send(HTTPStatus.OK, self.service.status(job))
+            return
+        if self.path.startswith("/result/"):
+            job = self._job("/result/")
+            if job is None:
+                return
+            status = self.service.status(job)
+            if status["status"] == "done":
+                return self._send(HTTPStatus.OK, job["future"].result())
+            if status["status"] == "error":
+                return self._send(HTTPStatus.UNPROCESSABLE_ENTITY, status)
+            return self._send(HTTPStatus.ACCEPTED, status, {"Retry-After": "1"})
+        self._send(HTTPStatus.NOT_FOUND, {"error": f"Unknown endpoint: {self.path}"})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(host="127.0.0.1", port=8765, workers=None):
+    """Serveur HTTP/JSON autour d'un SolveService (port 0 = port libre).
+
+    POST /solve (instance au format JSON de batch, plus "algorithm", "timeLimit" de post-optimisation
+    et "geneticTime"),
+    GET /status/<id>, GET /result/<id>, GET /health.
+    """
+    handler = type("SolveHandler", (_Handler,), {"service": SolveService(workers)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m solver.service", description="Local HTTP/JSON route solving API.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("-w", "--workers", type=int, default=None, help="solver processes (default: CPU count)")
+    args = parser.parse_args(argv)
+
+    server = make_server(args.host, args.port, args.workers)
+    print(f"Serving on http://{args.host}:{server.server_port}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.RequestHandlerClass.service.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,185 @@
+import heapq
+
+import numpy as np
+
+from .matrix import EARTH_RADIUS_KM
+
+
+# Nombre moyen de points visés par cellule de la grille
+POINTS_PER_CELL = 2
+
+# Itérations maximales des k-moyennes (arrêt dès que les étiquettes sont stables)
+KMEANS_ITERATIONS = 50
+
+EPSILON = 1e-9
+
+
+def project(lat, lon, lat0, lon0):
+    """Projection équirectangulaire locale en km autour de (lat0, lon0)."""
+    x = np.radians(np.asarray(lon) - lon0) * np.cos(np.radians(lat0)) * EARTH_RADIUS_KM
+    y = np.radians(np.asarray(lat) - lat0) * EARTH_RADIUS_KM
+    return x, y
+
+
+def kmeans(x, y, k, iterations=KMEANS_ITERATIONS, seed=0):
+    """K-moyennes (Lloyd) vectorisées, initialisation k-means++ ; retourne (centres k x 2, étiquettes)."""
+    points = np.column_stack((x, y)).astype(np.float64)
+    n = len(points)
+    k = max(1, min(k, n))
+    rng = np.random.default_rng(seed)
+    centers = np.empty((k, 2))
+    centers[0] = points[rng.integers(n)]
+    closest = ((points - centers[0]) ** 2).sum(axis=1)
+    for c in range(1, k):
+        total = closest.sum()
+        index = rng.choice(n, p=closest / total) if total > 0 else rng.integers(n)
+        centers[c] = points[index]
+        closest = np.minimum(closest, ((points - centers[c]) ** 2).sum(axis=1))
+
+    labels = np.full(n, -1)
+    for _ in range(iterations):
+        previous = labels
+        labels = squared_distances(points, centers).argmin(axis=1)
+        if np.array_equal(labels, previous):
+            break
+        counts = np.bincount(labels, minlength=k)
+        filled = counts > 0
+        for axis in range(2):
+            sums = np.bincount(labels, weights=points[:, axis], minlength=k)
+            centers[filled, axis] = sums[filled] / counts[filled]
+    return centers, labels
+
+
+def squared_distances(points, centers):
+    """Distances euclidiennes au carré points x centres, sans temporaire n x k x 2."""
+    d2 = (points ** 2).sum(axis=1)[:, None] - 2 * points @ centers.T + (centers ** 2).sum(axis=1)[None, :]
+    return np.maximum(d2, 0.0)
+
+
+def balanced_assignment(dist, demand, capacity, choice=None):
+    """Affectation de points (lignes de `dist`) à des groupes (colonnes) sous capacité de demande.
+
+    Chaque point va au groupe le plus proche (ou `choice`) ; un groupe trop chargé
+    cède ses points les moins pénalisés (plus faible surcoût de distance) au plus
+    proche groupe ayant encore de la marge. Un point sans groupe possible reste affecté.
+    """
+    demand = np.asarray(demand, dtype=np.float64)
+    capacity = np.asarray(capacity, dtype=np.float64)
+    groups = dist.shape[1]
+    choice = dist.argmin(axis=1) if choice is None else np.array(choice)
+    load = np.bincount(choice, weights=demand, minlength=groups)
+
+    for _ in range(groups):
+        moved = False
+        for d in np.flatnonzero(load > capacity + EPSILON):
+            members = np.flatnonzero(choice == d)
+            alt = np.where(capacity - load >= demand[members, None], dist[members], np.inf)
+            alt[:, d] = np.inf
+            target = alt.argmin(axis=1)
+            regret = alt[np.arange(len(members)), target] - dist[members, d]
+            for i in np.argsort(regret, kind="stable"):
+                if load[d] <= capacity[d] + EPSILON or not np.isfinite(regret[i]):
+                    break
+                u, e = members[i], target[i]
+                if load[e] + demand[u] > capacity[e] + EPSILON:
+                    continue
+                choice[u] = e
+                load[d] -= demand[u]
+                load[e] += demand[u]
+                moved = True
+        if not moved:
+            break
+    return choice
+
+
+class GridIndex:
+    """Grille uniforme sur coordonnées projetées, avec suppression, pour les requêtes
+    « plus proche point vivant dont la demande tient dans la capacité restante »."""
+
+    def __init__(self, x, y, demand, cell=None):
+        self.x = np.asarray(x, dtype=np.float64)
+        self.y = np.asarray(y, dtype=np.float64)
+        self.demand = np.asarray(demand, dtype=np.float64)
+        n = len(self.x)
+        self.alive = np.ones(n, dtype=bool)
+        self.count = n
+        if n == 0:
+            self.cell, self.x0, self.y0, self.extent, self.cells = 1.0, 0.0, 0.0, 0, {}
+            self._demands = []
+            return
+
+        self.x0, self.y0 = self.x.min(), self.y.min()
+        width = max(self.x.max() - self.x0, 1e-9)
+        height = max(self.y.max() - self.y0, 1e-9)
+        self.cell = cell or max(np.sqrt(width * height * POINTS_PER_CELL / n), 1e-6)
+
+        cx = ((self.x - self.x0) // self.cell).astype(np.int64)
+        cy = ((self.y - self.y0) // self.cell).astype(np.int64)
+        self.extent = int(max(cx.max(), cy.max())) + 1
+        # Regroupement des points par cellule en une passe (tri par clé)
+        keys = cx * (self.extent + 1) + cy
+        order = np.argsort(keys, kind="stable")
+        bounds = np.flatnonzero(np.diff(keys[order])) + 1
+        self.cells = {
+            (int(cx[group[0]]), int(cy[group[0]])): set(group.tolist())
+            for group in np.split(order, bounds)
+        }
+        self._demands = list(zip(self.demand.tolist(), range(n)))
+        heapq.heapify(self._demands)
+
+    def _key(self, px, py):
+        return int((px - self.x0) // self.cell), int((py - self.y0) // self.cell)
+
+    def remove(self, i):
+        if self.alive[i]:
+            self.alive[i] = False
+            self.count -= 1
+            self.cells[self._key(self.x[i], self.y[i])].discard(i)
+
+    def min_demand(self):
+        while self._demands and not self.alive[self._demands[0][1]]:
+            heapq.heappop(self._demands)
+        return self._demands[0][0] if self._demands else np.inf
+
+    def _ring(self, cx, cy, r):
+        if r == 0:
+            yield cx, cy
+            return
+        for dx in range(-r, r + 1):
+            yield cx + dx, cy - r
+            yield cx + dx, cy + r
+        for dy in range(-r + 1, r):
+            yield cx - r, cy + dy
+            yield cx + r, cy + dy
+
+    def _brute_force(self, px, py, max_demand):
+        candidates = np.flatnonzero(self.alive & (self.demand <= max_demand))
+        if len(candidates) == 0:
+            return None
+        d2 = (self.x[candidates] - px) ** 2 + (self.y[candidates] - py) ** 2
+        return int(candidates[np.argmin(d2)])
+
+    def nearest(self, px, py, max_demand=np.inf):
+        """Indice du point vivant le plus proche de (px, py) avec demande <= max_demand, ou None."""
+        if self.count == 0 or self.min_demand() > max_demand:
+            return None
+        cx, cy = self._key(px, py)
+        # Anneaux nécessaires pour couvrir toute la grille depuis la cellule de la requête
+        last = max(abs(cx), abs(cy), abs(self.extent - cx), abs(self.extent - cy))
+        best, best_d2, scanned = None, np.inf, 0
+        for r in range(last + 1):
+            for key in self._ring(cx, cy, r):
+                scanned += 1
+                for i in self.cells.get(key, ()):
+                    if self.demand[i] > max_demand:
+                        continue
+                    d2 = (self.x[i] - px) ** 2 + (self.y[i] - py) ** 2
+                    if d2 < best_d2:
+                        best, best_d2 = i, d2
+            # Tout point des anneaux suivants est à au moins r cellules de la requête
+            if best is not None and best_d2 <= (r * self.cell) ** 2:
+                break
+            # Grille clairsemée : un balayage vectorisé des points restants coûte moins cher
+            if scanned > self.count:
+                return self._brute_force(px, py, max_demand)
+        return None if best is None else int(best)
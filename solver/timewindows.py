@@ -0,0 +1,230 @@
+import re
+
+import numpy as np
+
+from .matrix import nearest_neighbors
+from .model import DEPOT
+
+
+# Voisins considérés pour réinsérer un client (toutes les positions si aucun n'est routé)
+REPAIR_NEIGHBORS = 20
+
+EPSILON = 1e-9
+
+_TIME_PATTERN = re.compile(r"^\s*(\d{1,2})[:hH](\d{2})(?::(\d{2}))?\s*$")
+
+
+def parse_time(value):
+    """Heure en minutes depuis minuit : "HH:MM", "HH:MM:SS", "9h30", datetime.time ou nombre de minutes.
+
+    Une valeur vide donne NaN (pas de contrainte) ; une valeur illisible lève ValueError.
+    """
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return np.nan
+    if hasattr(value, "hour") and hasattr(value, "minute"):
+        return value.hour * 60 + value.minute + getattr(value, "second", 0) / 60
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return float(value)
+    text = str(value).strip()
+    if not text:
+        return np.nan
+    match = _TIME_PATTERN.match(text)
+    if match:
+        hours, minutes, seconds = int(match[1]), int(match[2]), int(match[3] or 0)
+        if hours <= 24 and minutes < 60 and seconds < 60:
+            return hours * 60 + minutes + seconds / 60
+    try:
+        return float(text)
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r}") from None
+
+
+def parse_window(text):
+    """Fenêtre "HH:MM-HH:MM" (bornes optionnelles) ; retourne (début, fin) en minutes, NaN si absente."""
+    if text is None or not str(text).strip():
+        return np.nan, np.nan
+    start, separator, end = str(text).partition("-")
+    if not separator:
+        raise ValueError(f"Invalid time window: {text!r}")
+    return parse_time(start), parse_time(end)
+
+
+def format_time(minutes):
+    """Minutes depuis minuit -> "HH:MM" (au-delà de 24 h, le jour est préfixé : "+1 08:00")."""
+    if minutes is None or not np.isfinite(minutes):
+        return ""
+    total = int(round(minutes))
+    days, rest = divmod(total, 24 * 60)
+    text = f"{rest // 60:02d}:{rest % 60:02d}"
+    return f"+{days} {text}" if days else text
+
+
+class TimeWindows:
+    """Fenêtres horaires des nœuds (0 = dépôt) et temps de trajet en minutes.
+
+    schedule() met en cache, pour chaque position d'une route, le début de service
+    au plus tôt (passe avant) et au plus tard (passe arrière, marge comprise) :
+    une route modifiée garde son préfixe et son suffixe, si bien qu'une insertion
+    ou un mouvement se vérifie en raccordant le préfixe (heure au plus tôt) aux
+    quelques clients déplacés puis au suffixe (heure au plus tard), en O(1).
+    Les états manipulés sont des couples (heure de début de service, dernier nœud).
+    """
+
+    def __init__(self, travel, ready, due, service):
+        self.travel = travel
+        self.ready = ready.tolist()
+        self.due = due.tolist()
+        self.service = service.tolist()
+
+    @classmethod
+    def from_instance(cls, instance, matrix, travel=None):
+        """Fenêtres de l'instance ; les temps de trajet sont `travel` (minutes, par exemple
+        routiers) ou, à défaut, les distances (km) de la matrice à instance.speed."""
+        n = instance.size
+
+        def column(values, default):
+            values = np.full(n, default) if values is None else np.asarray(values, dtype=np.float64)
+            return np.where(np.isnan(values), default, values)
+
+        ready = np.concatenate(([instance.depot_open or 0.0], column(instance.ready, 0.0)))
+        close = instance.depot_close if instance.depot_close is not None else np.inf
+        due = np.concatenate(([close], column(instance.due, np.inf)))
+        service = np.concatenate(([0.0], column(instance.service, 0.0)))
+        if travel is None:
+            travel = np.asarray(matrix) * (60.0 / instance.speed)
+        return cls(np.asarray(travel), ready, due, service)
+
+    def schedule(self, path):
+        """(au plus tôt, au plus tard) pour chaque position d'un chemin dépôt ... dépôt."""
+        travel, ready, due, service = self.travel, self.ready, self.due, self.service
+        earliest = [ready[path[0]]]
+        for prev, v in zip(path, path[1:]):
+            earliest.append(max(ready[v], earliest[-1] + service[prev] + travel[prev, v]))
+        latest = [due[path[-1]]]
+        for v, nxt in zip(path[-2::-1], path[:0:-1]):
+            latest.append(min(due[v], latest[-1] - travel[v, nxt] - service[v]))
+        return earliest, latest[::-1]
+
+    def feasible(self, path):
+        earliest, _ = self.schedule(path)
+        return all(t <= self.due[v] + EPSILON for t, v in zip(earliest, path))
+
+    def extend(self, state, nodes):
+        """Prolonge un état par des nœuds ; None dès qu'une fenêtre est manquée."""
+        if state is None:
+            return None
+        time, prev = state
+        travel, ready, due, service = self.travel, self.ready, self.due, self.service
+        for v in nodes:
+            time = max(ready[v], time + service[prev] + travel[prev, v])
+            if time > due[v] + EPSILON:
+                return None
+            prev = v
+        return time, prev
+
+    def extend_run(self, state, path, earliest, a, b):
+        """Prolonge par path[a..b] dans son ordre d'origine.
+
+        Dès qu'un client est atteint au plus tard à son heure au plus tôt d'origine,
+        la suite du morceau est faisable et finit au plus tard à earliest[b].
+        """
+        if state is None:
+            return None
+        time, prev = state
+        travel, ready, due, service = self.travel, self.ready, self.due, self.service
+        for p in range(a, b + 1):
+            v = path[p]
+            time = max(ready[v], time + service[prev] + travel[prev, v])
+            if time > due[v] + EPSILON:
+                return None
+            if time <= earliest[p]:
+                return earliest[b], path[b]
+            prev = v
+        return time, prev
+
+    def closes(self, state, path, latest, j):
+        """Vrai si l'état rejoint le suffixe inchangé path[j:] sans dépasser son heure au plus tard."""
+        if state is None:
+            return False
+        time, prev = state
+        return time + self.service[prev] + self.travel[prev, path[j]] <= latest[j] + EPSILON
+
+    def insertion(self, path, times, t, node):
+        """Vrai si node peut être inséré entre path[t] et path[t + 1]."""
+        earliest, latest = times
+        return self.closes(self.extend((earliest[t], path[t]), (node,)), path, latest, t + 1)
+
+
+def repair_routes(matrix, routes, demand, capacity, max_vehicles, windows, k=REPAIR_NEIGHBORS):
+    """Rend des routes compatibles avec les fenêtres horaires.
+
+    Les clients servis hors fenêtre (et ceux laissés de côté par la construction)
+    sont retirés puis réinsérés au moindre coût, fenêtres les plus serrées d'abord,
+    parmi les positions voisines de leurs k plus proches voisins ; chaque position
+    se teste en O(1) grâce aux heures au plus tôt / au plus tard en cache. À défaut,
+    une nouvelle route est ouverte si la flotte le permet.
+    """
+    demand = demand.tolist() if isinstance(demand, np.ndarray) else list(demand)
+    paths, removed = [], []
+    for route in routes:
+        path, time = [DEPOT], windows.ready[DEPOT]
+        for v in route:
+            state = windows.extend((time, path[-1]), (v,))
+            if state is None:
+                removed.append(v)
+            else:
+                time = state[0]
+                path.append(v)
+        path.append(DEPOT)
+        # Retour tardif au dépôt : retirer les derniers clients jusqu'à respecter la fermeture
+        while len(path) > 2 and not windows.feasible(path):
+            removed.append(path.pop(-2))
+        if len(path) > 2:
+            paths.append(path)
+
+    served = np.zeros(len(demand), dtype=bool)
+    served[[v for p in paths for v in p]] = True
+    served[removed] = True
+    removed += [v for v in range(1, len(demand)) if not served[v] and demand[v] <= capacity]
+    if not removed:
+        return [p[1:-1] for p in paths]
+
+    near = nearest_neighbors(matrix, k).tolist()
+    loads = [sum(demand[v] for v in p) for p in paths]
+    times = [windows.schedule(p) for p in paths]
+    route_of, pos = {}, {}
+
+    def index(r):
+        for t, v in enumerate(paths[r][1:-1], start=1):
+            route_of[v], pos[v] = r, t
+
+    def cheapest(u, candidates):
+        best = None
+        for r, t in candidates:
+            if loads[r] + demand[u] > capacity or not windows.insertion(paths[r], times[r], t, u):
+                continue
+            a, b = paths[r][t], paths[r][t + 1]
+            delta = matrix[a, u] + matrix[u, b] - matrix[a, b]
+            if best is None or delta < best[0]:
+                best = (delta, r, t)
+        return best
+
+    for r in range(len(paths)):
+        index(r)
+    for u in sorted(removed, key=lambda v: (windows.due[v], windows.ready[v])):
+        best = cheapest(u, {(route_of[v], t) for v in near[u] if v in route_of for t in (pos[v] - 1, pos[v])})
+        if best is None:
+            best = cheapest(u, [(r, t) for r, p in enumerate(paths) for t in range(len(p) - 1)])
+        if best is None:
+            if len(paths) >= max_vehicles or not windows.feasible([DEPOT, u, DEPOT]):
+                continue
+            paths.append([DEPOT, DEPOT])
+            loads.append(0.0)
+            times.append(None)
+            best = (0.0, len(paths) - 1, 0)
+        _, r, t = best
+        paths[r].insert(t + 1, u)
+        loads[r] += demand[u]
+        times[r] = windows.schedule(paths[r])
+        index(r)
+    return [p[1:-1] for p in paths]
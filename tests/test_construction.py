@@ -0,0 +1,84 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from solver.construction import nearest_neighbor, savings, sweep
+from solver.genetic import decode, split
+from solver.matrix import distance_matrix
+from solver.model import Instance, route_distance
+
+
+def _instance(seed, size, capacity=100.0):
+    rng = np.random.default_rng(seed)
+    demand = rng.integers(1, 40, size).astype(float)
+    # Une livraison plus lourde que la capacité : jamais servie
+    demand[0] = capacity + 1
+    return Instance(
+        depot_lat=48.85, depot_lon=2.35,
+        lat=48.85 + rng.normal(0, 0.05, size), lon=2.35 + rng.normal(0, 0.05, size),
+        demand=demand, capacity=capacity, max_vehicles=size,
+    )
+
+
+def _check_routes(instance, routes):
+    """Chaque livraison servable une seule fois, aucune route au-delà de la capacité."""
+    demand = instance.node_demand()
+    served = [v for route in routes for v in route]
+    expected = [v for v in range(1, instance.size + 1) if demand[v] <= instance.capacity]
+    assert sorted(served) == expected
+    for route in routes:
+        assert route
+        assert demand[route].sum() <= instance.capacity
+
+
+@pytest.mark.parametrize("build", [savings, sweep, nearest_neighbor])
+@pytest.mark.parametrize("seed, size", [(0, 12), (1, 60), (2, 250)])
+def test_construction_covers_every_customer_within_capacity(build, seed, size):
+    instance = _instance(seed, size)
+    _check_routes(instance, build(distance_matrix(instance), instance))
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_savings_on_neighbor_lists(seed):
+    # Peu de voisins : les paires candidates ne sont plus toutes les paires
+    instance = _instance(seed, 80)
+    _check_routes(instance, savings(distance_matrix(instance), instance, neighbors=5))
+
+
+def _brute_force_split(matrix, tour, demand, capacity):
+    """Meilleur découpage par énumération de toutes les positions de coupe."""
+    best = np.inf
+    for mask in range(2 ** (len(tour) - 1)):
+        cuts = [i + 1 for i in range(len(tour) - 1) if mask >> i & 1] + [len(tour)]
+        routes = [tour[a:b] for a, b in zip([0] + cuts[:-1], cuts)]
+        if all(demand[r].sum() <= capacity for r in routes):
+            best = min(best, sum(route_distance(matrix, r) for r in routes))
+    return best
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_split_is_feasible_and_optimal(seed):
+    rng = np.random.default_rng(seed)
+    instance = _instance(seed, 9)
+    # Sans la livraison impossible : un tour géant ne contient que des clients servables
+    tour = rng.permutation(np.arange(2, instance.size + 1))
+    matrix = distance_matrix(instance)
+    demand = instance.node_demand()
+
+    cost, cuts = split(matrix, tour, demand, instance.capacity)
+    routes = decode(matrix, tour, demand, instance.capacity)
+    assert [v for route in routes for v in route] == tour.tolist()
+    assert len(routes) == len(cuts)
+    assert all(demand[route].sum() <= instance.capacity for route in routes)
+    assert cost == pytest.approx(sum(route_distance(matrix, route) for route in routes))
+    assert cost == pytest.approx(_brute_force_split(matrix, tour, demand, instance.capacity))
+
+
+def test_split_on_long_tour_stays_feasible():
+    instance = _instance(7, 400, capacity=60.0)
+    tour = np.random.default_rng(7).permutation(np.arange(2, instance.size + 1))
+    demand = instance.node_demand()
+    routes = decode(distance_matrix(instance), tour, demand, instance.capacity)
+    assert list(itertools.chain.from_iterable(routes)) == tour.tolist()
+    assert all(demand[route].sum() <= instance.capacity for route in routes)
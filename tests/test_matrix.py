@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from solver.matrix import DynamicMatrix, haversine_matrix
+
+
+def _recompute(depot, points, keys):
+    """Matrice complète recalculée : dépôt puis livraisons dans l'ordre de `keys`."""
+    lat = [depot[0], *(points[k][0] for k in keys)]
+    lon = [depot[1], *(points[k][1] for k in keys)]
+    return haversine_matrix(lat, lon)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_edits_match_full_recompute(seed):
+    rng = np.random.default_rng(seed)
+    depot = (48.85, 2.35)
+    dynamic = DynamicMatrix(*depot, reserve=4)
+    points, next_key = {}, 0
+    for step in range(300):
+        action = rng.random()
+        if action < 0.55 or not points:
+            # Lot de 1 à 5 ajouts : agrandit le tampon au-delà de sa réserve
+            count = int(rng.integers(1, 6))
+            keys = list(range(next_key, next_key + count))
+            next_key += count
+            lat = 48.85 + rng.normal(0, 0.05, count)
+            lon = 2.35 + rng.normal(0, 0.05, count)
+            dynamic.add_many(keys, lat, lon)
+            points.update(zip(keys, zip(lat, lon)))
+        elif action < 0.95:
+            # Suppressions : la compaction se déclenche quand les morts dépassent les vivants
+            key = list(points)[int(rng.integers(len(points)))]
+            dynamic.remove(key)
+            del points[key]
+        else:
+            depot = (48.85 + rng.normal(0, 0.05), 2.35 + rng.normal(0, 0.05))
+            dynamic.set_depot(*depot)
+
+        assert len(dynamic) == len(points)
+        assert dynamic.keys() == list(points)
+        np.testing.assert_allclose(dynamic.matrix(), _recompute(depot, points, list(points)), atol=1e-9)
+
+    keys = list(points)
+    rng.shuffle(keys)
+    np.testing.assert_allclose(dynamic.matrix(keys), _recompute(depot, points, keys), atol=1e-9)
+    dynamic.compact()
+    np.testing.assert_allclose(dynamic.matrix(keys), _recompute(depot, points, keys), atol=1e-9)
+
+
+def test_duplicate_keys_are_rejected():
+    dynamic = DynamicMatrix(48.85, 2.35)
+    dynamic.add("a", 48.86, 2.36)
+    with pytest.raises(KeyError):
+        dynamic.add("a", 48.87, 2.37)
+    with pytest.raises(KeyError):
+        dynamic.add_many(["b", "b"], [48.87, 48.88], [2.37, 2.38])
+    assert dynamic.keys() == ["a"]
+
+
+def test_from_matrix_continues_incrementally():
+    rng = np.random.default_rng(0)
+    lat = np.r_[48.85, 48.85 + rng.normal(0, 0.05, 10)]
+    lon = np.r_[2.35, 2.35 + rng.normal(0, 0.05, 10)]
+    dynamic = DynamicMatrix.from_matrix(haversine_matrix(lat, lon), lat, lon, keys=range(10))
+    dynamic.add(10, 48.9, 2.4)
+    dynamic.remove(3)
+    keep = [0, *(k + 1 for k in range(10) if k != 3)]
+    expected = haversine_matrix(np.r_[lat[keep], 48.9], np.r_[lon[keep], 2.4])
+    np.testing.assert_allclose(dynamic.matrix(), expected, atol=1e-9)
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+from solver.model import DEPOT
+from solver.timewindows import TimeWindows
+
+
+def _windows(seed, size):
+    """Fenêtres aléatoires, certaines serrées, sur des temps de trajet asymétriques."""
+    rng = np.random.default_rng(seed)
+    travel = rng.uniform(5, 40, (size + 1, size + 1))
+    np.fill_diagonal(travel, 0.0)
+    ready = np.r_[480.0, rng.uniform(480, 900, size)]
+    due = np.r_[1200.0, ready[1:] + rng.choice([30.0, 120.0, 600.0], size)]
+    service = np.r_[0.0, rng.uniform(0, 15, size)]
+    return TimeWindows(travel, ready, due, service)
+
+
+def _simulate(windows, path):
+    """Planning pas à pas : vrai si chaque nœud est servi avant sa fin de fenêtre."""
+    time = windows.ready[path[0]]
+    for prev, v in zip(path, path[1:]):
+        time = max(windows.ready[v], time + windows.service[prev] + windows.travel[prev, v])
+        if time > windows.due[v] + 1e-9:
+            return False
+    return True
+
+
+def _feasible_path(windows, rng, size):
+    """Chemin dépôt ... dépôt faisable, construit par insertion en fin tant que possible."""
+    path = [DEPOT]
+    for v in rng.permutation(np.arange(1, size + 1)).tolist():
+        if _simulate(windows, [*path, v, DEPOT]):
+            path.append(v)
+    return [*path, DEPOT]
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_schedule_matches_simulation(seed):
+    windows = _windows(seed, 15)
+    rng = np.random.default_rng(seed)
+    path = _feasible_path(windows, rng, 15)
+    earliest, latest = windows.schedule(path)
+    assert windows.feasible(path) and _simulate(windows, path)
+    time = windows.ready[DEPOT]
+    for p in range(1, len(path)):
+        time = max(windows.ready[path[p]], time + windows.service[path[p - 1]] + windows.travel[path[p - 1], path[p]])
+        assert earliest[p] == pytest.approx(time)
+    # Au plus tard : servir path[p] à latest[p] garde le suffixe faisable, une minute de plus non
+    for p in range(1, len(path) - 1):
+        assert windows.closes((latest[p], path[p]), path, latest, p + 1)
+        if latest[p] < windows.due[path[p]]:
+            assert not windows.closes((latest[p] + 1.0, path[p]), path, latest, p + 1)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_extend_and_closes_match_simulation(seed):
+    size = 12
+    windows = _windows(seed, size)
+    rng = np.random.default_rng(100 + seed)
+    path = _feasible_path(windows, rng, size)
+    earliest, latest = windows.schedule(path)
+    outside = [v for v in range(1, size + 1) if v not in path]
+    for _ in range(300):
+        # Chemin modifié : préfixe path[..t], quelques nœuds, suffixe path[j..]
+        t = int(rng.integers(0, len(path) - 1))
+        j = int(rng.integers(t + 1, len(path)))
+        pool = outside + path[t + 1:j]
+        nodes = rng.permutation(pool)[:int(rng.integers(0, min(3, len(pool)) + 1))].tolist()
+        candidate = path[:t + 1] + nodes + path[j:]
+        state = windows.extend((earliest[t], path[t]), nodes)
+        assert windows.closes(state, path, latest, j) == _simulate(windows, candidate)
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_insertion_matches_simulation(seed):
+    size = 12
+    windows = _windows(seed, size)
+    path = _feasible_path(windows, np.random.default_rng(seed), size)
+    times = windows.schedule(path)
+    for node in (v for v in range(1, size + 1) if v not in path):
+        for t in range(len(path) - 1):
+            expected = _simulate(windows, path[:t + 1] + [node] + path[t + 1:])
+            assert windows.insertion(path, times, t, node) == expected
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_extend_run_never_accepts_an_infeasible_move(seed):
+    size = 12
+    windows = _windows(seed, size)
+    rng = np.random.default_rng(200 + seed)
+    path = _feasible_path(windows, rng, size)
+    earliest, latest = windows.schedule(path)
+    for _ in range(200):
+        # Or-opt vers l'avant : path[i..k] déplacé après path[t], path[k+1..t] garde son ordre
+        if len(path) < 5:
+            break
+        i = int(rng.integers(1, len(path) - 3))
+        k = int(rng.integers(i, len(path) - 3))
+        t = int(rng.integers(k + 1, len(path) - 1))
+        segment = path[i:k + 1]
+        candidate = path[:i] + path[k + 1:t + 1] + segment + path[t + 1:]
+        state = windows.extend_run((earliest[i - 1], path[i - 1]), path, earliest, k + 1, t)
+        accepted = windows.closes(windows.extend(state, segment), path, latest, t + 1)
+        assert not accepted or _simulate(windows, candidate)